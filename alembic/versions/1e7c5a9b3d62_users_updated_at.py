@@ -0,0 +1,28 @@
+"""users updated_at
+
+Revision ID: 1e7c5a9b3d62
+Revises: b6f13c8e2d50
+Create Date: 2026-10-19 18:42:10.316904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1e7c5a9b3d62'
+down_revision: Union[str, Sequence[str], None] = 'b6f13c8e2d50'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'updated_at')
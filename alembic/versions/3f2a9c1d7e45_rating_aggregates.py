@@ -0,0 +1,52 @@
+"""rating aggregates
+
+Revision ID: 3f2a9c1d7e45
+Revises: 8b44753867c6
+Create Date: 2026-10-19 10:12:40.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.conf.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2a9c1d7e45'
+down_revision: Union[str, Sequence[str], None] = '8b44753867c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('posts', sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('posts', sa.Column('rating_score', sa.Numeric(), nullable=True))
+    op.create_index(op.f('ix_posts_rating_score'), 'posts', ['rating_score'], unique=False)
+
+    # Заповнюємо агрегати з уже наявних оцінок
+    op.execute(
+        "UPDATE posts SET "
+        "rating_sum = COALESCE((SELECT SUM(rate) FROM ratings WHERE ratings.post_id = posts.id), 0), "
+        "rating_count = (SELECT COUNT(*) FROM ratings WHERE ratings.post_id = posts.id)"
+    )
+    op.get_bind().execute(
+        sa.text(
+            "UPDATE posts SET "
+            "avg_rating = CASE WHEN rating_count > 0 THEN rating_sum * 1.0 / rating_count END, "
+            "rating_score = CASE WHEN rating_count > 0 "
+            "THEN (:weight * :mean + rating_sum) / (:weight + rating_count) END"
+        ),
+        {"weight": settings.rating_prior_weight, "mean": settings.rating_prior_mean},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_posts_rating_score'), table_name='posts')
+    op.drop_column('posts', 'rating_score')
+    op.drop_column('posts', 'rating_count')
+    op.drop_column('posts', 'rating_sum')
@@ -0,0 +1,28 @@
+"""posts created_at index
+
+Revision ID: 5b0e9a3d71c6
+Revises: e83b5d2c9f14
+Create Date: 2026-10-19 16:02:33.918245
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b0e9a3d71c6'
+down_revision: Union[str, Sequence[str], None] = 'e83b5d2c9f14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_posts_created_at'), 'posts', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_posts_created_at'), table_name='posts')
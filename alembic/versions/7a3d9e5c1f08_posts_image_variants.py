@@ -0,0 +1,28 @@
+"""posts image variants
+
+Revision ID: 7a3d9e5c1f08
+Revises: 1e7c5a9b3d62
+Create Date: 2026-10-19 19:27:53.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3d9e5c1f08'
+down_revision: Union[str, Sequence[str], None] = '1e7c5a9b3d62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('variants', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('posts', 'variants')
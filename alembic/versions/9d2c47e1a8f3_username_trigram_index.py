@@ -0,0 +1,37 @@
+"""username trigram index
+
+Revision ID: 9d2c47e1a8f3
+Revises: 5b0e9a3d71c6
+Create Date: 2026-10-19 16:48:05.372610
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2c47e1a8f3'
+down_revision: Union[str, Sequence[str], None] = '5b0e9a3d71c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pg_trgm є лише в PostgreSQL; для інших БД пошук іде через індекс у пам'яті (app/services/trigram.py)
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_users_username_trgm', 'users', ['username'], unique=False,
+        postgresql_using='gin', postgresql_ops={'username': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_users_username_trgm', table_name='users')
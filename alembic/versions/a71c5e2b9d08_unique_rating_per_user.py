@@ -0,0 +1,52 @@
+"""unique rating per user
+
+Revision ID: a71c5e2b9d08
+Revises: 3f2a9c1d7e45
+Create Date: 2026-10-19 11:02:17.334915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.conf.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a71c5e2b9d08'
+down_revision: Union[str, Sequence[str], None] = '3f2a9c1d7e45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Прибираємо подвійні голоси, що могли з'явитися через гонку перевірок (залишаємо перший)
+    op.execute(
+        "DELETE FROM ratings WHERE id NOT IN "
+        "(SELECT MIN(id) FROM ratings GROUP BY post_id, user_id)"
+    )
+    # Перераховуємо агрегати постів після видалення дублікатів
+    op.execute(
+        "UPDATE posts SET "
+        "rating_sum = COALESCE((SELECT SUM(rate) FROM ratings WHERE ratings.post_id = posts.id), 0), "
+        "rating_count = (SELECT COUNT(*) FROM ratings WHERE ratings.post_id = posts.id)"
+    )
+    op.get_bind().execute(
+        sa.text(
+            "UPDATE posts SET "
+            "avg_rating = CASE WHEN rating_count > 0 THEN rating_sum * 1.0 / rating_count END, "
+            "rating_score = CASE WHEN rating_count > 0 "
+            "THEN (:weight * :mean + rating_sum) / (:weight + rating_count) END"
+        ),
+        {"weight": settings.rating_prior_weight, "mean": settings.rating_prior_mean},
+    )
+    with op.batch_alter_table('ratings') as batch_op:
+        batch_op.create_unique_constraint('uq_ratings_post_user', ['post_id', 'user_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('ratings') as batch_op:
+        batch_op.drop_constraint('uq_ratings_post_user', type_='unique')
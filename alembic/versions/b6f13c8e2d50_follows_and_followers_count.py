@@ -0,0 +1,39 @@
+"""follows and followers count
+
+Revision ID: b6f13c8e2d50
+Revises: 9d2c47e1a8f3
+Create Date: 2026-10-19 17:26:41.805137
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6f13c8e2d50'
+down_revision: Union[str, Sequence[str], None] = '9d2c47e1a8f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('follows',
+    sa.Column('follower_id', sa.Integer(), nullable=False),
+    sa.Column('followed_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['followed_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['follower_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('follower_id', 'followed_id')
+    )
+    op.create_index(op.f('ix_follows_followed_id'), 'follows', ['followed_id'], unique=False)
+    op.add_column('users', sa.Column('followers_count', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'followers_count')
+    op.drop_index(op.f('ix_follows_followed_id'), table_name='follows')
+    op.drop_table('follows')
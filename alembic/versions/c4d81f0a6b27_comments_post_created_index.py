@@ -0,0 +1,28 @@
+"""comments post created index
+
+Revision ID: c4d81f0a6b27
+Revises: a71c5e2b9d08
+Create Date: 2026-10-19 13:05:17.204381
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d81f0a6b27'
+down_revision: Union[str, Sequence[str], None] = 'a71c5e2b9d08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_comments_post_id_created_at', 'comments', ['post_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_comments_post_id_created_at', table_name='comments')
@@ -0,0 +1,28 @@
+"""posts public_id index
+
+Revision ID: d2f6a8c4b1e3
+Revises: 7a3d9e5c1f08
+Create Date: 2026-10-19 22:41:07.315902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f6a8c4b1e3'
+down_revision: Union[str, Sequence[str], None] = '7a3d9e5c1f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_posts_public_id'), 'posts', ['public_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_posts_public_id'), table_name='posts')
@@ -0,0 +1,49 @@
+"""foreign key indexes
+
+Revision ID: e83b5d2c9f14
+Revises: c4d81f0a6b27
+Create Date: 2026-10-19 15:21:48.630915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e83b5d2c9f14'
+down_revision: Union[str, Sequence[str], None] = 'c4d81f0a6b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=False)
+    op.create_index('ix_posts_user_id_created_at', 'posts', ['user_id', 'created_at'], unique=False)
+    op.create_index(op.f('ix_hashtags_user_id'), 'hashtags', ['user_id'], unique=False)
+    op.create_index('ix_comments_user_id_created_at', 'comments', ['user_id', 'created_at'], unique=False)
+    op.create_index(op.f('ix_ratings_user_id'), 'ratings', ['user_id'], unique=False)
+
+    # Прибираємо повторні прив'язки хештегу до поста перед унікальним обмеженням
+    op.execute(
+        "DELETE FROM post_m2m_hashtag WHERE id NOT IN ("
+        "SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM post_m2m_hashtag "
+        "GROUP BY post_id, hashtag_id) AS keep)"
+    )
+    with op.batch_alter_table('post_m2m_hashtag') as batch_op:
+        batch_op.create_unique_constraint('uq_post_m2m_hashtag_post_hashtag', ['post_id', 'hashtag_id'])
+    op.create_index('ix_post_m2m_hashtag_hashtag_id_post_id', 'post_m2m_hashtag', ['hashtag_id', 'post_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_post_m2m_hashtag_hashtag_id_post_id', table_name='post_m2m_hashtag')
+    with op.batch_alter_table('post_m2m_hashtag') as batch_op:
+        batch_op.drop_constraint('uq_post_m2m_hashtag_post_hashtag', type_='unique')
+    op.drop_index(op.f('ix_ratings_user_id'), table_name='ratings')
+    op.drop_index('ix_comments_user_id_created_at', table_name='comments')
+    op.drop_index(op.f('ix_hashtags_user_id'), table_name='hashtags')
+    op.drop_index('ix_posts_user_id_created_at', table_name='posts')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
@@ -0,0 +1,40 @@
+"""image hashes
+
+Revision ID: f3b9d1e7a5c2
+Revises: d2f6a8c4b1e3
+Create Date: 2026-10-19 23:18:42.560214
+
+Хеші зображень наявних постів заповнює python -m app.backfill_images
+(потрібно завантажити оригінали з Cloudinary, тому не в міграції).
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9d1e7a5c2'
+down_revision: Union[str, Sequence[str], None] = 'd2f6a8c4b1e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('image_hashes',
+    sa.Column('public_id', sa.String(length=50), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('phash', sa.String(length=16), nullable=True),
+    sa.Column('image_url', sa.String(length=300), nullable=True),
+    sa.Column('variants', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('public_id'),
+    sa.UniqueConstraint('sha256')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('image_hashes')
@@ -0,0 +1,93 @@
+"""
+backfill_images.py — заповнення таблиці image_hashes для постів, створених до її появи.
+
+Міграція f3b9d1e7a5c2 лише створює таблицю: щоб порахувати SHA-256 і pHash, зображення
+треба завантажити з Cloudinary, а це не робота для міграції. Тому після `alembic upgrade head`
+цей процес один раз проходить пости без запису ImageHash пачками, завантажує оригінали
+й зберігає їхні хеші, після чого старі пости беруть участь у пошуку дублікатів.
+
+Запуск можна повторювати: оброблені пости пропускаються. Зображення, яке не вдалося
+завантажити, лишається без запису до наступного запуску. Пости старого формату з однаковим
+вмістом, але різними public_id, отримують один запис (sha256 унікальний) — на першому з них.
+
+Запуск:
+    python -m app.backfill_images [--batch-size 100]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import io
+from typing import Tuple
+
+import httpx
+from sqlalchemy.orm import Session
+
+from app.database.connect_db import SessionLocal
+from app.repository import images as repository_images
+from app.services import image_hash
+
+
+async def backfill(db: Session, client: httpx.AsyncClient, batch_size: int = 100) -> Tuple[int, int]:
+    """
+    Зберігає хеші зображень усіх постів, для яких ще немає запису ImageHash.
+
+    :param db: SQLAlchemy сесія
+    :param client: HTTP-клієнт для завантаження оригіналів
+    :param batch_size: Скільки постів читати з БД за раз
+    :return: (кількість доданих записів, кількість зображень, які не вдалося завантажити)
+    """
+    added = failed = 0
+    after_id = 0
+    while True:
+        rows = await repository_images.posts_without_images(after_id, batch_size, db)
+        if not rows:
+            return added, failed
+        after_id = rows[-1][0]
+        for _, public_id, image_url, variants in rows:
+            # кілька постів однієї пачки можуть ділити зображення
+            if await repository_images.get_image(public_id, db):
+                continue
+            try:
+                response = await client.get(image_url)
+                response.raise_for_status()
+            except httpx.HTTPError as err:
+                print(f"Image backfill: {public_id} skipped: {err}")
+                failed += 1
+                continue
+            data = response.content
+            phash = await image_hash.phash_file(io.BytesIO(data))
+            image = await repository_images.add_image(
+                public_id, hashlib.sha256(data).hexdigest(), phash, image_url, variants, db
+            )
+            if image.public_id == public_id:
+                added += 1
+
+
+async def run(batch_size: int) -> None:
+    """
+    Відкриває сесію та HTTP-клієнт і запускає backfill.
+
+    :param batch_size: Скільки постів читати з БД за раз
+    """
+    db = SessionLocal()
+    try:
+        async with httpx.AsyncClient(timeout=30, follow_redirects=True) as client:
+            added, failed = await backfill(db, client, batch_size)
+    finally:
+        db.close()
+    print(f"Image backfill: {added} image(s) hashed, {failed} failed")
+
+
+def main() -> None:
+    """
+    Запускає заповнення image_hashes.
+    """
+    parser = argparse.ArgumentParser(description="PhotoShare image hashes backfill")
+    parser.add_argument("--batch-size", type=int, default=100, help="скільки постів читати з БД за раз")
+    args = parser.parse_args()
+    asyncio.run(run(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
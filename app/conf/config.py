@@ -4,18 +4,43 @@ config.py — конфігураційні налаштування застос
 Цей файл містить:
 1. Параметри підключення до бази даних
 2. Налаштування аутентифікації та JWT
-3. Налаштування для відправки email
+3. Налаштування для відправки email та черги листів
 4. Параметри Redis для кешування
 5. Конфігурацію Cloudinary для роботи з зображеннями
 6. Функцію ініціалізації Cloudinary
+7. Параметри байєсівського рейтингу постів
+8. Розміри пачок для масового імпорту та потокового експорту
+9. Пагінацію та кешування коментарів
+10. Ковзні вікна для популярних хештегів
+11. Пороги нечіткого пошуку користувачів
+12. Параметри стрічки підписок (home feed)
+13. Кешування серіалізованих постів
+14. Політики Cache-Control для умовних GET-запитів
+15. Стиснення відповідей (GZip / Brotli)
+16. Бекенд генерації варіантів зображень
+17. Параметри production-сервера (воркери uvicorn, keep-alive, backlog, graceful shutdown)
+18. Ліміти частоти запитів для маршрутів і ролей
+19. Блокування входу після невдалих спроб
+20. Періодичні задачі обслуговування (очищення токенів, QR-кодів, зображень Cloudinary)
+21. Пошук схожих зображень (дублікатів)
+22. Обмеження завантажуваних зображень (формати, розмір файлу та в пікселях)
 
 Використовується Pydantic Settings для читання змінних середовища.
 """
 
+import os
+from typing import Dict, List, Literal, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 import cloudinary
 
+# Корінь проєкту (папка, де лежать app та media) і тека медіафайлів, що віддається через /media
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MEDIA_DIR = os.path.join(PROJECT_ROOT, "media")
+# QR-коди трансформованих постів (show_qr створює, задача обслуговування qrcodes видаляє старі)
+QRCODES_DIR = os.path.join(MEDIA_DIR, "qrcodes")
+
 class Settings(BaseSettings):
     # -------------------- DATABASE --------------------
     sqlalchemy_database_url: str = Field(
@@ -36,6 +61,15 @@ class Settings(BaseSettings):
     mail_from: str = Field(..., alias="MAIL_FROM", description="Email відправника")
     mail_port: int = Field(..., alias="MAIL_PORT", description="Порт SMTP сервера")
     mail_server: str = Field(..., alias="MAIL_SERVER", description="Адреса SMTP сервера")
+    mail_from_name: str = Field("PhotoShare Application", alias="MAIL_FROM_NAME", description="Ім'я відправника")
+    mail_ssl_tls: bool = Field(False, alias="MAIL_SSL_TLS", description="З'єднання з SMTP сервером одразу через TLS (порт 465)")
+    mail_starttls: bool = Field(True, alias="MAIL_STARTTLS", description="Перехід на TLS командою STARTTLS (порт 587)")
+    mail_timeout: int = Field(30, alias="MAIL_TIMEOUT", description="Тайм-аут SMTP операцій у секундах")
+    mail_batch_size: int = Field(50, alias="MAIL_BATCH_SIZE", description="Скільки листів воркер забирає з черги за раз")
+    mail_max_attempts: int = Field(5, alias="MAIL_MAX_ATTEMPTS", description="Кількість спроб відправки, після якої лист переноситься в mail:dead")
+    mail_retry_base: int = Field(30, alias="MAIL_RETRY_BASE", description="Затримка перед першим повтором у секундах; далі подвоюється")
+    mail_smtp_idle_timeout: int = Field(60, alias="MAIL_SMTP_IDLE_TIMEOUT", description="Після скількох секунд простою SMTP-з'єднання відкривається заново")
+    mail_poll_interval: int = Field(5, alias="MAIL_POLL_INTERVAL", description="Скільки секунд воркер чекає на нові листи, перш ніж перевірити відкладені")
 
     # -------------------- REDIS --------------------
     redis_url: str = Field(..., alias="REDIS_URL", description="URL підключення до Redis для кешування та чорного списку токенів")
@@ -45,6 +79,101 @@ class Settings(BaseSettings):
     cloudinary_api_key: str = Field(..., alias="CLOUDINARY_API_KEY", description="API ключ для Cloudinary")
     cloudinary_api_secret: str = Field(..., alias="CLOUDINARY_API_SECRET", description="API секрет для Cloudinary")
 
+    # -------------------- RATINGS --------------------
+    rating_prior_mean: float = Field(3.0, alias="RATING_PRIOR_MEAN", description="Апріорна середня оцінка для байєсівського рейтингу")
+    rating_prior_weight: int = Field(10, alias="RATING_PRIOR_WEIGHT", description="Вага апріорної оцінки (кількість 'віртуальних' голосів)")
+
+    # -------------------- BULK IMPORT / EXPORT --------------------
+    bulk_import_chunk_size: int = Field(1000, alias="BULK_IMPORT_CHUNK_SIZE", description="Кількість рядків NDJSON, що валідуються та вставляються за раз")
+    stream_batch_size: int = Field(1000, alias="STREAM_BATCH_SIZE", description="Розмір пачки рядків, які читаються з БД курсором при потоковій видачі")
+
+    # -------------------- COMMENTS --------------------
+    comments_page_size: int = Field(20, alias="COMMENTS_PAGE_SIZE", description="Розмір сторінки коментарів за замовчуванням")
+    comments_cache_ttl: int = Field(300, alias="COMMENTS_CACHE_TTL", description="Час життя закешованої першої сторінки коментарів поста у секундах")
+
+    # -------------------- TRENDING HASHTAGS --------------------
+    trending_windows: List[int] = Field([1, 24, 168], alias="TRENDING_WINDOWS", description="Дозволені вікна (у годинах) для популярних хештегів, наприклад [1, 24, 168]")
+
+    # -------------------- USER SEARCH --------------------
+    username_similarity_threshold: float = Field(0.3, alias="USERNAME_SIMILARITY_THRESHOLD", description="Мінімальна триграмна схожість username для нечіткого пошуку (0–1)")
+    username_index_ttl: int = Field(300, alias="USERNAME_INDEX_TTL", description="Через скільки секунд індекс username у пам'яті (SQLite) перебудовується з БД")
+
+    # -------------------- HOME FEED --------------------
+    feed_max_length: int = Field(500, alias="FEED_MAX_LENGTH", description="Максимальна кількість ID постів у стрічці користувача в Redis")
+    feed_ttl: int = Field(7 * 24 * 3600, alias="FEED_TTL", description="Час життя стрічки неактивного користувача в Redis у секундах")
+    feed_celebrity_threshold: int = Field(10000, alias="FEED_CELEBRITY_THRESHOLD", description="Кількість підписників, після якої пости автора не розсилаються по стрічках, а підтягуються при читанні")
+    feed_fanout_batch_size: int = Field(1000, alias="FEED_FANOUT_BATCH_SIZE", description="Кількість стрічок, що оновлюються одним pipeline Redis при розсилці поста")
+
+    # -------------------- POST CACHE --------------------
+    post_cache_ttl: int = Field(600, alias="POST_CACHE_TTL", description="Час життя серіалізованого поста в кеші Redis у секундах")
+
+    # -------------------- HTTP CACHING --------------------
+    cache_control_post: str = Field("private, max-age=30, must-revalidate", alias="CACHE_CONTROL_POST", description="Cache-Control для /posts/by_id/{post_id}")
+    cache_control_me: str = Field("private, no-cache", alias="CACHE_CONTROL_ME", description="Cache-Control для /users/me/ (завжди перевіряється за ETag)")
+    cache_control_profile: str = Field("private, max-age=60, must-revalidate", alias="CACHE_CONTROL_PROFILE", description="Cache-Control для профілю користувача")
+    cache_control_tags: str = Field("private, max-age=300, must-revalidate", alias="CACHE_CONTROL_TAGS", description="Cache-Control для ендпоінтів хештегів")
+
+    # -------------------- COMPRESSION --------------------
+    compression_minimum_size: int = Field(1000, alias="COMPRESSION_MINIMUM_SIZE", description="Мінімальний розмір відповіді в байтах, з якого вона стискається")
+    gzip_level: int = Field(6, alias="GZIP_LEVEL", description="Рівень стиснення GZip (1–9)")
+    brotli_quality: int = Field(4, alias="BROTLI_QUALITY", description="Якість стиснення Brotli (0–11), якщо встановлено пакет brotli")
+
+    # -------------------- IMAGE VARIANTS --------------------
+    image_variants_backend: Literal["cloudinary", "local"] = Field("cloudinary", alias="IMAGE_VARIANTS_BACKEND", description="Де генерувати варіанти зображень: eager-трансформації Cloudinary або локально через Pillow")
+
+    # -------------------- PRODUCTION SERVER --------------------
+    web_host: str = Field("0.0.0.0", alias="WEB_HOST", description="Адреса, яку слухає сервер")
+    web_port: int = Field(8080, alias="WEB_PORT", description="Порт сервера")
+    web_workers: int = Field(0, alias="WEB_WORKERS", description="Кількість процесів uvicorn (0 — за кількістю доступних CPU)")
+    web_keep_alive: int = Field(5, alias="WEB_KEEP_ALIVE", description="Скільки секунд тримати відкритим неактивне keep-alive з'єднання")
+    web_backlog: int = Field(2048, alias="WEB_BACKLOG", description="Довжина черги з'єднань, що очікують на accept")
+    web_graceful_timeout: int = Field(30, alias="WEB_GRACEFUL_TIMEOUT", description="Скільки секунд при зупинці чекати завершення запитів і завантажень у Cloudinary")
+    web_limit_max_requests: Optional[int] = Field(None, alias="WEB_LIMIT_MAX_REQUESTS", description="Після скількох запитів воркер перезапускається (None — без обмеження)")
+
+    # -------------------- RATE LIMITS --------------------
+    rate_limits: Dict[str, Dict[str, str]] = Field(
+        {
+            "login": {"anonymous": "10/minute"},
+            "create_post": {"user": "10/minute", "moder": "30/minute", "admin": "100/minute"},
+            "create_rate": {"user": "30/minute", "moder": "60/minute", "admin": "120/minute"},
+            "create_comment": {"user": "20/minute", "moder": "60/minute", "admin": "120/minute"},
+        },
+        alias="RATE_LIMITS",
+        description="Ліміти маршрутів (JSON): назва -> {роль | default | anonymous: \"N/second|minute|hour|day\"}"
+    )
+    rate_limit_batch: float = Field(0.2, alias="RATE_LIMIT_BATCH", description="Частка ліміту, яку процес резервує в Redis за один запит і витрачає локально")
+    rate_limit_batch_min: int = Field(100, alias="RATE_LIMIT_BATCH_MIN", description="Найменший ліміт, для якого токени резервуються пачками; менші ліміти рахуються в Redis по одному токену")
+
+    # -------------------- LOGIN PROTECTION --------------------
+    login_max_email_failures: int = Field(5, alias="LOGIN_MAX_EMAIL_FAILURES", description="Кількість невдалих спроб для email, після якої вхід блокується")
+    login_max_ip_failures: int = Field(20, alias="LOGIN_MAX_IP_FAILURES", description="Кількість невдалих спроб з одного IP, після якої вхід блокується")
+    login_failure_window: int = Field(900, alias="LOGIN_FAILURE_WINDOW", description="Скільки секунд зберігаються лічильники невдалих спроб")
+    login_lockout_base: int = Field(30, alias="LOGIN_LOCKOUT_BASE", description="Перше блокування в секундах; кожна наступна невдача його подвоює")
+    login_lockout_max: int = Field(3600, alias="LOGIN_LOCKOUT_MAX", description="Максимальна тривалість блокування в секундах")
+
+    # -------------------- MAINTENANCE --------------------
+    maintenance_in_app: bool = Field(True, alias="MAINTENANCE_IN_APP", description="Запускати планувальник задач обслуговування у веб-воркерах")
+    maintenance_tick: int = Field(60, alias="MAINTENANCE_TICK", description="Як часто планувальник перевіряє задачі, у секундах")
+    maintenance_batch_size: int = Field(1000, alias="MAINTENANCE_BATCH_SIZE", description="Розмір пачки для видалення записів БД")
+    maintenance_blacklist_interval: int = Field(3600, alias="MAINTENANCE_BLACKLIST_INTERVAL", description="Інтервал очищення чорного списку токенів у секундах")
+    maintenance_blacklist_retention: int = Field(86400, alias="MAINTENANCE_BLACKLIST_RETENTION", description="Скільки секунд зберігати токен у чорному списку (не менше за час життя access token)")
+    maintenance_refresh_tokens_interval: int = Field(21600, alias="MAINTENANCE_REFRESH_TOKENS_INTERVAL", description="Інтервал очищення прострочених refresh token у секундах")
+    maintenance_qrcodes_interval: int = Field(3600, alias="MAINTENANCE_QRCODES_INTERVAL", description="Інтервал очищення media/qrcodes у секундах")
+    maintenance_qrcode_ttl: int = Field(86400, alias="MAINTENANCE_QRCODE_TTL", description="Вік PNG QR-коду в секундах, після якого він видаляється")
+    maintenance_cloudinary_interval: int = Field(300, alias="MAINTENANCE_CLOUDINARY_INTERVAL", description="Інтервал видалення зображень Cloudinary з черги у секундах")
+    maintenance_cloudinary_limit: int = Field(1000, alias="MAINTENANCE_CLOUDINARY_LIMIT", description="Максимум public_id, що видаляються з Cloudinary за один запуск")
+    maintenance_leaderboards_interval: int = Field(60, alias="MAINTENANCE_LEADERBOARDS_INTERVAL", description="Як часто перевіряти, чи побудовані таблиці лідерів у Redis, у секундах")
+
+    # -------------------- DUPLICATE IMAGES --------------------
+    duplicate_max_distance: int = Field(10, alias="DUPLICATE_MAX_DISTANCE", description="Максимальна відстань Хеммінга між pHash (0–64), за якої зображення вважаються схожими")
+    image_index_ttl: int = Field(300, alias="IMAGE_INDEX_TTL", description="Через скільки секунд індекс pHash зображень у пам'яті перебудовується з БД")
+
+    # -------------------- UPLOADS --------------------
+    upload_allowed_formats: List[str] = Field(["jpeg", "png", "gif", "webp", "avif"], alias="UPLOAD_ALLOWED_FORMATS", description="Дозволені формати зображень (визначаються за сигнатурою файлу)")
+    upload_max_size: int = Field(10 * 1024 * 1024, alias="UPLOAD_MAX_SIZE", description="Максимальний розмір завантажуваного файлу в байтах")
+    upload_max_dimension: int = Field(10000, alias="UPLOAD_MAX_DIMENSION", description="Максимальна ширина або висота зображення в пікселях")
+    upload_max_pixels: int = Field(50_000_000, alias="UPLOAD_MAX_PIXELS", description="Максимальна кількість пікселів зображення (ширина × висота)")
+
     # -------------------- CONFIG --------------------
     model_config = SettingsConfigDict(
         env_file=".env", 
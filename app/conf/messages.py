@@ -22,6 +22,7 @@ INVALID_PASSWORD = "Invalid password"
 INVALID_TOKEN = "Invalid refresh token"
 VERIFICATION_ERROR = "Verification error"
 INVALID_EMAIL = "Invalid email"
+INVALID_CREDENTIALS = "Invalid email or password"
 EMAIL_NOT_CONFIRMED = "Email not confirmed"
 EMAIL_ALREADY_CONFIRMED = "Your email is already confirmed"
 EMAIL_CONFIRMED = "Email successfully confirmed"
@@ -38,20 +39,34 @@ USER_ROLE_EXISTS = "Role is already exists"
 USER_CHANGE_ROLE_TO = "User role changed to"
 
 # -------------------- REQUESTS / RATE LIMIT --------------------
-TOO_MANY_REQUESTS = 'No more than 10 requests per minute'
+TOO_MANY_REQUESTS = 'Too many requests, try again later'
+LOGIN_LOCKED = 'Too many failed login attempts, try again later'
+
+# -------------------- FOLLOWS --------------------
+CANNOT_FOLLOW_SELF = "It`s not possible to follow yourself."
 
 # -------------------- POSTS --------------------
 INVALID_URL = "Invalid url"
 TOO_MANY_HASHTAGS = "Too many hashtags! Maximum 5."
+UNSUPPORTED_IMAGE = "Unsupported file type. Upload a JPEG, PNG, GIF, WebP or AVIF image."
+FILE_TOO_LARGE = "File is too large."
+IMAGE_TOO_LARGE = "Image dimensions are too large."
 NO_POST_ID = "No post with this ID."
 OWN_POST = "It`s not possible vote for own post."
 
+# -------------------- HASHTAGS --------------------
+INVALID_TRENDING_WINDOW = "Unsupported trending window."
+
 # -------------------- COMMENTS --------------------
 COMM_NOT_FOUND = "Comment not found or not available."
+INVALID_CURSOR = "Invalid pagination cursor."
 
 # -------------------- RATINGS --------------------
 NO_RATING = "Rating not found or not available."
 VOTE_TWICE = "It`s not possible to vote twice."
 
+# -------------------- BULK IMPORT --------------------
+NO_USER_ID = "No user with this ID."
+
 # -------------------- PERMISSIONS --------------------
 OPERATION_FORBIDDEN = "Operation forbidden"
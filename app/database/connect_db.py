@@ -3,12 +3,14 @@ connect_db.py — налаштування підключення до бази
 
 Містить:
 - Підключення до PostgreSQL через SQLAlchemy
+- Увімкнення зовнішніх ключів для SQLite (каскадне видалення виконує БД)
 - Створення об'єкта сесії для роботи з базою
 - Базовий клас для моделей
 - Функцію-залежність get_db для FastAPI
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -25,6 +27,26 @@ engine = create_engine(
     pool_pre_ping=True # Перевірка доступності з'єднання перед використанням
 )
 
+
+def enable_sqlite_foreign_keys(engine: Engine) -> None:
+    """
+    SQLite за замовчуванням ігнорує FOREIGN KEY і ON DELETE CASCADE, тож для нього
+    на кожному новому з'єднанні виконується PRAGMA foreign_keys=ON.
+
+    :param engine: SQLAlchemy engine (для інших діалектів нічого не робить)
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _foreign_keys_on(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+enable_sqlite_foreign_keys(engine)
+
 # -------------------- SESSION --------------------
 # Створюємо фабрику сесій для роботи з базою даних
 SessionLocal = sessionmaker(
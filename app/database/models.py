@@ -7,13 +7,14 @@ models.py — моделі бази даних для PhotoShare API.
 - Хештеги (Hashtag) з Many-to-Many до постів
 - Коментарі (Comment)
 - Рейтинги (Rating)
+- Підписки між користувачами (Follow)
+- Хеші завантажених зображень (ImageHash)
 - Чорний список токенів (BlacklistToken)
 """
 
 import enum
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, Numeric, String, Table, Text, func, Enum
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, JSON, Numeric, String, Table, Text, UniqueConstraint, func, Enum
 from sqlalchemy.orm import declarative_base, relationship
-from sqlalchemy_utils import aggregated
 
 Base = declarative_base()
 
@@ -34,20 +35,26 @@ class User(Base):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True)
-    username = Column(String(50), nullable=True)
+    username = Column(String(50), nullable=True, index=True)
     email = Column(String(250), nullable=False, unique=True)
     password = Column(String(255), nullable=False)
     avatar = Column(String(355), nullable=True)
     created_at = Column(DateTime, default=func.now())
+    # Версія запису для ETag профілю (/users/me/)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), server_default=func.now())
     role = Column(Enum(UserRoleEnum), default=UserRoleEnum.user)
     refresh_token = Column(String(255), nullable=True)
     is_active = Column(Boolean, default=True)
     is_verify = Column(Boolean, default=False)
+    # Кількість підписників (оновлюється в repository/users.py при follow/unfollow)
+    followers_count = Column(Integer, default=0, server_default='0', nullable=False)
 
-    posts = relationship('Post', back_populates='user', cascade="all, delete-orphan")
-    comments = relationship('Comment', back_populates='user', cascade="all, delete-orphan")
-    ratings = relationship('Rating', back_populates='user', cascade="all, delete-orphan")
-    hashtags = relationship('Hashtag', back_populates='user', cascade="all, delete-orphan")
+    # Залежні записи видаляє сама БД (ON DELETE CASCADE); passive_deletes не дає ORM
+    # завантажувати їх у пам'ять перед видаленням користувача чи поста
+    posts = relationship('Post', back_populates='user', cascade="all, delete-orphan", passive_deletes=True)
+    comments = relationship('Comment', back_populates='user', cascade="all, delete-orphan", passive_deletes=True)
+    ratings = relationship('Rating', back_populates='user', cascade="all, delete-orphan", passive_deletes=True)
+    hashtags = relationship('Hashtag', back_populates='user', cascade="all, delete-orphan", passive_deletes=True)
 
 
 # ---------------- MANY-TO-MANY POSTS-HASHTAGS ---------------- #
@@ -57,6 +64,9 @@ post_m2m_hashtag = Table(
     Column("id", Integer, primary_key=True),
     Column("post_id", Integer, ForeignKey("posts.id", ondelete="CASCADE")),
     Column("hashtag_id", Integer, ForeignKey("hashtags.id", ondelete="CASCADE")),
+    # (post_id, hashtag_id) покриває пошук хештегів поста, (hashtag_id, post_id) — постів за хештегом
+    UniqueConstraint("post_id", "hashtag_id", name="uq_post_m2m_hashtag_post_hashtag"),
+    Index("ix_post_m2m_hashtag_hashtag_id_post_id", "hashtag_id", "post_id"),
 )
 
 
@@ -73,22 +83,28 @@ class Post(Base):
     transform_url = Column(Text)
     title = Column(String(50), nullable=True)
     descr = Column(String(500), nullable=True)
-    created_at = Column(DateTime, default=func.now())
+    created_at = Column(DateTime, default=func.now(), index=True)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     done = Column(Boolean, default=False)
-    public_id = Column(String(50))
+    public_id = Column(String(50), index=True)
+    # URL адаптивних варіантів зображення: {"thumb": {"jpg": ..., "webp": ..., "avif": ...}, ...}
+    variants = Column(JSON, nullable=True)
+
+    # Інкрементальні агрегати рейтингу (оновлюються в repository/ratings.py)
+    avg_rating = Column(Numeric, nullable=True)
+    rating_sum = Column(Integer, default=0, server_default='0', nullable=False)
+    rating_count = Column(Integer, default=0, server_default='0', nullable=False)
+    rating_score = Column(Numeric, nullable=True, index=True)
 
     user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=True)
     user = relationship('User', back_populates='posts')
 
-    hashtags = relationship('Hashtag', secondary=post_m2m_hashtag, back_populates='posts')
-    rating = relationship('Rating', back_populates='post', cascade="all, delete-orphan")
-    comments = relationship('Comment', back_populates='post', cascade="all, delete-orphan")
+    hashtags = relationship('Hashtag', secondary=post_m2m_hashtag, back_populates='posts', passive_deletes=True)
+    rating = relationship('Rating', back_populates='post', cascade="all, delete-orphan", passive_deletes=True)
+    comments = relationship('Comment', back_populates='post', cascade="all, delete-orphan", passive_deletes=True)
 
-    @aggregated('rating', Column(Numeric))
-    def avg_rating(self):
-        """Середній рейтинг посту"""
-        return func.avg(Rating.rate)
+    # Пости автора (профіль, «мої пости») вибираються по user_id і сортуються за датою
+    __table_args__ = (Index('ix_posts_user_id_created_at', 'user_id', 'created_at'),)
 
 
 # ---------------- HASHTAG ---------------- #
@@ -99,10 +115,10 @@ class Hashtag(Base):
     id = Column(Integer, primary_key=True)
     title = Column(String(25), nullable=False, unique=True)
     created_at = Column(DateTime, default=func.now())
-    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=True, index=True)
 
     user = relationship('User', back_populates='hashtags')
-    posts = relationship('Post', secondary=post_m2m_hashtag, back_populates='hashtags')
+    posts = relationship('Post', secondary=post_m2m_hashtag, back_populates='hashtags', passive_deletes=True)
 
 
 # ---------------- COMMENT ---------------- #
@@ -125,23 +141,58 @@ class Comment(Base):
     user = relationship('User', back_populates='comments')
     post = relationship('Post', back_populates='comments')
 
+    # Тред поста і коментарі автора читаються сторінками в порядку (created_at, id)
+    __table_args__ = (
+        Index('ix_comments_post_id_created_at', 'post_id', 'created_at'),
+        Index('ix_comments_user_id_created_at', 'user_id', 'created_at'),
+    )
+
 
 # ---------------- RATING ---------------- #
 class Rating(Base):
-    """Рейтинг посту від користувачів від 1 до 5 зірок."""
+    """Рейтинг посту від користувачів від 1 до 5 зірок. Один голос на пару (пост, користувач)."""
     __tablename__ = 'ratings'
+    __table_args__ = (
+        UniqueConstraint('post_id', 'user_id', name='uq_ratings_post_user'),
+    )
 
     id = Column(Integer, primary_key=True)
     rate = Column(Integer, default=0)
     created_at = Column(DateTime, default=func.now())
 
     post_id = Column(Integer, ForeignKey('posts.id', ondelete='CASCADE'), nullable=False)
-    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=True, index=True)
 
     user = relationship('User', back_populates='ratings')
     post = relationship('Post', back_populates='rating')
 
 
+# ---------------- FOLLOW ---------------- #
+class Follow(Base):
+    """Підписка користувача (follower) на публікації іншого користувача (followed)."""
+    __tablename__ = 'follows'
+
+    follower_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    followed_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True, index=True)
+    created_at = Column(DateTime, default=func.now())
+
+
+# ---------------- IMAGE HASHES ---------------- #
+class ImageHash(Base):
+    """
+    Зображення в Cloudinary та хеші його вмісту: SHA-256 для точних дублікатів
+    і pHash (16 hex-символів) для пошуку схожих. Один запис на зображення, яке можуть ділити кілька постів.
+    """
+    __tablename__ = 'image_hashes'
+
+    public_id = Column(String(50), primary_key=True)
+    sha256 = Column(String(64), unique=True, nullable=False)
+    phash = Column(String(16), nullable=True)
+    image_url = Column(String(300))
+    variants = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=func.now())
+
+
 # ---------------- BLACKLIST ---------------- #
 class BlacklistToken(Base):
     """Чорний список токенів для logout."""
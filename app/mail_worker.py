@@ -0,0 +1,40 @@
+"""
+mail_worker.py — окремий процес, що відправляє листи з черги Redis.
+
+Веб-воркери лише додають листи в чергу (app.services.mail_queue.enqueue), а цей процес
+відправляє їх пачками через одне SMTP-з'єднання, повторюючи невдалі спроби з затримкою.
+
+Запуск:
+    python -m app.mail_worker [--name worker-1]
+
+Назва має бути унікальною для кожного процесу і сталою між його перезапусками: під час
+запуску воркер повертає в чергу незавершені завдання зі свого списку mail:processing:{name}.
+Без --name використовується {hostname}-{pid}, тож завдання процесу, що впав, підхопить
+лише воркер з тією самою назвою.
+
+Параметри SMTP і черги беруться з MAIL_* змінних середовища (див. app/conf/config.py).
+"""
+
+import argparse
+import asyncio
+
+from app.services.mail_queue import MailWorker, default_worker_name
+
+
+def main() -> None:
+    """
+    Запускає воркер черги листів.
+    """
+    parser = argparse.ArgumentParser(description="PhotoShare mail queue worker")
+    parser.add_argument(
+        "--name", default=default_worker_name(), help="назва воркера (унікальна для кожного процесу, за замовчуванням hostname-pid)"
+    )
+    args = parser.parse_args()
+    try:
+        asyncio.run(MailWorker(args.name).run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,18 @@
+import asyncio
 import os
 import redis.asyncio as redis
 import uvicorn
 from fastapi import FastAPI, HTTPException, Depends
-from fastapi_limiter import FastAPILimiter
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import text
 from fastapi.staticfiles import StaticFiles
 
-from app.conf.config import settings
+from app.conf.config import MEDIA_DIR, QRCODES_DIR, settings
 from app.conf.messages import DB_CONFIG_ERROR, DB_CONNECT_ERROR, WELCOME_MESSAGE
-from app.database.connect_db import get_db
+from app.database.connect_db import SessionLocal, get_db
+from app.repository import hashtags as repository_tags
+from app.repository import ratings as repository_ratings
 from app.routers.auth import router as auth_router
 from app.routers.posts import router as post_router
 from app.routers.comments import router as comment_router
@@ -17,8 +20,29 @@ from app.routers.ratings import router as rating_router
 from app.routers.transform_post import router as trans_router
 from app.routers.hashtags import router as hashtag_router
 from app.routers.users import router as users_router
+from app.services import maintenance  # noqa: F401 — реєструє задачі обслуговування
+from app.services import scheduler, uploads
+from app.services.compression import CompressionMiddleware
+from app.services.upload_validation import FORM_OVERHEAD, UploadSizeMiddleware
+
+# ORJSONResponse серіалізує відповіді через orjson замість стандартного json
+app = FastAPI(
+    title="Photoshare API",
+    description="API for Photoshare project",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
 
-app = FastAPI(title="Photoshare API", description="API for Photoshare project", version="1.0.0")
+# --------------------------------------------
+# MIDDLEWARE
+# --------------------------------------------
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.gzip_level,
+    brotli_quality=settings.brotli_quality,
+)
+app.add_middleware(UploadSizeMiddleware, max_size=settings.upload_max_size + FORM_OVERHEAD)
 
 # --------------------------------------------
 # ROUTERS
@@ -34,15 +58,11 @@ app.include_router(rating_router, prefix='/api')
 # --- Статика для медіа ---
 # app.mount("/media", StaticFiles(directory=os.path.join("app", "media")), name="media")
 
-# Корінь проєкту (папка, де лежать app та media)
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # app/
-PROJECT_ROOT = os.path.dirname(BASE_DIR)              # ../ -> PhotoShare-Project
-
-MEDIA_DIR = os.path.join(PROJECT_ROOT, "media")
+# MEDIA_DIR — media у корені проєкту (app.conf.config, спільний з image_variants)
 
 # Створюємо папки, якщо їх ще немає
 os.makedirs(MEDIA_DIR, exist_ok=True)
-os.makedirs(os.path.join(MEDIA_DIR, "qrcodes"), exist_ok=True)
+os.makedirs(QRCODES_DIR, exist_ok=True)
 
 # Монтую media
 app.mount("/media", StaticFiles(directory=MEDIA_DIR), name="media")
@@ -66,10 +86,12 @@ def read_root():
 @app.on_event("startup")
 async def startup():
     """
-    Ініціалізація FastAPILimiter та Redis cache при запуску додатку.
+    Ініціалізація Redis cache при запуску додатку.
 
     Використовує REDIS_URL із налаштувань .env.
     Перевіряє доступність Redis через ping.
+    Будує індекс автодоповнення хештегів і таблиці лідерів постів, якщо їх ще немає.
+    Запускає планувальник задач обслуговування (якщо MAINTENANCE_IN_APP).
     """
     redis_cache = redis.from_url(
         settings.redis_url,
@@ -83,8 +105,33 @@ async def startup():
         print(f"Redis connection error: {e}")
         raise
 
-    await FastAPILimiter.init(redis_cache)
-    print("FastAPILimiter initialized.")
+    db = SessionLocal()
+    try:
+        await repository_tags.build_suggest_index(db)
+        await repository_ratings.build_leaderboards(db)
+    finally:
+        db.close()
+
+    if settings.maintenance_in_app:
+        app.state.scheduler = asyncio.create_task(scheduler.run_forever())
+
+
+# --------------------------------------------
+# SHUTDOWN EVENT
+# --------------------------------------------
+@app.on_event("shutdown")
+async def shutdown():
+    """
+    Дочікується завантажень у Cloudinary, що ще виконуються у пулі потоків,
+    щоб зупинка воркера (SIGTERM) не обірвала їх на півдорозі.
+    Зупиняє планувальник задач обслуговування.
+    """
+    task = getattr(app.state, "scheduler", None)
+    if task is not None:
+        task.cancel()
+    if uploads.in_flight():
+        print(f"Waiting for {uploads.in_flight()} Cloudinary upload(s) to finish...")
+        await uploads.drain(settings.web_graceful_timeout)
 
 
 # --------------------------------------------
@@ -0,0 +1,39 @@
+"""
+maintenance.py — окремий процес планувальника задач обслуговування.
+
+Задачі (див. app.services.maintenance) можна запускати і в самому застосунку
+(MAINTENANCE_IN_APP=true — фонова задача в кожному веб-воркері), і цим процесом;
+lock у Redis гарантує, що кожна задача виконується одним процесом на інтервал.
+
+Запуск:
+    python -m app.maintenance           # нескінченний цикл
+    python -m app.maintenance --once    # один прохід (наприклад, з cron)
+    python -m app.maintenance --once --force  # усі задачі одразу, без очікування інтервалу
+"""
+
+import argparse
+import asyncio
+
+from app.services import maintenance  # noqa: F401 — реєструє задачі
+from app.services import scheduler
+
+
+def main() -> None:
+    """
+    Запускає планувальник задач обслуговування.
+    """
+    parser = argparse.ArgumentParser(description="PhotoShare maintenance scheduler")
+    parser.add_argument("--once", action="store_true", help="виконати один прохід і завершитися")
+    parser.add_argument("--force", action="store_true", help="запустити задачі, не чекаючи на їхні lock")
+    args = parser.parse_args()
+    try:
+        if args.once:
+            asyncio.run(scheduler.run_pending(force=args.force))
+        else:
+            asyncio.run(scheduler.run_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,72 @@
 comments.py — функції для роботи з коментарями у PhotoShare API.
 
 Містить CRUD-операції та методи для отримання коментарів користувачів.
+Списки коментарів віддаються сторінками з курсором (created_at, id) замість OFFSET.
 """
 
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
-from fastapi import HTTPException
-from app.database.models import User, Comment, UserRoleEnum
-from app.schemas import CommentBase
+import base64
+import binascii
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+from sqlalchemy.orm import Query, Session
+from sqlalchemy import and_, func, insert, tuple_
+from fastapi import HTTPException, status
+from app.conf.config import settings
+from app.database.models import User, Comment, Post, UserRoleEnum
+from app.schemas import CommentBase, CommentImportModel, CommentPage, ImportReport
+from app.conf import messages as message
+from app.services import comment_cache
+from app.services.ndjson import parse_chunk, record_error
+
+
+def encode_cursor(comment: Comment) -> str:
+    """
+    Кодує позицію коментаря (created_at, id) у непрозорий рядок-курсор.
+
+    :param comment: Останній коментар на сторінці
+    :return: Курсор для запиту наступної сторінки
+    """
+    raw = f"{comment.created_at.isoformat()}|{comment.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Розбирає курсор, отриманий від encode_cursor.
+
+    :param cursor: Рядок-курсор
+    :raises HTTPException: 400 якщо курсор пошкоджений
+    :return: Пара (created_at, id)
+    """
+    try:
+        created_at, comment_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(comment_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=message.INVALID_CURSOR)
+
+
+def comments_page(condition, limit: int, cursor: Optional[str], db: Session) -> CommentPage:
+    """
+    Повертає сторінку коментарів, що задовольняють умову, у порядку (created_at, id).
+
+    Наступна сторінка вибирається за курсором (keyset), тому запит іде по індексу
+    і не сповільнюється на глибоких сторінках. Загальна кількість рахується через
+    COUNT без завантаження рядків.
+
+    :param condition: SQL-умова відбору (наприклад, Comment.post_id == post_id)
+    :param limit: Розмір сторінки
+    :param cursor: Курсор попередньої сторінки або None для першої
+    :param db: SQLAlchemy сесія
+    :return: CommentPage
+    """
+    query = db.query(Comment).filter(condition)
+    if cursor:
+        query = query.filter(tuple_(Comment.created_at, Comment.id) > tuple_(*decode_cursor(cursor)))
+    rows = query.order_by(Comment.created_at, Comment.id).limit(limit + 1).all()
+    total = db.query(func.count(Comment.id)).filter(condition).scalar()
+
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return CommentPage(items=rows[:limit], next_cursor=next_cursor, total=total)
 
 
 async def create_comment(post_id: int, body: CommentBase, db: Session, user: User) -> Comment:
@@ -30,6 +88,7 @@ async def create_comment(post_id: int, body: CommentBase, db: Session, user: Use
     db.add(new_comment)
     db.commit()
     db.refresh(new_comment)
+    await comment_cache.invalidate([post_id])
     return new_comment
 
 
@@ -58,6 +117,7 @@ async def edit_comment(comment_id: int, body: CommentBase, db: Session, user: Us
     comment.update_status = True
     db.commit()
     db.refresh(comment)
+    await comment_cache.invalidate([comment.post_id])
     return comment
 
 
@@ -75,6 +135,7 @@ async def delete_comment(comment_id: int, db: Session, user: User) -> Optional[C
     if comment and (user.role in [UserRoleEnum.admin, UserRoleEnum.moder] or comment.user_id == user.id):
         db.delete(comment)
         db.commit()
+        await comment_cache.invalidate([comment.post_id])
         return comment
     return None
 
@@ -95,15 +156,18 @@ async def show_single_comment(comment_id: int, db: Session, user: User) -> Optio
     return None
 
 
-async def show_user_comments(user_id: int, db: Session) -> List[Comment]:
+async def show_user_comments(user_id: int, db: Session, limit: Optional[int] = None,
+                             cursor: Optional[str] = None) -> CommentPage:
     """
-    Повертає список всіх коментарів конкретного користувача.
+    Повертає сторінку коментарів конкретного користувача.
 
     :param user_id: ID користувача
     :param db: SQLAlchemy сесія
-    :return: Список об'єктів Comment
+    :param limit: Розмір сторінки (за замовчуванням settings.comments_page_size)
+    :param cursor: Курсор попередньої сторінки або None для першої
+    :return: CommentPage
     """
-    return db.query(Comment).filter(Comment.user_id == user_id).all()
+    return comments_page(Comment.user_id == user_id, limit or settings.comments_page_size, cursor, db)
 
 
 async def show_user_post_comments(user_id: int, post_id: int, db: Session) -> List[Comment]:
@@ -118,3 +182,55 @@ async def show_user_post_comments(user_id: int, post_id: int, db: Session) -> Li
     return db.query(Comment).filter(
         and_(Comment.post_id == post_id, Comment.user_id == user_id)
     ).all()
+
+
+
+async def import_comments(chunks: AsyncIterator[List[Tuple[int, str]]], db: Session) -> ImportReport:
+    """
+    Масовий імпорт коментарів з NDJSON.
+
+    Кожна пачка рядків валідується, посилання на пости та користувачів перевіряються
+    двома запитами, а валідні рядки вставляються одним executemany.
+
+    :param chunks: Асинхронний ітератор пачок [(номер_рядка, рядок), ...]
+    :param db: SQLAlchemy сесія
+    :return: ImportReport з кількістю імпортованих рядків та помилками по рядках
+    """
+    report = ImportReport()
+    async for chunk in chunks:
+        rows = parse_chunk(chunk, CommentImportModel, report)
+        if not rows:
+            continue
+        post_ids = {pid for (pid,) in db.query(Post.id).filter(Post.id.in_({r.post_id for _, r in rows}))}
+        user_ids = {uid for (uid,) in db.query(User.id).filter(User.id.in_({r.user_id for _, r in rows}))}
+
+        params = []
+        for line_no, row in rows:
+            if row.post_id not in post_ids:
+                record_error(report, line_no, message.NO_POST_ID)
+            elif row.user_id not in user_ids:
+                record_error(report, line_no, message.NO_USER_ID)
+            else:
+                params.append({
+                    "text": row.text,
+                    "post_id": row.post_id,
+                    "user_id": row.user_id,
+                    "created_at": row.created_at or datetime.now(),
+                })
+        if params:
+            db.execute(insert(Comment), params)
+            db.commit()
+            report.imported += len(params)
+            await comment_cache.invalidate(p["post_id"] for p in params)
+    return report
+
+
+def iter_comments(db: Session, batch_size: int) -> Query:
+    """
+    Повертає запит по всіх коментарях, що читається серверним курсором пачками batch_size.
+
+    :param db: SQLAlchemy сесія
+    :param batch_size: Кількість рядків, що вибираються з курсора за раз
+    :return: Query, ітерація якого не завантажує всю таблицю в пам'ять
+    """
+    return db.query(Comment).order_by(Comment.id).yield_per(batch_size)
@@ -1,13 +1,17 @@
 """
 hashtags.py — функції для роботи з хештегами у PhotoShare API.
 
-Містить CRUD-операції та методи для отримання тегів користувачів і загальних тегів.
+Містить CRUD-операції та методи для отримання тегів користувачів і загальних тегів,
+а також список популярних за останній час хештегів і підказки за префіксом.
 """
 
+from datetime import datetime, timedelta
 from typing import List
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from app.database.models import Hashtag, User
-from app.schemas import HashtagBase
+from app.database.models import Hashtag, Post, User, post_m2m_hashtag
+from app.schemas import HashtagBase, TrendingHashtag
+from app.services import post_cache, tag_suggest, trending
 
 
 async def create_tag(body: HashtagBase, user: User, db: Session) -> Hashtag:
@@ -28,6 +32,7 @@ async def create_tag(body: HashtagBase, user: User, db: Session) -> Hashtag:
         db.add(tag)
         db.commit()
         db.refresh(tag)
+        await tag_suggest.add_tag(tag.title)
     return tag
 
 
@@ -69,9 +74,14 @@ async def get_tag_by_id(tag_id: int, db: Session) -> Hashtag:
     return db.query(Hashtag).filter(Hashtag.id == tag_id).first()
 
 
+def _tagged_post_ids(tag_id: int, db: Session) -> List[int]:
+    """ID постів, до яких прикріплений хештег."""
+    return [post_id for (post_id,) in db.query(post_m2m_hashtag.c.post_id).filter(post_m2m_hashtag.c.hashtag_id == tag_id)]
+
+
 async def update_tag(tag_id: int, body: HashtagBase, db: Session) -> Hashtag | None:
     """
-    Оновлює назву хештегу за його ID.
+    Оновлює назву хештегу за його ID і скидає кеш постів, до яких він прикріплений.
 
     :param tag_id: ID тегу для оновлення
     :param body: Об'єкт HashtagBase з новою назвою
@@ -80,8 +90,12 @@ async def update_tag(tag_id: int, body: HashtagBase, db: Session) -> Hashtag | N
     """
     tag = db.query(Hashtag).filter(Hashtag.id == tag_id).first()
     if tag:
+        old_title = tag.title
         tag.title = body.title
         db.commit()
+        if old_title != tag.title:
+            await tag_suggest.rename_tag(old_title, tag.title)
+            await post_cache.invalidate(_tagged_post_ids(tag.id, db))
     return tag
 
 
@@ -95,6 +109,83 @@ async def remove_tag(tag_id: int, db: Session) -> Hashtag | None:
     """
     tag = db.query(Hashtag).filter(Hashtag.id == tag_id).first()
     if tag:
+        post_ids = _tagged_post_ids(tag.id, db)
         db.delete(tag)
         db.commit()
+        await tag_suggest.remove_tag(tag.title)
+        await post_cache.invalidate(post_ids)
     return tag
+
+
+async def get_trending_tags(window_hours: int, limit: int, db: Session) -> List[TrendingHashtag]:
+    """
+    Повертає найуживаніші хештеги за останні window_hours годин.
+
+    Основне джерело — погодинні лічильники в Redis; якщо вони недоступні,
+    топ рахується в БД за постами, створеними у вікні.
+
+    :param window_hours: Розмір вікна в годинах
+    :param limit: Кількість хештегів
+    :param db: SQLAlchemy сесія
+    :return: Список TrendingHashtag, від найпопулярнішого
+    """
+    top = await trending.top_hashtags(window_hours, limit)
+    if top is None:
+        uses = func.count(post_m2m_hashtag.c.post_id)
+        top = (
+            db.query(Hashtag.title, uses)
+            .join(post_m2m_hashtag, post_m2m_hashtag.c.hashtag_id == Hashtag.id)
+            .join(Post, Post.id == post_m2m_hashtag.c.post_id)
+            .filter(Post.created_at >= datetime.now() - timedelta(hours=window_hours))
+            .group_by(Hashtag.title)
+            .order_by(uses.desc(), Hashtag.title)
+            .limit(limit)
+            .all()
+        )
+    return [TrendingHashtag(title=title, uses=count) for title, count in top]
+
+
+def _usage_query(db: Session):
+    uses = func.count(post_m2m_hashtag.c.post_id)
+    query = (
+        db.query(Hashtag.title, uses)
+        .outerjoin(post_m2m_hashtag, post_m2m_hashtag.c.hashtag_id == Hashtag.id)
+        .group_by(Hashtag.title)
+    )
+    return query, uses
+
+
+async def build_suggest_index(db: Session) -> None:
+    """
+    Будує індекс автодоповнення з таблиці hashtags, якщо його ще немає в Redis.
+
+    Викликається при старті застосунку; далі індекс підтримується CRUD-операціями.
+
+    :param db: SQLAlchemy сесія
+    """
+    if await tag_suggest.is_built():
+        return
+    query, _ = _usage_query(db)
+    await tag_suggest.rebuild(query.all())
+
+
+async def suggest_tags(prefix: str, limit: int, db: Session) -> List[str]:
+    """
+    Повертає назви хештегів, що починаються з prefix, від найуживаніших.
+
+    :param prefix: Початок назви хештегу (без урахування регістру)
+    :param limit: Кількість підказок
+    :param db: SQLAlchemy сесія
+    :return: Список назв хештегів
+    """
+    titles = await tag_suggest.suggest(prefix, limit)
+    if titles is None:
+        query, uses = _usage_query(db)
+        rows = (
+            query.filter(func.lower(Hashtag.title).startswith(prefix.lower(), autoescape=True))
+            .order_by(uses.desc(), Hashtag.title)
+            .limit(limit)
+            .all()
+        )
+        titles = [title for title, _ in rows]
+    return titles
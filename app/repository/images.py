@@ -0,0 +1,159 @@
+"""
+images.py — функції для роботи із зображеннями постів та їхніми хешами у PhotoShare API.
+
+Кожне зображення в Cloudinary має запис ImageHash (SHA-256 і pHash вмісту). Однакові файли
+мають однаковий public_id, тож пости з тим самим файлом ділять одне зображення, а воно
+видаляється разом з останнім постом, що його використовує.
+
+Містить:
+- get_image: зображення за public_id
+- add_image: запис хешів нового зображення (з урахуванням одночасного завантаження того самого файлу)
+- release_images: звільнення зображень, яких більше не використовує жоден пост
+- referenced_images: public_id, на які ще посилається пост або запис ImageHash
+- posts_without_images: пости, для зображень яких ще немає запису ImageHash
+- similar_images: пошук схожих зображень за pHash
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.conf.config import settings
+from app.database.models import ImageHash, Post
+from app.services.image_hash import image_index
+
+
+def _hex(value: Optional[int]) -> Optional[str]:
+    return None if value is None else f"{value:016x}"
+
+
+async def get_image(public_id: str, db: Session, sha256: Optional[str] = None) -> ImageHash | None:
+    """
+    Повертає збережене зображення за public_id або, якщо передано sha256, за вмістом
+    (зображення старих постів, чий public_id не похідний від вмісту).
+
+    :param public_id: public_id зображення (похідний від SHA-256 вмісту)
+    :param db: SQLAlchemy сесія
+    :param sha256: SHA-256 вмісту
+    :return: ImageHash або None
+    """
+    condition = ImageHash.public_id == public_id
+    if sha256:
+        condition = or_(condition, ImageHash.sha256 == sha256)
+    return db.query(ImageHash).filter(condition).first()
+
+
+async def add_image(public_id: str, sha256: str, phash: Optional[int], image_url: str, variants: Optional[dict],
+                    db: Session) -> ImageHash:
+    """
+    Зберігає запис нового зображення і після коміту додає його pHash в індекс.
+
+    Якщо той самий файл одночасно завантажив інший запит (конфлікт public_id або sha256),
+    повертається вже збережений запис.
+
+    :param public_id: public_id зображення
+    :param sha256: SHA-256 вмісту
+    :param phash: pHash або None, якщо файл не розпізнано як зображення
+    :param image_url: URL оригіналу
+    :param variants: URL варіантів зображення
+    :param db: SQLAlchemy сесія
+    :return: Новий або вже наявний ImageHash
+    """
+    image = ImageHash(public_id=public_id, sha256=sha256, phash=_hex(phash), image_url=image_url, variants=variants)
+    db.add(image)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        existing = db.query(ImageHash).filter(
+            or_(ImageHash.public_id == public_id, ImageHash.sha256 == sha256)
+        ).first()
+        if existing is None:
+            raise
+        return existing
+    image_index.add(public_id, phash)
+    return image
+
+
+async def release_images(public_ids: List[str], db: Session) -> List[str]:
+    """
+    Відбирає public_id, на які вже не посилається жоден пост, і видаляє їхні записи ImageHash.
+
+    :param public_ids: public_id зображень видалених постів
+    :param db: SQLAlchemy сесія
+    :return: public_id, які можна видаляти з Cloudinary
+    """
+    public_ids = [public_id for public_id in dict.fromkeys(public_ids) if public_id]
+    if not public_ids:
+        return []
+    used = set(db.scalars(select(Post.public_id).where(Post.public_id.in_(public_ids))))
+    unused = [public_id for public_id in public_ids if public_id not in used]
+    if unused:
+        db.query(ImageHash).filter(ImageHash.public_id.in_(unused)).delete(synchronize_session=False)
+        db.commit()
+        for public_id in unused:
+            image_index.remove(public_id)
+    return unused
+
+
+async def referenced_images(public_ids: Iterable[str], db: Session) -> Set[str]:
+    """
+    Відбирає public_id, які ще використовуються: на них посилається пост або запис ImageHash
+    (наприклад, той самий файл завантажили знову після того, як його поставили в чергу на видалення).
+
+    :param public_ids: public_id зображень
+    :param db: SQLAlchemy сесія
+    :return: public_id, які не можна видаляти з Cloudinary
+    """
+    public_ids = list(public_ids)
+    if not public_ids:
+        return set()
+    used = set(db.scalars(select(Post.public_id).where(Post.public_id.in_(public_ids))))
+    used.update(db.scalars(select(ImageHash.public_id).where(ImageHash.public_id.in_(public_ids))))
+    return used
+
+
+async def posts_without_images(after_id: int, limit: int, db: Session) -> List[Tuple[int, str, str, Optional[dict]]]:
+    """
+    Пости, створені до появи таблиці image_hashes (або до того, як її заповнили), у порядку ID.
+
+    :param after_id: ID, після якого шукати (пагінація за ключем)
+    :param limit: Максимальна кількість постів
+    :param db: SQLAlchemy сесія
+    :return: Список (ID поста, public_id, URL зображення, варіанти)
+    """
+    rows = db.execute(
+        select(Post.id, Post.public_id, Post.image_url, Post.variants)
+        .where(Post.id > after_id, Post.public_id.is_not(None), Post.image_url.is_not(None))
+        .where(~select(ImageHash.public_id).where(ImageHash.public_id == Post.public_id).exists())
+        .order_by(Post.id)
+        .limit(limit)
+    ).all()
+    return [tuple(row) for row in rows]
+
+
+async def similar_images(public_id: str, max_distance: int, db: Session) -> Dict[str, int]:
+    """
+    Шукає зображення, pHash яких відрізняється від pHash зображення public_id
+    не більше ніж на max_distance бітів.
+
+    :param public_id: public_id зображення
+    :param max_distance: Максимальна відстань Хеммінга
+    :param db: SQLAlchemy сесія
+    :return: Відстань за public_id (без самого зображення) від найближчих
+    """
+    image = await get_image(public_id, db)
+    if image is None or image.phash is None:
+        return {}
+    if image_index.is_stale(settings.image_index_ttl):
+        image_index.rebuild(
+            (key, int(value, 16))
+            for key, value in db.query(ImageHash.public_id, ImageHash.phash).filter(ImageHash.phash.isnot(None))
+        )
+    return {
+        key: distance
+        for key, distance in image_index.search(int(image.phash, 16), max_distance)
+        if key != public_id
+    }
@@ -4,18 +4,21 @@ posts.py — функції для роботи з постами у PhotoShare
 Містить CRUD-операції над постами, пошук за ключовими словами та хештегами, а також роботу з Cloudinary.
 """
 
-from typing import List
-from datetime import datetime
+from typing import List, Optional
+from datetime import datetime, timezone
 from fastapi import Request, UploadFile, HTTPException
-from faker import Faker
-from sqlalchemy import and_, func, or_
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, distinct, func, or_, select
+from sqlalchemy.orm import Query, Session, selectinload
 import cloudinary
 import cloudinary.uploader
 
-from app.conf.config import init_cloudinary
-from app.database.models import Post, Hashtag, User, Comment, UserRoleEnum
-from app.schemas import PostUpdate
+from app.conf.config import init_cloudinary, settings
+from app.database.models import Post, Hashtag, User, Comment, Follow, UserRoleEnum, post_m2m_hashtag
+from app.repository.comments import comments_page
+from app.repository import images as repository_images
+from app.repository.users import username_match_clause
+from app.schemas import CommentPage, HashtagMatchEnum, PostResponse, PostSearch, PostSortEnum, PostUpdate, SimilarPost
+from app.services import cloudinary_cleanup, comment_cache, feed, image_hash, image_variants, leaderboard, post_cache, tag_suggest, trending, upload_validation, uploads
 
 # Ініціалізація Cloudinary один раз
 init_cloudinary()
@@ -35,6 +38,12 @@ async def create_post(
 ) -> Post:
     """
     Створює новий пост з завантаженим зображенням у Cloudinary та додає хештеги.
+    Файл спершу перевіряється (формат, розмір, розміри в пікселях) — app.services.upload_validation.
+    Під час завантаження генеруються варіанти зображення (thumb / medium / large × jpg / webp / avif).
+
+    public_id зображення — хеш його вмісту, тож якщо такий самий файл уже використовує
+    інший пост, зображення не завантажується вдруге, а пост отримує ті самі URL.
+    Для нового зображення зберігаються його SHA-256 і pHash (app.repository.images).
 
     :param request: FastAPI Request об'єкт
     :param title: Заголовок поста
@@ -44,25 +53,44 @@ async def create_post(
     :param db: SQLAlchemy сесія
     :param current_user: Поточний користувач
     :return: Створений об'єкт Post
+    :raises HTTPException: 400, якщо хештегів більше 5; 415 / 413, якщо файл не пройшов перевірку
     """
-    public_id = Faker().first_name()
-    upload_result = cloudinary.uploader.upload(file.file, public_id=public_id, overwrite=True)
-    url = upload_result.get("secure_url")
+    # хештеги перевіряються до завантаження, щоб відхилений пост не лишав зображення в Cloudinary
+    all_tags = []
+    for item in hashtags or []:
+        all_tags.extend([tag.strip() for tag in item.split(",") if tag.strip()])
+    if len(all_tags) > 5:
+        raise HTTPException(status_code=400, detail="You can only add up to 5 hashtags per post")
+
+    image = await upload_validation.validate_image(file.file)
+    public_id = uploads.content_public_id(image.sha256)
+    # зображення могло чекати на видалення після видалення попереднього поста з ним
+    await cloudinary_cleanup.discard([public_id])
+    # за sha256 знаходяться й зображення старих постів, чий public_id не похідний від вмісту
+    existing = await repository_images.get_image(public_id, db, sha256=image.sha256)
+    if existing:
+        public_id, url, variants = existing.public_id, existing.image_url, existing.variants
+    else:
+        phash = await image_hash.phash_file(file.file)
+        upload_result = await uploads.upload(
+            file.file, public_id=public_id, overwrite=True, **image_variants.upload_options()
+        )
+        url = upload_result.get("secure_url")
+        variants = await image_variants.build_variants(public_id, upload_result, file.file, request)
+        # якщо той самий файл одночасно зберіг інший запит, пост використовує його зображення
+        stored = await repository_images.add_image(public_id, image.sha256, phash, url, variants, db)
+        if stored.public_id != public_id:
+            await cloudinary_cleanup.enqueue([public_id])
+        public_id, url, variants = stored.public_id, stored.image_url, stored.variants
 
     # tag_objs = []
     # if hashtags:
     #     tag_objs = get_hashtags([tag.strip() for tag in hashtags[0].split(",")], current_user, db)
-    tag_objs = []
-    if hashtags:
-        all_tags = []
-        for item in hashtags:
-            all_tags.extend([tag.strip() for tag in item.split(",") if tag.strip()])
-        if len(all_tags) > 5:
-            raise HTTPException(status_code=400, detail="You can only add up to 5 hashtags per post")
-        tag_objs = get_hashtags(all_tags, current_user, db)
+    tag_objs = get_hashtags(all_tags, current_user, db) if all_tags else []
 
     post = Post(
         image_url=url,
+        variants=variants,
         title=title,
         descr=descr,
         created_at=datetime.now(),
@@ -74,9 +102,105 @@ async def create_post(
     db.add(post)
     db.commit()
     db.refresh(post)
+    await trending.record_usage(tag.title for tag in post.hashtags)
+    await tag_suggest.record_usage(tag.title for tag in post.hashtags)
+    await fan_out_post(post, db)
     return post
 
 
+def _followed_authors(user_id: int, celebrities: bool):
+    """Підзапит ID авторів, на яких підписаний користувач (лише «зірки» або лише звичайні)."""
+    threshold = settings.feed_celebrity_threshold
+    popular = User.followers_count > threshold if celebrities else User.followers_count <= threshold
+    return (
+        select(Follow.followed_id)
+        .join(User, User.id == Follow.followed_id)
+        .where(Follow.follower_id == user_id, popular)
+    )
+
+
+async def fan_out_post(post: Post, db: Session) -> None:
+    """
+    Розсилає новий пост по стрічках підписників автора (fan-out-on-write).
+
+    Пости авторів з більш ніж FEED_CELEBRITY_THRESHOLD підписниками не розсилаються:
+    їх стрічка підтягує при читанні.
+
+    :param post: Новий пост
+    :param db: SQLAlchemy сесія
+    """
+    follower_ids = db.scalars(
+        select(Follow.follower_id)
+        .join(User, User.id == Follow.followed_id)
+        .where(Follow.followed_id == post.user_id, User.followers_count <= settings.feed_celebrity_threshold)
+    ).all()
+    if follower_ids:
+        await feed.push_post(post.id, follower_ids)
+
+
+async def get_posts_by_ids(post_ids: List[int], db: Session) -> List[PostResponse]:
+    """
+    Гідрує пости за списком ID у порядку вхідного списку.
+
+    Спершу пости читаються з кешу Redis одним MGET; відсутні в кеші завантажуються з БД
+    одним запитом (хештеги — одним додатковим запитом), серіалізуються й кладуться в кеш.
+    Відсутні (видалені) пости пропускаються.
+
+    :param post_ids: ID постів
+    :param db: SQLAlchemy сесія
+    :return: Список PostResponse
+    """
+    if not post_ids:
+        return []
+    found = await post_cache.get_many(post_ids)
+    missing = [post_id for post_id in dict.fromkeys(post_ids) if post_id not in found]
+    if missing:
+        loaded = [
+            PostResponse.model_validate(post)
+            for post in db.query(Post).options(selectinload(Post.hashtags)).filter(Post.id.in_(missing))
+        ]
+        await post_cache.set_many(loaded)
+        found.update((post.id, post) for post in loaded)
+    return [found[post_id] for post_id in post_ids if post_id in found]
+
+
+async def get_feed(user: User, skip: int, limit: int, db: Session) -> List[PostResponse]:
+    """
+    Повертає сторінку стрічки підписок користувача, від найновіших постів.
+
+    ID постів звичайних авторів беруться з Redis (або збираються з БД, якщо стрічки там немає),
+    пости «зірок» підтягуються окремим запитом при читанні; обидва списки зливаються
+    за ID (ID зростають разом з часом створення), а пости сторінки гідруються get_posts_by_ids.
+
+    :param user: Поточний користувач
+    :param skip: Кількість пропущених постів
+    :param limit: Розмір сторінки
+    :param db: SQLAlchemy сесія
+    :return: Список PostResponse
+    """
+    count = skip + limit
+    pushed = await feed.read_feed(user.id, count)
+    if pushed is None:
+        pushed = db.scalars(
+            select(Post.id)
+            .where(Post.user_id.in_(_followed_authors(user.id, celebrities=False)))
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .limit(settings.feed_max_length)
+        ).all()
+        await feed.store_feed(user.id, pushed)
+        pushed = pushed[:count]
+
+    pulled = db.scalars(
+        select(Post.id)
+        .where(Post.user_id.in_(_followed_authors(user.id, celebrities=True)))
+        .order_by(Post.created_at.desc(), Post.id.desc())
+        .limit(count)
+    ).all()
+
+    page = sorted(set(pushed) | set(pulled), reverse=True)[skip:count]
+    return await get_posts_by_ids(page, db)
+
+
 async def get_all_posts(skip: int, limit: int, db: Session) -> List[Post]:
     """
     Повертає всі пости з пагінацією.
@@ -89,6 +213,19 @@ async def get_all_posts(skip: int, limit: int, db: Session) -> List[Post]:
     return db.query(Post).offset(skip).limit(limit).all()
 
 
+def iter_posts(db: Session, batch_size: int) -> Query:
+    """
+    Повертає запит по всіх постах (з хештегами), що читається серверним курсором пачками batch_size.
+
+    Хештеги довантажуються selectinload одним запитом на кожну пачку, а не на кожен пост.
+
+    :param db: SQLAlchemy сесія
+    :param batch_size: Кількість рядків, що вибираються з курсора за раз
+    :return: Query, ітерація якого не завантажує всю таблицю в пам'ять
+    """
+    return db.query(Post).options(selectinload(Post.hashtags)).order_by(Post.id).yield_per(batch_size)
+
+
 async def get_my_posts(skip: int, limit: int, user: User, db: Session) -> List[Post]:
     """
     Повертає всі пости поточного користувача.
@@ -139,16 +276,20 @@ async def get_posts_by_user_id(user_id: int, db: Session) -> List[Post]:
 
 async def get_posts_by_username(user_name: str, db: Session) -> List[Post]: 
     """
-    Повертає всі пости користувача за його username.
+    Повертає пости всіх користувачів, username яких схожий на запит (триграмний пошук),
+    а не лише першого знайденого. Пости вибираються одним запитом.
 
     :param user_name: Username користувача
     :param db: SQLAlchemy сесія
-    :return: Список об'єктів Post
+    :return: Список об'єктів Post, від найновіших
     """
-    searched_user = db.query(User).filter(func.lower(User.username).like(f'%{user_name.lower()}%')).first()
-    if searched_user:
-        return db.query(Post).filter(Post.user_id == searched_user.id).all()
-    return []
+    return (
+        db.query(Post)
+        .filter(username_match_clause(user_name, db))
+        .options(selectinload(Post.hashtags))
+        .order_by(Post.created_at.desc(), Post.id.desc())
+        .all()
+    )
 
 
 async def get_posts_with_hashtag(hashtag_name: str, db: Session) -> List[Post]: 
@@ -162,15 +303,32 @@ async def get_posts_with_hashtag(hashtag_name: str, db: Session) -> List[Post]:
     return db.query(Post).join(Post.hashtags).filter(Hashtag.title == hashtag_name).all()
 
 
-async def get_post_comments(post_id: int, db: Session) -> List[Comment]: 
+async def get_post_comments(post_id: int, db: Session, limit: Optional[int] = None,
+                            cursor: Optional[str] = None) -> CommentPage:
     """
-    Повертає коментарі для конкретного поста.
+    Повертає сторінку коментарів для конкретного поста.
+
+    Перша сторінка береться з кешу Redis, якщо він є; наступні — keyset-запитом
+    по індексу (post_id, created_at). Прочитана з БД перша сторінка кешується лише тоді,
+    коли коментарі поста не змінилися під час читання (comment_cache.get_version).
 
     :param post_id: ID поста
     :param db: SQLAlchemy сесія
-    :return: Список об'єктів Comment
+    :param limit: Розмір сторінки (за замовчуванням settings.comments_page_size)
+    :param cursor: Курсор попередньої сторінки або None для першої
+    :return: CommentPage
     """
-    return db.query(Comment).filter(Comment.post_id == post_id).all()
+    limit = limit or settings.comments_page_size
+    if cursor is not None:
+        return comments_page(Comment.post_id == post_id, limit, cursor, db)
+    page = await comment_cache.get_first_page(post_id, limit)
+    if page is not None:
+        return page
+    # версія читається до БД: якщо коментарі зміняться під час читання, сторінка не потрапить у кеш
+    version = await comment_cache.get_version(post_id)
+    page = comments_page(Comment.post_id == post_id, limit, None, db)
+    await comment_cache.set_first_page(post_id, limit, page, version)
+    return page
 
 
 def get_hashtags(hashtag_titles: list, user: User, db: Session):
@@ -208,6 +366,86 @@ async def get_post_by_keyword(keyword: str, db: Session) -> List[Post]:
     )).all()
 
 
+async def search_posts(filters: PostSearch, skip: int, limit: int, db: Session) -> List[Post]:
+    """
+    Пошук постів за комбінацією фільтрів одним SQL-запитом.
+
+    Хештеги перевіряються підзапитом по post_m2m_hashtag: для match=any достатньо
+    одного збігу, для match=all пост має містити всі хештеги (HAVING COUNT).
+    Хештеги знайдених постів довантажуються одним додатковим запитом (selectinload).
+
+    :param filters: Фільтри пошуку (PostSearch)
+    :param skip: Кількість пропущених постів
+    :param limit: Ліміт постів для повернення
+    :param db: SQLAlchemy сесія
+    :return: Список об'єктів Post
+    """
+    query = db.query(Post)
+
+    titles = sorted({title.strip() for title in filters.hashtags if title.strip()})
+    if titles:
+        tagged = (
+            select(post_m2m_hashtag.c.post_id)
+            .join(Hashtag, Hashtag.id == post_m2m_hashtag.c.hashtag_id)
+            .where(Hashtag.title.in_(titles))
+        )
+        if filters.match == HashtagMatchEnum.all:
+            tagged = tagged.group_by(post_m2m_hashtag.c.post_id).having(
+                func.count(distinct(post_m2m_hashtag.c.hashtag_id)) == len(titles)
+            )
+        query = query.filter(Post.id.in_(tagged))
+
+    if filters.keyword:
+        keyword = filters.keyword.lower()
+        query = query.filter(or_(
+            func.lower(Post.title).contains(keyword, autoescape=True),
+            func.lower(Post.descr).contains(keyword, autoescape=True),
+        ))
+    if filters.author:
+        query = query.filter(Post.user_id.in_(select(User.id).where(User.username == filters.author)))
+    if filters.date_from:
+        query = query.filter(Post.created_at >= filters.date_from)
+    if filters.date_to:
+        query = query.filter(Post.created_at <= filters.date_to)
+    if filters.min_rating is not None:
+        query = query.filter(Post.avg_rating >= filters.min_rating)
+
+    if filters.sort == PostSortEnum.top_rated:
+        query = query.order_by(Post.rating_score.desc().nullslast(), Post.id.desc())
+    else:
+        query = query.order_by(Post.created_at.desc(), Post.id.desc())
+
+    return query.options(selectinload(Post.hashtags)).offset(skip).limit(limit).all()
+
+
+async def get_similar_posts(post_id: int, max_distance: int, limit: int, db: Session) -> List[SimilarPost] | None:
+    """
+    Шукає дублікати зображення поста: пости з тим самим зображенням (відстань 0)
+    і пости зі схожими зображеннями за pHash (BK-дерево, app.services.image_hash).
+
+    :param post_id: ID поста
+    :param max_distance: Максимальна відстань Хеммінга між pHash
+    :param limit: Максимальна кількість постів
+    :param db: SQLAlchemy сесія
+    :return: Пости з відстанню від найближчих або None, якщо поста немає
+    """
+    post = db.query(Post).filter(Post.id == post_id).first()
+    if post is None:
+        return None
+    distances = {post.public_id: 0, **await repository_images.similar_images(post.public_id, max_distance, db)}
+    found = (
+        db.query(Post)
+        .options(selectinload(Post.hashtags))
+        .filter(Post.public_id.in_(distances), Post.id != post_id)
+        .all()
+    )
+    found.sort(key=lambda item: (distances[item.public_id], item.id))
+    return [
+        SimilarPost(distance=distances[item.public_id], post=PostResponse.model_validate(item))
+        for item in found[:limit]
+    ]
+
+
 async def update_post(post_id: int, body: PostUpdate, user: User, db: Session) -> Post | None:
     """
     Оновлює пост користувача або адміністраторський пост.
@@ -220,6 +458,7 @@ async def update_post(post_id: int, body: PostUpdate, user: User, db: Session) -
     """
     post = db.query(Post).filter(Post.id == post_id).first()
     if post and (user.role == UserRoleEnum.admin or post.user_id == user.id):
+        old_tags = {tag.title for tag in post.hashtags}
         # оновлюємо хештеги лише якщо вони присутні
         if body.hashtags is not None:
             post.hashtags = get_hashtags(body.hashtags, user, db)
@@ -234,6 +473,13 @@ async def update_post(post_id: int, body: PostUpdate, user: User, db: Session) -
         post.done = True
         db.commit()
         db.refresh(post)
+
+        new_tags = {tag.title for tag in post.hashtags}
+        await post_cache.invalidate([post.id])
+        await trending.record_usage(new_tags - old_tags)
+        await tag_suggest.record_usage(new_tags - old_tags, old_tags - new_tags)
+        if new_tags != old_tags and post.rating_count:
+            await leaderboard.update_post(post.id, post.rating_score, new_tags, old_tags - new_tags)
     return post
     # post = db.query(Post).filter(Post.id == post_id).first()
     # if post and (user.role == UserRoleEnum.admin or post.user_id == user.id):
@@ -251,7 +497,9 @@ async def update_post(post_id: int, body: PostUpdate, user: User, db: Session) -
 
 async def remove_post(post_id: int, user: User, db: Session) -> Post | None:
     """
-    Видаляє пост користувача або адміністраторський пост та його файл з Cloudinary.
+    Видаляє пост користувача або адміністраторський пост.
+    Коментарі й оцінки видаляє каскадом БД, а зображення, якщо його не використовує
+    інший пост, ставиться в чергу на видалення з Cloudinary (app.services.cloudinary_cleanup).
 
     :param post_id: ID поста
     :param user: Поточний користувач
@@ -260,7 +508,17 @@ async def remove_post(post_id: int, user: User, db: Session) -> Post | None:
     """
     post = db.query(Post).filter(Post.id == post_id).first()
     if post and (user.role == UserRoleEnum.admin or post.user_id == user.id):
-        cloudinary.uploader.destroy(post.public_id)
+        tags = [tag.title for tag in post.hashtags]
+        created_at = post.created_at
         db.delete(post)
         db.commit()
+        for public_id in await repository_images.release_images([post.public_id], db):
+            await cloudinary_cleanup.enqueue([public_id])
+            image_variants.delete_variants(public_id)
+        await leaderboard.remove_post(post.id, tags)
+        await tag_suggest.record_usage([], tags)
+        if created_at:
+            await trending.forget_usage(tags, created_at.replace(tzinfo=timezone.utc).timestamp())
+        await comment_cache.invalidate([post.id])
+        await post_cache.invalidate([post.id])
     return post
@@ -2,51 +2,116 @@
 ratings.py — функції для роботи з оцінками (rating) постів у PhotoShare API.
 
 Містить CRUD-операції над рейтингами, перевірку прав користувача і обмеження голосування.
+Агрегати поста (rating_sum, rating_count, avg_rating, rating_score) оновлюються інкрементально
+в тій самій транзакції, що й сам рейтинг, а таблиці лідерів у Redis — після коміту.
 """
 
-from typing import Type
+from collections import defaultdict
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple, Type
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.orm import Query, Session, selectinload
+from sqlalchemy import and_, func
+from sqlalchemy.dialects import postgresql, sqlite
 from starlette import status
+from starlette.concurrency import run_in_threadpool
 
-from app.database.models import Rating, User, Post, UserRoleEnum
+from app.database.models import Rating, User, Post, Hashtag, UserRoleEnum, post_m2m_hashtag
+from app.repository.posts import get_posts_by_ids
 from app.conf import messages as message
+from app.schemas import ImportReport, PostResponse, RatingImportModel
+from app.services import leaderboard, post_cache
+from app.services.ndjson import parse_chunk, record_error
 
+# INSERT з підтримкою ON CONFLICT для діалектів, з якими працює проєкт
+_DIALECT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
 
-async def create_rate(post_id: int, rate: int, db: Session, user: User) -> Rating:
+
+def _apply_rating_delta(post_id: int, sum_delta: int, count_delta: int, db: Session) -> None:
+    """
+    Атомарно змінює агрегати рейтингу поста одним UPDATE без перерахунку по таблиці ratings.
+
+    :param post_id: ID поста
+    :param sum_delta: Зміна суми оцінок
+    :param count_delta: Зміна кількості оцінок
+    :param db: SQLAlchemy сесія
+    """
+    new_sum = Post.rating_sum + sum_delta
+    new_count = Post.rating_count + count_delta
+    db.query(Post).filter(Post.id == post_id).update({
+        Post.rating_sum: new_sum,
+        Post.rating_count: new_count,
+        Post.avg_rating: new_sum * 1.0 / func.nullif(new_count, 0),
+        Post.rating_score: leaderboard.bayesian_score(new_sum, new_count),
+        Post.updated_at: Post.updated_at,  # оцінка не є редагуванням поста
+    }, synchronize_session=False)
+
+
+async def _sync_leaderboard(post: Optional[Post]) -> None:
+    """
+    Переносить актуальний rating_score поста в таблиці лідерів Redis
+    і скидає його закешовану серіалізацію.
+
+    :param post: Пост, агрегати якого щойно змінилися (після коміту)
+    """
+    if post:
+        await post_cache.invalidate([post.id])
+        score = post.rating_score if post.rating_count else None
+        await leaderboard.update_post(post.id, score, [tag.title for tag in post.hashtags])
+
+
+def _insert_rating(post_id: int, rate: int, user: User, db: Session) -> Optional[Rating]:
+    """
+    Вставляє рейтинг через INSERT ... ON CONFLICT (post_id, user_id) DO NOTHING RETURNING.
+
+    Повторний голос відхиляє унікальний індекс uq_ratings_post_user, а не попередній SELECT,
+    тому два паралельні запити одного користувача не створять дві оцінки.
+
+    :return: Створений об'єкт Rating або None, якщо користувач уже голосував
+    """
+    insert = _DIALECT_INSERTS[db.get_bind().dialect.name]
+    stmt = (
+        insert(Rating)
+        .values(post_id=post_id, rate=rate, user_id=user.id)
+        .on_conflict_do_nothing(index_elements=[Rating.post_id, Rating.user_id])
+        .returning(Rating)
+    )
+    return db.scalars(stmt).first()
+
+
+async def create_rate(post_id: int, rate: int, db: Session, user: User) -> Rating | None:
     """
     Створює новий рейтинг для поста користувача.
 
     Перевіряє:
     - користувач не може оцінювати власний пост,
-    - користувач не може голосувати двічі за один пост.
+    - користувач не може голосувати двічі за один пост (унікальний індекс у БД).
 
     :param post_id: ID поста
-    :param rate: Значення рейтингу (1 або -1)
+    :param rate: Значення рейтингу від 1 до 5
     :param db: SQLAlchemy сесія
     :param user: Поточний користувач
-    :return: Створений об'єкт Rating
+    :return: Створений об'єкт Rating або None, якщо поста не існує
     :raises HTTPException: Якщо пост власний або вже оцінений користувачем
     """
-    is_self_post = db.query(Post).filter(and_(Post.id == post_id, Post.user_id == user.id)).first()
-    already_voted = db.query(Rating).filter(and_(Rating.post_id == post_id, Rating.user_id == user.id)).first()
-    post_exists = db.query(Post).filter(Post.id == post_id).first()
-
-    if is_self_post:
+    post = db.query(Post).filter(Post.id == post_id).first()
+    if post is None:
+        return None
+    if post.user_id == user.id:
         raise HTTPException(status_code=status.HTTP_423_LOCKED, detail=message.OWN_POST)
-    elif already_voted:
+
+    new_rate = _insert_rating(post_id, rate, user, db)
+    if new_rate is None:
+        db.rollback()
         raise HTTPException(status_code=status.HTTP_423_LOCKED, detail=message.VOTE_TWICE)
-    elif post_exists:
-        new_rate = Rating(
-            post_id=post_id,
-            rate=rate,
-            user_id=user.id
-        )
-        db.add(new_rate)
-        db.commit()
-        db.refresh(new_rate)
-        return new_rate
+
+    _apply_rating_delta(post_id, rate, 1, db)
+    db.commit()
+    await _sync_leaderboard(post)
+    return new_rate
 
 
 async def edit_rate(rate_id: int, new_rate: int, db: Session, user: User) -> Type[Rating] | None:
@@ -65,8 +130,10 @@ async def edit_rate(rate_id: int, new_rate: int, db: Session, user: User) -> Typ
     """
     rate = db.query(Rating).filter(Rating.id == rate_id).first()
     if rate and (user.role in [UserRoleEnum.admin, UserRoleEnum.moder] or rate.user_id == user.id):
+        _apply_rating_delta(rate.post_id, new_rate - rate.rate, 0, db)
         rate.rate = new_rate
         db.commit()
+        await _sync_leaderboard(rate.post)
     return rate
 
 
@@ -81,11 +148,94 @@ async def delete_rate(rate_id: int, db: Session, user: User) -> Type[Rating] | N
     """
     rate = db.query(Rating).filter(Rating.id == rate_id).first()
     if rate:
+        post = rate.post
+        _apply_rating_delta(rate.post_id, -rate.rate, -1, db)
         db.delete(rate)
         db.commit()
+        await _sync_leaderboard(post)
     return rate
 
 
+async def import_ratings(chunks: AsyncIterator[List[Tuple[int, str]]], db: Session) -> ImportReport:
+    """
+    Масовий імпорт рейтингів з NDJSON.
+
+    Кожна пачка рядків валідується, перевіряється двома запитами (існування постів
+    і користувачів), вставляється одним executemany з ON CONFLICT DO NOTHING, після чого
+    агрегати кожного зачепленого поста оновлюються одним UPDATE на пачку.
+
+    :param chunks: Асинхронний ітератор пачок [(номер_рядка, рядок), ...]
+    :param db: SQLAlchemy сесія
+    :return: ImportReport з кількістю імпортованих рядків та помилками по рядках
+    """
+    report = ImportReport()
+    insert = _DIALECT_INSERTS[db.get_bind().dialect.name]
+    stmt = (
+        insert(Rating)
+        .on_conflict_do_nothing(index_elements=[Rating.post_id, Rating.user_id])
+        .returning(Rating.post_id, Rating.user_id)
+    )
+
+    async for chunk in chunks:
+        rows = parse_chunk(chunk, RatingImportModel, report)
+        if not rows:
+            continue
+        post_authors = dict(db.query(Post.id, Post.user_id).filter(Post.id.in_({r.post_id for _, r in rows})).all())
+        user_ids = {uid for (uid,) in db.query(User.id).filter(User.id.in_({r.user_id for _, r in rows}))}
+
+        params, lines, seen = [], {}, set()
+        for line_no, row in rows:
+            key = (row.post_id, row.user_id)
+            if row.post_id not in post_authors:
+                record_error(report, line_no, message.NO_POST_ID)
+            elif row.user_id not in user_ids:
+                record_error(report, line_no, message.NO_USER_ID)
+            elif post_authors[row.post_id] == row.user_id:
+                record_error(report, line_no, message.OWN_POST)
+            elif key in seen:
+                record_error(report, line_no, message.VOTE_TWICE)
+            else:
+                seen.add(key)
+                lines[key] = (line_no, row.rate)
+                params.append({
+                    "post_id": row.post_id,
+                    "user_id": row.user_id,
+                    "rate": row.rate,
+                    "created_at": row.created_at or datetime.now(),
+                })
+        if not params:
+            continue
+
+        inserted = set(db.execute(stmt, params).all())
+        deltas = defaultdict(lambda: [0, 0])
+        for key, (line_no, rate) in lines.items():
+            if key in inserted:
+                deltas[key[0]][0] += rate
+                deltas[key[0]][1] += 1
+            else:
+                record_error(report, line_no, message.VOTE_TWICE)
+        for post_id, (sum_delta, count_delta) in deltas.items():
+            _apply_rating_delta(post_id, sum_delta, count_delta, db)
+        db.commit()
+        report.imported += len(inserted)
+
+        touched = db.query(Post).options(selectinload(Post.hashtags)).filter(Post.id.in_(deltas.keys())).all()
+        for post in touched:
+            await _sync_leaderboard(post)
+    return report
+
+
+def iter_ratings(db: Session, batch_size: int) -> Query:
+    """
+    Повертає запит по всіх рейтингах, що читається серверним курсором пачками batch_size.
+
+    :param db: SQLAlchemy сесія
+    :param batch_size: Кількість рядків, що вибираються з курсора за раз
+    :return: Query, ітерація якого не завантажує всю таблицю в пам'ять
+    """
+    return db.query(Rating).order_by(Rating.id).yield_per(batch_size)
+
+
 async def show_ratings(db: Session, user: User) -> list[Type[Rating]]:
     """
     Повертає список усіх рейтингів у системі.
@@ -120,3 +270,55 @@ async def user_rate_post(user_id: int, post_id: int, db: Session, user: User) ->
     :return: Об'єкт Rating або None, якщо рейтинг не знайдено
     """
     return db.query(Rating).filter(and_(Rating.post_id == post_id, Rating.user_id == user_id)).first()
+
+
+def _leaderboard_rows(db: Session) -> List[Tuple[int, float, List[str]]]:
+    hashtags = defaultdict(list)
+    for post_id, title in (
+        db.query(post_m2m_hashtag.c.post_id, Hashtag.title)
+        .join(Hashtag, Hashtag.id == post_m2m_hashtag.c.hashtag_id)
+        .join(Post, Post.id == post_m2m_hashtag.c.post_id)
+        .filter(Post.rating_count > 0)
+    ):
+        hashtags[post_id].append(title)
+    scores = db.query(Post.id, Post.rating_score).filter(Post.rating_count > 0)
+    return [(post_id, score, hashtags[post_id]) for post_id, score in scores]
+
+
+async def build_leaderboards(db: Session) -> None:
+    """
+    Будує таблиці лідерів у Redis з posts.rating_score, якщо їх ще не побудовано.
+
+    Викликається при старті застосунку і задачею обслуговування leaderboards (після очищення Redis);
+    будує лише той процес, що взяв lock. Читання всіх оцінених постів виконується в пулі потоків.
+
+    :param db: SQLAlchemy сесія
+    """
+    if await leaderboard.is_built() or not await leaderboard.lock_rebuild():
+        return
+    await leaderboard.rebuild(await run_in_threadpool(_leaderboard_rows, db))
+
+
+async def get_top_posts(skip: int, limit: int, hashtag: Optional[str], db: Session) -> List[PostResponse]:
+    """
+    Повертає сторінку постів з найвищою байєсівською оцінкою.
+
+    Порядок береться з таблиці лідерів у Redis, а пости гідруються posts.get_posts_by_ids.
+    Якщо таблиці в Redis не побудовані, ID сторінки вибираються з БД за індексом posts.rating_score;
+    самі таблиці будує задача обслуговування leaderboards, а не запит користувача.
+
+    :param skip: Кількість пропущених постів
+    :param limit: Розмір сторінки
+    :param hashtag: Назва хештегу для тематичної таблиці (None — глобальна)
+    :param db: SQLAlchemy сесія
+    :return: Пости у порядку спадання оцінки
+    """
+    post_ids = await leaderboard.top_post_ids(skip, limit, hashtag)
+    if post_ids is None:
+        query = db.query(Post.id).filter(Post.rating_count > 0)
+        if hashtag:
+            query = query.join(Post.hashtags).filter(Hashtag.title == hashtag)
+        rows = query.order_by(Post.rating_score.desc(), Post.id.desc()).offset(skip).limit(limit)
+        post_ids = [post_id for post_id, in rows]
+
+    return await get_posts_by_ids(post_ids, db)
@@ -13,9 +13,10 @@ import cloudinary
 import pyqrcode
 
 from app.database.models import Post, User
-from app.conf.config import init_cloudinary
+from app.conf.config import QRCODES_DIR, init_cloudinary
 from app.tramsform_schemas import TransformBodyModel
 from app.conf.messages import NOT_FOUND
+from app.services import post_cache
 
 
 async def transform_metod(post_id: int, body: TransformBodyModel, user: User, db: Session) -> Post | None:
@@ -88,6 +89,7 @@ async def transform_metod(post_id: int, body: TransformBodyModel, user: User, db
             )
             post.transform_url = url
             db.commit()
+            await post_cache.invalidate([post.id])
 
         return post
 
@@ -105,17 +107,15 @@ async def show_qr(post_id: int, user: User, db: Session, request: Request) -> di
     post = db.query(Post).filter(Post.user_id == user.id, Post.id == post_id).first()
     if post and post.transform_url:
         # Створюємо директорію для QR-кодів
-        qr_dir = "media/qrcodes"
-        os.makedirs(qr_dir, exist_ok=True)
+        os.makedirs(QRCODES_DIR, exist_ok=True)
 
         # Генеруємо QR-код
         img = pyqrcode.create(post.transform_url)
-        qr_path = f"{qr_dir}/{post.id}.png"
-        img.png(qr_path, scale=6)
+        img.png(os.path.join(QRCODES_DIR, f"{post.id}.png"), scale=6)
 
-        # Формуємо повний URL
+        # Формуємо повний URL (QRCODES_DIR віддається через /media/qrcodes)
         base_url = str(request.base_url).rstrip("/")
-        qr_url = f"{base_url}/{qr_path}"
+        qr_url = f"{base_url}/media/qrcodes/{post.id}.png"
         return {"qr_url": qr_url}
 
     return None
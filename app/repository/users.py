@@ -6,19 +6,24 @@ users.py — функції для роботи з користувачами т
 - Управління аватарками через Cloudinary
 - Робота з ролями, блокуванням та підтвердженням email
 - Робота з чорним списком JWT токенів
+- Підписки між користувачами (follow / unfollow)
 """
 
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Optional
 
 import cloudinary
-import cloudinary.uploader
-from sqlalchemy import func
-from sqlalchemy.orm import Session
-
-from app.conf.config import init_cloudinary
-from app.database.models import User, UserRoleEnum, Comment, Rating, Post, BlacklistToken
+from jose import JWTError, jwt
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Query, Session
+
+from app.conf.config import init_cloudinary, settings
+from app.database.models import User, UserRoleEnum, Comment, Rating, Post, BlacklistToken, Follow, Hashtag, post_m2m_hashtag
+from app.repository import images as repository_images
+from app.services import cloudinary_cleanup, comment_cache, feed, image_variants, leaderboard, post_cache, tag_suggest, trending, upload_validation, uploads
 from app.schemas import UserModel, UserProfileModel
+from app.services.trigram import username_index
 
 
 # ---------------- USER CRUD ---------------- #
@@ -49,8 +54,9 @@ async def edit_my_profile(file, new_username: Optional[str], user: User, db: Ses
         me.username = new_username
 
     if file:
+        await upload_validation.validate_image(file.file)
         init_cloudinary()
-        cloudinary.uploader.upload(
+        await uploads.upload(
             file.file,
             public_id=f'Photoshare/{me.username}',
             overwrite=True,
@@ -61,6 +67,7 @@ async def edit_my_profile(file, new_username: Optional[str], user: User, db: Ses
 
     db.commit()
     db.refresh(me)
+    username_index.add(me.id, me.username)
     return me
 
 
@@ -76,15 +83,89 @@ def get_users(skip: int, limit: int, db: Session) -> List[User]:
     return db.query(User).offset(skip).limit(limit).all()
 
 
-async def get_users_with_username(username: str, db: Session) -> List[User]:
+def iter_users(db: Session, batch_size: int) -> Query:
+    """
+    Повертає запит по всіх користувачах, що читається серверним курсором пачками batch_size.
+
+    :param db: SQLAlchemy сесія
+    :param batch_size: Кількість рядків, що вибираються з курсора за раз
+    :return: Query, ітерація якого не завантажує всю таблицю в пам'ять
+    """
+    return db.query(User).order_by(User.id).yield_per(batch_size)
+
+
+def _uses_pg_trgm(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _username_condition(username: str, db: Session):
+    """
+    Умова нечіткого збігу username для PostgreSQL (pg_trgm, GIN-індекс ix_users_username_trgm).
+
+    Оператор % порівнює схожість з порогом pg_trgm.similarity_threshold,
+    тому поріг із налаштувань встановлюється для поточної транзакції.
+    """
+    db.execute(
+        select(func.set_config("pg_trgm.similarity_threshold", str(settings.username_similarity_threshold), True))
+    )
+    return or_(User.username.op("%")(username), User.username.icontains(username, autoescape=True))
+
+
+def matching_user_ids(username: str, db: Session, limit: Optional[int] = None) -> List[int]:
     """
-    Повертає користувачів за частковим збігом username.
+    Повертає ID користувачів, username яких схожий на запит, від найбільш схожих.
+
+    У PostgreSQL використовується pg_trgm, в інших БД — триграмний індекс у пам'яті
+    процесу, що перебудовується з таблиці users раз на USERNAME_INDEX_TTL секунд.
 
-    :param username: Частина username для пошуку
+    :param username: Рядок пошуку
     :param db: SQLAlchemy сесія
+    :param limit: Максимальна кількість користувачів (None — усі)
+    :return: Список ID
+    """
+    if _uses_pg_trgm(db):
+        query = (
+            db.query(User.id)
+            .filter(_username_condition(username, db))
+            .order_by(func.similarity(User.username, username).desc(), User.username)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        return [user_id for (user_id,) in query]
+
+    if username_index.is_stale(settings.username_index_ttl):
+        username_index.rebuild(db.query(User.id, User.username).filter(User.username.isnot(None)))
+    return [user_id for user_id, _ in username_index.search(username, settings.username_similarity_threshold, limit)]
+
+
+def username_match_clause(username: str, db: Session):
+    """
+    Умова «автор поста схожий на username» для використання в одному запиті по постах.
+
+    :param username: Рядок пошуку
+    :param db: SQLAlchemy сесія
+    :return: SQL-умова над Post.user_id
+    """
+    if _uses_pg_trgm(db):
+        return Post.user_id.in_(select(User.id).where(_username_condition(username, db)))
+    return Post.user_id.in_(matching_user_ids(username, db))
+
+
+async def get_users_with_username(username: str, db: Session, limit: int = 20) -> List[User]:
+    """
+    Повертає користувачів, username яких схожий на запит (триграмний пошук),
+    від найбільш схожих до найменш схожих.
+
+    :param username: Рядок пошуку
+    :param db: SQLAlchemy сесія
+    :param limit: Максимальна кількість користувачів
     :return: Список користувачів
     """
-    return db.query(User).filter(func.lower(User.username).like(f'%{username.lower()}%')).all()
+    ids = matching_user_ids(username, db, limit)
+    if not ids:
+        return []
+    users = {user.id: user for user in db.query(User).filter(User.id.in_(ids))}
+    return [users[user_id] for user_id in ids if user_id in users]
 
 
 async def get_user_profile(username: str, db: Session) -> Optional[UserProfileModel]:
@@ -162,6 +243,7 @@ async def create_user(body: UserModel, db: Session) -> User:
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
+    username_index.add(new_user.id, new_user.username)
     return new_user
 
 
@@ -254,7 +336,75 @@ async def remove_from_blacklist(token: str, db: Session) -> None:
     if blacklist_token:
         db.delete(blacklist_token)
         db.commit()
-        
+
+
+def purge_blacklist(before: datetime, batch_size: int, db: Session) -> int:
+    """
+    Видаляє з чорного списку токени, додані раніше за before (вони вже прострочені),
+    пачками, щоб не тримати довгу транзакцію й блокування.
+    Синхронна: задача обслуговування викликає її в пулі потоків.
+
+    :param before: Межа часу blacklisted_on
+    :param batch_size: Розмір пачки
+    :param db: SQLAlchemy сесія
+    :return: Кількість видалених записів
+    """
+    deleted = 0
+    while True:
+        ids = db.scalars(
+            select(BlacklistToken.id)
+            .where(BlacklistToken.blacklisted_on < before)
+            .order_by(BlacklistToken.id)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            return deleted
+        db.execute(delete(BlacklistToken).where(BlacklistToken.id.in_(ids)))
+        db.commit()
+        deleted += len(ids)
+
+
+def _token_expired(token: str, now: datetime) -> bool:
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        return True
+    return exp is None or exp <= now.timestamp()
+
+
+def clear_expired_refresh_tokens(now: datetime, batch_size: int, db: Session) -> int:
+    """
+    Очищає прострочені refresh_token користувачів, проходячи таблицю пачками за id.
+    updated_at не змінюється: профіль користувача від цього не змінюється.
+    Синхронна: задача обслуговування викликає її в пулі потоків.
+
+    :param now: Поточний час
+    :param batch_size: Розмір пачки
+    :param db: SQLAlchemy сесія
+    :return: Кількість очищених токенів
+    """
+    cleared, last_id = 0, 0
+    while True:
+        rows = db.execute(
+            select(User.id, User.refresh_token)
+            .where(User.refresh_token.isnot(None), User.id > last_id)
+            .order_by(User.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return cleared
+        last_id = rows[-1].id
+        expired = [row.id for row in rows if _token_expired(row.refresh_token, now)]
+        if expired:
+            db.execute(
+                update(User)
+                .where(User.id.in_(expired))
+                .values(refresh_token=None, updated_at=User.updated_at)
+            )
+            db.commit()
+            cleared += len(expired)
+
+
 async def get_user_by_id(user_id: int, db: Session) -> Optional[User]:
     """
     Повертає користувача за ID.
@@ -265,8 +415,100 @@ async def get_user_by_id(user_id: int, db: Session) -> Optional[User]:
 async def delete_user(user_id: int, db: Session) -> None:
     """
     Видаляє користувача за ID.
+
+    Пости, коментарі, оцінки, хештеги й підписки видаляє каскадом сама БД, не завантажуючи
+    їх у пам'ять; зображення постів і аватар ставляться в чергу на видалення з Cloudinary
+    (app.services.cloudinary_cleanup), тож запит не чекає на Cloudinary. Пости прибираються
+    також з рейтингових таблиць, популярних хештегів і підказок хештегів у Redis.
     """
     user = await get_user_by_id(user_id, db)
     if user:
+        posts = db.execute(select(Post.id, Post.public_id, Post.created_at).where(Post.user_id == user_id)).all()
+        public_ids = [public_id for _, public_id, _ in posts]
+        if user.avatar:
+            public_ids.append(f'Photoshare/{user.username}')
+        tags = {post_id: [] for post_id, _, _ in posts}
+        for post_id, title in db.execute(
+            select(post_m2m_hashtag.c.post_id, Hashtag.title)
+            .join(Hashtag, Hashtag.id == post_m2m_hashtag.c.hashtag_id)
+            .join(Post, Post.id == post_m2m_hashtag.c.post_id)
+            .where(Post.user_id == user_id)
+        ):
+            tags[post_id].append(title)
+        # коментарі користувача під чужими постами теж зникнуть каскадом
+        commented = db.scalars(select(Comment.post_id).where(Comment.user_id == user_id).distinct()).all()
+
+        # підписки зникнуть разом з користувачем, тож лічильники підписників оновлюємо заздалегідь
+        db.query(User).filter(
+            User.id.in_(select(Follow.followed_id).where(Follow.follower_id == user_id))
+        ).update({User.followers_count: User.followers_count - 1}, synchronize_session=False)
         db.delete(user)
         db.commit()
+
+        username_index.remove(user_id)
+        post_ids = [post_id for post_id, _, _ in posts]
+        for post_id, _, created_at in posts:
+            await leaderboard.remove_post(post_id, tags[post_id])
+            if created_at:
+                await trending.forget_usage(tags[post_id], created_at.replace(tzinfo=timezone.utc).timestamp())
+        await tag_suggest.record_usage([], [title for titles in tags.values() for title in titles])
+        await comment_cache.invalidate(post_ids + list(commented))
+        await post_cache.invalidate(post_ids + list(commented))
+        public_ids = await repository_images.release_images(public_ids, db)
+        await cloudinary_cleanup.enqueue(public_ids)
+        for public_id in public_ids:
+            image_variants.delete_variants(public_id)
+
+
+# ---------------- FOLLOWS ---------------- #
+def _change_followers_count(user_id: int, delta: int, db: Session) -> None:
+    """Атомарно змінює users.followers_count одним UPDATE (без читання рядка)."""
+    db.query(User).filter(User.id == user_id).update(
+        {User.followers_count: User.followers_count + delta}, synchronize_session=False
+    )
+
+
+async def follow_user(follower: User, followed_id: int, db: Session) -> bool:
+    """
+    Підписує користувача на іншого користувача.
+
+    Повторна підписка нічого не змінює. Стрічка підписника скидається,
+    щоб при наступному читанні в ній з'явилися старі пости нового автора.
+
+    :param follower: Користувач, що підписується
+    :param followed_id: ID користувача, на якого підписуються
+    :param db: SQLAlchemy сесія
+    :return: True, якщо підписку створено
+    """
+    if db.get(Follow, (follower.id, followed_id)):
+        return False
+    db.add(Follow(follower_id=follower.id, followed_id=followed_id))
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        return False
+    _change_followers_count(followed_id, 1, db)
+    db.commit()
+    await feed.drop_feed(follower.id)
+    return True
+
+
+async def unfollow_user(follower: User, followed_id: int, db: Session) -> bool:
+    """
+    Скасовує підписку.
+
+    :param follower: Користувач, що відписується
+    :param followed_id: ID користувача, від якого відписуються
+    :param db: SQLAlchemy сесія
+    :return: True, якщо підписка існувала
+    """
+    deleted = db.query(Follow).filter(
+        Follow.follower_id == follower.id, Follow.followed_id == followed_id
+    ).delete(synchronize_session=False)
+    if deleted:
+        _change_followers_count(followed_id, -1, db)
+    db.commit()
+    if deleted:
+        await feed.drop_feed(follower.id)
+    return bool(deleted)
@@ -7,17 +7,21 @@ from app.services.email import send_email
 from app.database.connect_db import get_db
 from app.schemas import UserModel, UserResponse, TokenModel, RequestEmail
 from app.repository import users as repository_users
+from app.services import login_guard
 from app.services.auth import auth_service
+from app.services.rate_limit import RateLimiter
 from app.conf.messages import (
     ALREADY_EXISTS, EMAIL_ALREADY_CONFIRMED, EMAIL_CONFIRMED,
-    EMAIL_NOT_CONFIRMED, INVALID_EMAIL, INVALID_PASSWORD, INVALID_TOKEN,
+    EMAIL_NOT_CONFIRMED, INVALID_CREDENTIALS, INVALID_EMAIL, INVALID_TOKEN,
     SUCCESS_CREATE_USER, VERIFICATION_ERROR,
-    CHECK_YOUR_EMAIL, USER_NOT_ACTIVE, USER_IS_LOGOUT
+    CHECK_YOUR_EMAIL, USER_NOT_ACTIVE, USER_IS_LOGOUT, LOGIN_LOCKED
 )
 
 router = APIRouter(prefix='/auth', tags=["authentication"])
 security = HTTPBearer()
 
+login_limit = RateLimiter("login")
+
 
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def signup(
@@ -49,31 +53,44 @@ async def signup(
     return {"user": new_user, "detail": "User successfully created"}
 
 
-@router.post("/login", response_model=TokenModel)
+@router.post("/login", response_model=TokenModel, dependencies=[Depends(login_limit)])
 async def login(
+    request: Request,
     body: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
     """
     Авторизація користувача.
-    - Перевіряє email і пароль.
-    - Перевіряє підтвердження email.
-    - Перевіряє активність користувача.
+    - Відхиляє спробу, якщо email або IP тимчасово заблоковано після невдалих спроб.
+    - Перевіряє email і пароль (невідомий email і неправильний пароль дають однакову відповідь).
+    - Лише після правильного пароля перевіряє підтвердження email і активність користувача.
     - Генерує access та refresh токени.
 
+    :param request: FastAPI Request (IP клієнта для лічильника невдач)
     :param body: OAuth2PasswordRequestForm з username та password
     :param db: SQLAlchemy сесія
     :return: TokenModel з access та refresh токенами
     """
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = await login_guard.locked_for(body.username, client_ip)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=LOGIN_LOCKED,
+            headers={"Retry-After": str(retry_after)},
+        )
+
     user = await repository_users.get_user_by_email(body.username, db)
-    if user is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=INVALID_EMAIL)
+    # для невідомого email — той самий bcrypt з фіктивним хешем і та сама відповідь,
+    # що й для неправильного пароля, щоб ні час, ні текст помилки не видавали email
+    if not await login_guard.verify_password(body.password, user.password if user else None):
+        await login_guard.register_failure(body.username, client_ip)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=INVALID_CREDENTIALS)
     if not user.is_verify:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=EMAIL_NOT_CONFIRMED)
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=USER_NOT_ACTIVE)
-    if not auth_service.verify_password(body.password, user.password):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=INVALID_PASSWORD)
+    await login_guard.register_success(body.username)
 
     access_token = await auth_service.create_access_token(data={"sub": user.email}, expires_delta=7200)
     refresh_token = await auth_service.create_refresh_token(data={"sub": user.email})
@@ -183,6 +200,3 @@ async def request_email(
 
     background_tasks.add_task(send_email, user.email, user.username, request.base_url)
     return {"message": CHECK_YOUR_EMAIL}
-
-async def rate_limiter():
-    return True
\ No newline at end of file
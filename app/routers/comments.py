@@ -1,13 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, status, Request, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
+from app.conf.config import settings
 from app.database.models import User, UserRoleEnum
 from app.database.connect_db import get_db
-from app.schemas import CommentBase, CommentUpdate, CommentResponse
+from app.schemas import CommentBase, CommentUpdate, CommentResponse, CommentPage, ImportReport
 from app.repository import comments as repository_comments
+from app.services.ndjson import NDJSON_MEDIA_TYPE, iter_ndjson_chunks, ndjson_stream
 from app.services.auth import auth_service
 from app.conf import messages as message
+from app.services.rate_limit import UserRateLimiter
 from app.services.roles import RoleChecker
 
 router = APIRouter(prefix='/comments', tags=["comments"])
@@ -17,10 +21,14 @@ allowed_get_comments = RoleChecker([UserRoleEnum.admin, UserRoleEnum.moder, User
 allowed_create_comments = RoleChecker([UserRoleEnum.admin, UserRoleEnum.moder, UserRoleEnum.user])
 allowed_update_comments = RoleChecker([UserRoleEnum.admin, UserRoleEnum.moder])
 allowed_remove_comments = RoleChecker([UserRoleEnum.admin, UserRoleEnum.moder])
+allowed_bulk_comments = RoleChecker([UserRoleEnum.admin])
+
+# ---------------- Ліміти (RATE_LIMITS) ---------------- #
+create_comment_limit = UserRateLimiter("create_comment")
 
 # ---------------- CRUD для коментарів ---------------- #
 
-@router.post("/new/{post_id}", response_model=CommentResponse, dependencies=[Depends(allowed_create_comments)])
+@router.post("/new/{post_id}", response_model=CommentResponse, dependencies=[Depends(allowed_create_comments), Depends(create_comment_limit)])
 async def create_comment(post_id: int, body: CommentBase, db: Session = Depends(get_db),
                          current_user: User = Depends(auth_service.get_current_user)):
     """
@@ -72,16 +80,19 @@ async def single_comment(comment_id: int, db: Session = Depends(get_db),
     return comment
 
 
-@router.get("/by_author/{user_id}", response_model=List[CommentResponse], dependencies=[Depends(allowed_get_comments)])
-async def by_user_comments(user_id: int, db: Session = Depends(get_db),
+@router.get("/by_author/{user_id}", response_model=CommentPage, dependencies=[Depends(allowed_get_comments)])
+async def by_user_comments(user_id: int, limit: int = Query(settings.comments_page_size, ge=1, le=100),
+                           cursor: Optional[str] = None, db: Session = Depends(get_db),
                            current_user: User = Depends(auth_service.get_current_user)):
     """
-    Повертає всі коментарі конкретного користувача.
+    Повертає сторінку коментарів конкретного користувача.
+    - `limit`: розмір сторінки (1–100)
+    - `cursor`: значення `next_cursor` з попередньої сторінки
     """
-    comments = await repository_comments.show_user_comments(user_id, db)
-    if not comments:
+    page = await repository_comments.show_user_comments(user_id, db, limit, cursor)
+    if not page.total:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=message.COMM_NOT_FOUND)
-    return comments
+    return page
 
 
 @router.get("/post_by_author/{user_id}/{post_id}", response_model=List[CommentResponse],
@@ -95,3 +106,27 @@ async def by_user_post_comments(user_id: int, post_id: int, db: Session = Depend
     if not comments:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=message.COMM_NOT_FOUND)
     return comments
+
+
+# ---------------- Масовий імпорт / експорт (NDJSON) ---------------- #
+
+@router.post("/import", response_model=ImportReport, dependencies=[Depends(allowed_bulk_comments)])
+async def import_comments(request: Request, db: Session = Depends(get_db),
+                          current_user: User = Depends(auth_service.get_current_user)):
+    """
+    Масовий імпорт коментарів (тільки для admin).
+    - Тіло запиту — NDJSON: `{"post_id", "user_id", "text", "created_at"?}` на кожен рядок
+    - Повертає кількість імпортованих рядків та помилки з номерами рядків
+    """
+    chunks = iter_ndjson_chunks(request.stream(), settings.bulk_import_chunk_size)
+    return await repository_comments.import_comments(chunks, db)
+
+
+@router.get("/export", dependencies=[Depends(allowed_bulk_comments)])
+async def export_comments(db: Session = Depends(get_db),
+                          current_user: User = Depends(auth_service.get_current_user)):
+    """
+    Потоковий експорт усіх коментарів у NDJSON (тільки для admin).
+    """
+    rows = repository_comments.iter_comments(db, settings.stream_batch_size)
+    return StreamingResponse(ndjson_stream(rows, CommentResponse, db), media_type=NDJSON_MEDIA_TYPE)
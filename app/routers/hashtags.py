@@ -1,15 +1,17 @@
 from typing import List
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, status, Query
 from sqlalchemy.orm import Session
 
+from app.conf.config import settings
 from app.database.connect_db import get_db
-from app.schemas import HashtagBase, HashtagResponse
+from app.schemas import HashtagBase, HashtagResponse, TrendingHashtag
 from app.repository import hashtags as repository_tags
 from app.services.roles import RoleChecker
 from app.database.models import User, UserRoleEnum
+from app.services import http_cache
 from app.services.auth import auth_service
-from app.conf.messages import NOT_FOUND
+from app.conf.messages import NOT_FOUND, INVALID_TRENDING_WINDOW
 
 router = APIRouter(prefix='/hashtags', tags=["hashtags"])
 
@@ -31,35 +33,73 @@ async def create_tag(body: HashtagBase, db: Session = Depends(get_db),
 
 
 @router.get("/my/", response_model=List[HashtagResponse])
-async def read_my_tags(skip: int = 0, limit: int = 100, db: Session = Depends(get_db),
+async def read_my_tags(request: Request, response: Response, skip: int = 0, limit: int = 100,
+                       db: Session = Depends(get_db),
                        current_user: User = Depends(auth_service.get_current_user)):
     """
     Повертає хештеги, створені поточним користувачем.
     - `skip` і `limit` для пагінації
     """
     tags = await repository_tags.get_my_tags(skip, limit, current_user, db)
+    cached = http_cache.not_modified(request, response, http_cache.tags_etag(tags), settings.cache_control_tags)
+    if cached:
+        return cached
     return tags
 
 
 @router.get("/all/", response_model=List[HashtagResponse], dependencies=[Depends(allowed_get_all_hashtags)])
-async def read_all_tags(skip: int = 0, limit: int = 100, db: Session = Depends(get_db),
+async def read_all_tags(request: Request, response: Response, skip: int = 0, limit: int = 100,
+                        db: Session = Depends(get_db),
                         current_user: User = Depends(auth_service.get_current_user)):
     """
     Повертає всі хештеги (тільки для admin).
     """
     tags = await repository_tags.get_all_tags(skip, limit, db)
+    cached = http_cache.not_modified(request, response, http_cache.tags_etag(tags), settings.cache_control_tags)
+    if cached:
+        return cached
     return tags
 
 
+@router.get("/trending", response_model=List[TrendingHashtag])
+async def read_trending_tags(window: int = 24, limit: int = Query(10, ge=1, le=100),
+                             db: Session = Depends(get_db),
+                             current_user: User = Depends(auth_service.get_current_user)):
+    """
+    Повертає хештеги, які найчастіше додавали до постів за останні `window` годин.
+    - `window`: одне з вікон TRENDING_WINDOWS (за замовчуванням 1, 24, 168)
+    - `limit`: кількість хештегів (1–100)
+    """
+    if window not in settings.trending_windows:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_TRENDING_WINDOW)
+    return await repository_tags.get_trending_tags(window, limit, db)
+
+
+@router.get("/suggest", response_model=List[str])
+async def suggest_tags(prefix: str = Query(..., min_length=1, max_length=50), limit: int = Query(10, ge=1, le=50),
+                       db: Session = Depends(get_db),
+                       current_user: User = Depends(auth_service.get_current_user)):
+    """
+    Підказки хештегів за початком назви (без урахування регістру), від найуживаніших.
+    - `prefix`: введений користувачем початок хештегу
+    - `limit`: кількість підказок (1–50)
+    """
+    return await repository_tags.suggest_tags(prefix, limit, db)
+
+
 @router.get("/by_id/{tag_id}", response_model=HashtagResponse)
-async def read_tag_by_id(tag_id: int, db: Session = Depends(get_db),
+async def read_tag_by_id(tag_id: int, request: Request, response: Response, db: Session = Depends(get_db),
                          current_user: User = Depends(auth_service.get_current_user)):
     """
     Повертає хештег за його ID.
+    Підтримує умовний запит: якщо If-None-Match збігається з ETag, повертає 304 без тіла.
     """
     tag = await repository_tags.get_tag_by_id(tag_id, db)
     if tag is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=NOT_FOUND)
+    cached = http_cache.not_modified(request, response, http_cache.tags_etag([tag]), settings.cache_control_tags)
+    if cached:
+        return cached
     return tag
 
 
@@ -1,18 +1,28 @@
-from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, Request
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, Request, Response, Query
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import List, Optional
 from sqlalchemy.orm import Session
+from app.conf.config import settings
 from app.database.connect_db import get_db
 from app.database.models import User, UserRoleEnum
-from app.schemas import CommentResponse, PostResponse, PostUpdate
+from app.schemas import CommentPage, HashtagMatchEnum, PostResponse, PostSearch, PostSortEnum, PostUpdate, SimilarPost
 from app.repository import posts as repository_posts
+from app.services import http_cache
 from app.services.auth import auth_service
+from app.services.rate_limit import UserRateLimiter
 from app.services.roles import RoleChecker
 from app.conf.messages import NOT_FOUND
+from app.services.ndjson import NDJSON_MEDIA_TYPE, ndjson_stream
 
 router = APIRouter(prefix='/posts', tags=["posts"])
 
 # Ролі для доступу
 allowed_get_all_posts = RoleChecker([UserRoleEnum.admin])
+allowed_find_duplicates = RoleChecker([UserRoleEnum.admin, UserRoleEnum.moder])
+
+# Ліміти частоти запитів (RATE_LIMITS)
+create_post_limit = UserRateLimiter("create_post")
 
 # --- допоміжна функція для обробки хештегів ---
 def serialize_hashtags(post):
@@ -25,7 +35,12 @@ def serialize_hashtags(post):
 # --------------------------------------------
 # CREATE POST
 # --------------------------------------------
-@router.post("/new/", response_model=PostResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/new/",
+    response_model=PostResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(create_post_limit)]
+)
 async def create_new_post(
     request: Request,
     title: str,
@@ -69,25 +84,50 @@ async def read_all_user_posts(
     result = [serialize_hashtags(PostResponse.from_orm(post)) for post in posts]
     return result
 
+@router.get("/feed", response_model=List[PostResponse])
+async def read_feed(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(auth_service.get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Повертає стрічку: пости користувачів, на яких підписаний поточний користувач, від найновіших.
+    """
+    posts = await repository_posts.get_feed(current_user, skip, limit, db)
+    if not posts:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=NOT_FOUND)
+    return [serialize_hashtags(post) for post in posts]
+
 @router.get("/all", response_model=List[PostResponse], dependencies=[Depends(allowed_get_all_posts)])
-async def read_all_posts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def read_all_posts(skip: int = 0, limit: int = 100, stream: bool = False, db: Session = Depends(get_db)):
     """
     Повертає всі пости (для адміністратора) з пагінацією.
+
+    - **stream**: якщо true — усі пости потоком NDJSON (skip/limit ігноруються)
     """
+    if stream:
+        rows = repository_posts.iter_posts(db, settings.stream_batch_size)
+        return StreamingResponse(ndjson_stream(rows, PostResponse, db), media_type=NDJSON_MEDIA_TYPE)
+
     posts = await repository_posts.get_all_posts(skip, limit, db)
     if not posts:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=NOT_FOUND)
     return [serialize_hashtags(post) for post in posts]
 
 @router.get("/by_id/{post_id}", response_model=PostResponse)
-async def read_post_by_id(post_id: int, db: Session = Depends(get_db),
+async def read_post_by_id(post_id: int, request: Request, response: Response, db: Session = Depends(get_db),
                           current_user: User = Depends(auth_service.get_current_user)):
     """
     Повертає пост за його ID.
+    Підтримує умовний запит: якщо If-None-Match збігається з ETag поста, повертає 304 без тіла.
     """
     post = await repository_posts.get_post_by_id(post_id, current_user, db)
     if post is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=NOT_FOUND)
+    cached = http_cache.not_modified(request, response, http_cache.post_etag(post), settings.cache_control_post)
+    if cached:
+        return cached
     return serialize_hashtags(post)
 
 @router.get("/by_title/{post_title}", response_model=List[PostResponse])
@@ -143,19 +183,74 @@ async def read_posts_by_keyword(keyword: str, db: Session = Depends(get_db),
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=NOT_FOUND)
     return [serialize_hashtags(post) for post in posts]
 
+@router.get("/search", response_model=List[PostResponse])
+async def search_posts(
+    hashtags: List[str] = Query([]),
+    match: HashtagMatchEnum = HashtagMatchEnum.any,
+    keyword: Optional[str] = None,
+    author: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    min_rating: Optional[float] = Query(None, ge=1, le=5),
+    sort: PostSortEnum = PostSortEnum.newest,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    """
+    Пошук постів за кількома фільтрами одночасно.
+
+    - **hashtags**: хештеги (параметр можна повторювати: `?hashtags=sea&hashtags=sun`)
+    - **match**: `any` — хоча б один хештег, `all` — усі хештеги
+    - **keyword**: слово в заголовку або описі
+    - **author**: username автора
+    - **date_from** / **date_to**: межі дати створення
+    - **min_rating**: мінімальна середня оцінка
+    - **sort**: `newest` або `top_rated`
+    """
+    filters = PostSearch(hashtags=hashtags, match=match, keyword=keyword, author=author,
+                         date_from=date_from, date_to=date_to, min_rating=min_rating, sort=sort)
+    posts = await repository_posts.search_posts(filters, skip, limit, db)
+    if not posts:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=NOT_FOUND)
+    return [serialize_hashtags(post) for post in posts]
+
+@router.get("/duplicates/{post_id}", response_model=List[SimilarPost], dependencies=[Depends(allowed_find_duplicates)])
+async def find_duplicate_posts(
+    post_id: int,
+    max_distance: int = Query(settings.duplicate_max_distance, ge=0, le=64),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    """
+    Пошук дублікатів зображення поста (лише для модераторів і адміністраторів).
+
+    - **max_distance**: максимальна відстань Хеммінга між pHash зображень (0 — лише точні копії)
+    - **limit**: максимальна кількість постів
+    """
+    similar = await repository_posts.get_similar_posts(post_id, max_distance, limit, db)
+    if similar is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=NOT_FOUND)
+    return similar
+
 # --------------------------------------------
 # COMMENTS
 # --------------------------------------------
-@router.get("/comments/all/{post_id}", response_model=List[CommentResponse])
-async def read_post_comments(post_id: int, db: Session = Depends(get_db),
+@router.get("/comments/all/{post_id}", response_model=CommentPage)
+async def read_post_comments(post_id: int, limit: int = Query(settings.comments_page_size, ge=1, le=100),
+                             cursor: Optional[str] = None, db: Session = Depends(get_db),
                              current_user: User = Depends(auth_service.get_current_user)):
     """
-    Повертає список коментарів для поста.
+    Повертає сторінку коментарів для поста.
+    - `limit`: розмір сторінки (1–100)
+    - `cursor`: значення `next_cursor` з попередньої сторінки
     """
-    comments = await repository_posts.get_post_comments(post_id, db)
-    if not comments:
+    page = await repository_posts.get_post_comments(post_id, db, limit, cursor)
+    if not page.total:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=NOT_FOUND)
-    return comments
+    return page
 
 # --------------------------------------------
 # UPDATE POST
@@ -188,6 +283,3 @@ async def remove_post(post_id: int, db: Session = Depends(get_db),
     if post.user_id != current_user.id and current_user.role != UserRoleEnum.admin:
         raise HTTPException(status_code=403, detail="Operation forbidden")
     return serialize_hashtags(post)
-
-async def rate_limiter(*args, **kwargs):
-    return True
\ No newline at end of file
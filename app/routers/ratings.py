@@ -1,12 +1,16 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException, Depends, status, Path
+from fastapi import APIRouter, HTTPException, Depends, status, Path, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.conf.config import settings
 from app.database.connect_db import get_db
-from app.schemas import RatingModel
+from app.schemas import RatingModel, PostResponse, ImportReport
 from app.repository import ratings as repository_ratings
+from app.services.ndjson import NDJSON_MEDIA_TYPE, iter_ndjson_chunks, ndjson_stream
 from app.services.auth import auth_service
+from app.services.rate_limit import UserRateLimiter
 from app.services.roles import RoleChecker
 from app.database.models import User, UserRoleEnum
 from app.conf.messages import NOT_FOUND, NO_POST_ID, COMM_NOT_FOUND, NO_RATING
@@ -20,6 +24,11 @@ allowed_edit_ratings = RoleChecker([UserRoleEnum.admin, UserRoleEnum.moder, User
 allowed_remove_ratings = RoleChecker([UserRoleEnum.admin, UserRoleEnum.moder])
 allowed_user_post_rate = RoleChecker([UserRoleEnum.admin])
 allowed_commented_by_user = RoleChecker([UserRoleEnum.admin, UserRoleEnum.moder, UserRoleEnum.user])
+allowed_top_posts = RoleChecker([UserRoleEnum.admin, UserRoleEnum.moder, UserRoleEnum.user])
+allowed_bulk_ratings = RoleChecker([UserRoleEnum.admin])
+
+# Ліміти частоти запитів (RATE_LIMITS)
+create_rate_limit = UserRateLimiter("create_rate")
 
 
 # --------------------------------------------
@@ -28,7 +37,7 @@ allowed_commented_by_user = RoleChecker([UserRoleEnum.admin, UserRoleEnum.moder,
 @router.post(
     "/posts/{post_id}/{rate}",
     response_model=RatingModel,
-    dependencies=[Depends(allowed_create_ratings)]
+    dependencies=[Depends(allowed_create_ratings), Depends(create_rate_limit)]
 )
 async def create_rate(
     post_id: int,
@@ -107,12 +116,19 @@ async def delete_rate(
     dependencies=[Depends(allowed_get_all_ratings)]
 )
 async def all_rates(
+    stream: bool = Query(False, description="Віддати всі рядки потоком NDJSON (серверний курсор)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(auth_service.get_current_user)
 ):
     """
     Повертає всі рейтинги (для admin/moder).
+
+    - **stream**: якщо true — відповідь `application/x-ndjson`, що читається з БД пачками
     """
+    if stream:
+        rows = repository_ratings.iter_ratings(db, settings.stream_batch_size)
+        return StreamingResponse(ndjson_stream(rows, RatingModel, db), media_type=NDJSON_MEDIA_TYPE)
+
     ratings = await repository_ratings.show_ratings(db, current_user)
     if not ratings:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=NO_RATING)
@@ -164,3 +180,63 @@ async def user_rate_post(
     if rate is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=NOT_FOUND)
     return rate
+
+
+# --------------------------------------------
+# TOP RATED POSTS (LEADERBOARD)
+# --------------------------------------------
+@router.get(
+    "/top",
+    response_model=List[PostResponse],
+    dependencies=[Depends(allowed_top_posts)]
+)
+async def top_rated_posts(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    hashtag: Optional[str] = Query(None, max_length=50, description="Тематична таблиця за хештегом"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    """
+    Повертає пости з найвищою байєсівською оцінкою (з пагінацією).
+
+    - **skip**: Кількість пропущених постів
+    - **limit**: Розмір сторінки (до 100)
+    - **hashtag**: Назва хештегу для таблиці лідерів за темою
+    """
+    return await repository_ratings.get_top_posts(skip, limit, hashtag, db)
+
+
+# --------------------------------------------
+# BULK IMPORT / EXPORT (NDJSON)
+# --------------------------------------------
+@router.post(
+    "/import",
+    response_model=ImportReport,
+    dependencies=[Depends(allowed_bulk_ratings)]
+)
+async def import_ratings(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    """
+    Масовий імпорт рейтингів (тільки для admin).
+
+    Тіло запиту — NDJSON: по одному об'єкту `{"post_id", "user_id", "rate", "created_at"?}` на рядок.
+    Повертає кількість імпортованих рядків та помилки з номерами рядків.
+    """
+    chunks = iter_ndjson_chunks(request.stream(), settings.bulk_import_chunk_size)
+    return await repository_ratings.import_ratings(chunks, db)
+
+
+@router.get("/export", dependencies=[Depends(allowed_bulk_ratings)])
+async def export_ratings(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    """
+    Потоковий експорт усіх рейтингів у NDJSON (тільки для admin).
+    """
+    rows = repository_ratings.iter_ratings(db, settings.stream_batch_size)
+    return StreamingResponse(ndjson_stream(rows, RatingModel, db), media_type=NDJSON_MEDIA_TYPE)
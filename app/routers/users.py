@@ -1,15 +1,19 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.conf.config import settings
 from app.database.connect_db import get_db
 from app.database.models import User, UserRoleEnum
-from app.schemas import PostResponse, UserProfileModel, UserDb, RequestEmail, RequestRole
+from app.schemas import FollowResponse, PostResponse, UserProfileModel, UserDb, RequestEmail, RequestRole
+from app.services import http_cache
 from app.services.auth import auth_service
 from app.services.roles import RoleChecker
 from app.repository import users as repository_users
-from app.conf.messages import NOT_FOUND, USER_ROLE_EXISTS, INVALID_EMAIL, USER_NOT_ACTIVE, USER_ALREADY_NOT_ACTIVE, USER_CHANGE_ROLE_TO
+from app.services.ndjson import NDJSON_MEDIA_TYPE, ndjson_stream
+from app.conf.messages import NOT_FOUND, USER_ROLE_EXISTS, INVALID_EMAIL, USER_NOT_ACTIVE, USER_ALREADY_NOT_ACTIVE, USER_CHANGE_ROLE_TO, CANNOT_FOLLOW_SELF
 
 router = APIRouter(prefix='/users', tags=["users"])
 
@@ -29,17 +33,25 @@ allowed_change_user_role = RoleChecker([UserRoleEnum.admin])
 # --------------------------------------------
 @router.get("/me/", response_model=UserDb)
 async def read_my_profile(
+    request: Request,
+    response: Response,
     current_user: User = Depends(auth_service.get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Отримати профіль поточного користувача.
+    Підтримує умовний запит за ETag (версія — users.updated_at).
 
+    :param request: Запит (заголовок If-None-Match)
+    :param response: Відповідь (заголовки ETag і Cache-Control)
     :param current_user: Поточний авторизований користувач
     :param db: Сесія бази даних
-    :return: Інформація про користувача у форматі `UserDb`
+    :return: Інформація про користувача у форматі `UserDb` або 304 без тіла
     """
     user = await repository_users.get_me(current_user, db)
+    cached = http_cache.not_modified(request, response, http_cache.user_etag(user), settings.cache_control_me)
+    if cached:
+        return cached
     return user
 
 
@@ -67,15 +79,20 @@ async def edit_my_profile(
 # USER MANAGEMENT
 # --------------------------------------------
 @router.get("/all", response_model=List[UserDb], dependencies=[Depends(allowed_get_all_users)])
-def read_all_users(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
+def read_all_users(skip: int = 0, limit: int = 10, stream: bool = False, db: Session = Depends(get_db)):
     """
     Отримати список всіх користувачів з пагінацією.
 
     :param skip: Кількість пропущених записів
     :param limit: Максимальна кількість записів
+    :param stream: Віддати всіх користувачів потоком NDJSON (skip/limit ігноруються)
     :param db: Сесія бази даних
     :return: Список користувачів
     """
+    if stream:
+        rows = repository_users.iter_users(db, settings.stream_batch_size)
+        return StreamingResponse(ndjson_stream(rows, UserDb, db), media_type=NDJSON_MEDIA_TYPE)
+
     users = repository_users.get_users(skip, limit, db)
     return users
 
@@ -103,20 +120,28 @@ async def read_users_by_username(
 @router.get("/user_profile_with_username/{username}", response_model=UserProfileModel, dependencies=[Depends(allowed_get_user)])
 async def read_user_profile_by_username(
     username: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(auth_service.get_current_user)
 ):
     """
     Отримати детальний профіль користувача за username.
+    Підтримує умовний запит: ETag будується з полів профілю та лічильників.
 
     :param username: Ім'я користувача
+    :param request: Запит (заголовок If-None-Match)
+    :param response: Відповідь (заголовки ETag і Cache-Control)
     :param db: Сесія бази даних
     :param current_user: Поточний авторизований користувач
-    :return: Профіль користувача
+    :return: Профіль користувача або 304 без тіла
     """
     user_profile = await repository_users.get_user_profile(username, db)
     if user_profile is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=NOT_FOUND)
+    cached = http_cache.not_modified(request, response, http_cache.profile_etag(user_profile), settings.cache_control_profile)
+    if cached:
+        return cached
     return user_profile
 
 
@@ -159,6 +184,54 @@ async def read_liked_posts_by_me(
     return posts
 
 
+# --------------------------------------------
+# FOLLOWS
+# --------------------------------------------
+async def _follow_target(user_id: int, current_user: User, db: Session) -> User:
+    if user_id == current_user.id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=CANNOT_FOLLOW_SELF)
+    user = await repository_users.get_user_by_id(user_id, db)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=NOT_FOUND)
+    return user
+
+
+@router.post("/follow/{user_id}", response_model=FollowResponse, dependencies=[Depends(allowed_get_user)])
+async def follow_user(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    """
+    Підписатися на публікації користувача (його нові пости з'являться в /posts/feed).
+
+    :param user_id: ID користувача
+    :return: Стан підписки та кількість підписників
+    """
+    user = await _follow_target(user_id, current_user, db)
+    await repository_users.follow_user(current_user, user_id, db)
+    # після commit атрибути user прострочені, тож followers_count перечитується з БД
+    return FollowResponse(user_id=user_id, following=True, followers_count=user.followers_count)
+
+
+@router.delete("/follow/{user_id}", response_model=FollowResponse, dependencies=[Depends(allowed_get_user)])
+async def unfollow_user(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(auth_service.get_current_user)
+):
+    """
+    Скасувати підписку на користувача.
+
+    :param user_id: ID користувача
+    :return: Стан підписки та кількість підписників
+    """
+    user = await _follow_target(user_id, current_user, db)
+    await repository_users.unfollow_user(current_user, user_id, db)
+    # після commit атрибути user прострочені, тож followers_count перечитується з БД
+    return FollowResponse(user_id=user_id, following=False, followers_count=user.followers_count)
+
+
 # --------------------------------------------
 # ADMIN ACTIONS
 # --------------------------------------------
@@ -1,5 +1,6 @@
+import enum
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, EmailStr, Field, field_validator
 from app.database.models import UserRoleEnum
 
@@ -47,6 +48,15 @@ class UserResponse(BaseModel):
     detail: str = "User successfully created"
 
 
+class FollowResponse(BaseModel):
+    """
+    Стан підписки на користувача.
+    """
+    user_id: int
+    following: bool
+    followers_count: int
+
+
 class UserProfileModel(BaseModel):
     """
     Повний профіль користувача.
@@ -98,6 +108,14 @@ class HashtagResponse(HashtagModel):
     model_config = {"from_attributes": True}
 
 
+class TrendingHashtag(BaseModel):
+    """
+    Хештег і кількість його використань за вікно.
+    """
+    title: str
+    uses: int
+
+
 class HashtagsLimited(BaseModel):
     """
     Модель для обмеження кількості хештегів до 5.
@@ -137,6 +155,24 @@ class CommentUpdate(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class CommentPage(BaseModel):
+    """
+    Сторінка коментарів з курсором на наступну сторінку.
+    """
+    items: List[CommentResponse]
+    next_cursor: Optional[str] = None
+    total: int = 0
+
+
+class CommentImportModel(CommentBase):
+    """
+    Рядок NDJSON для масового імпорту коментарів.
+    """
+    post_id: int
+    user_id: int
+    created_at: Optional[datetime] = None
+
+
 # ------------------- Ratings -------------------
 
 class RatingBase(BaseModel):
@@ -152,6 +188,31 @@ class RatingModel(RatingBase):
     model_config = {"from_attributes": True}
 
 
+class RatingImportModel(RatingBase):
+    """
+    Рядок NDJSON для масового імпорту рейтингів.
+    """
+    post_id: int
+    user_id: int
+    created_at: Optional[datetime] = None
+
+
+# ------------------- Bulk import -------------------
+
+class ImportLineError(BaseModel):
+    line: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    """
+    Результат масового імпорту: кількість записаних рядків та помилки по рядках.
+    """
+    imported: int = 0
+    failed: int = 0
+    errors: List[ImportLineError] = Field(default_factory=list)
+
+
 # ------------------- Posts -------------------
 
 class PostBase(BaseModel):
@@ -187,12 +248,49 @@ class PostResponse(PostBase):
     id: int
     hashtags: List[HashtagModel]
     avg_rating: Optional[float] = 0.0
+    rating_count: Optional[int] = 0
+    rating_score: Optional[float] = None
+    variants: Optional[Dict[str, Dict[str, str]]] = None
     created_at: datetime
     updated_at: datetime
 
     model_config = {"from_attributes": True}
 
 
+class SimilarPost(BaseModel):
+    """
+    Пост зі схожим зображенням (пошук дублікатів).
+    """
+    distance: int = Field(..., description="Відстань Хеммінга між pHash зображень (0 — те саме зображення)")
+    post: PostResponse
+
+
+class HashtagMatchEnum(str, enum.Enum):
+    """Як поєднувати кілька хештегів у пошуку"""
+    any = "any"
+    all = "all"
+
+
+class PostSortEnum(str, enum.Enum):
+    """Порядок результатів пошуку постів"""
+    newest = "newest"
+    top_rated = "top_rated"
+
+
+class PostSearch(BaseModel):
+    """
+    Фільтри пошуку постів. Незаповнені поля не обмежують вибірку.
+    """
+    hashtags: List[str] = []
+    match: HashtagMatchEnum = HashtagMatchEnum.any
+    keyword: Optional[str] = None
+    author: Optional[str] = None
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    min_rating: Optional[float] = Field(default=None, ge=1, le=5)
+    sort: PostSortEnum = PostSortEnum.newest
+
+
 # ------------------- Email / Roles -------------------
 
 class RequestEmail(BaseModel):
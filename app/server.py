@@ -0,0 +1,61 @@
+"""
+server.py — production-запуск PhotoShare API.
+
+Запускає кілька процесів uvicorn (за замовчуванням — за кількістю доступних CPU)
+з event loop uvloop та HTTP-парсером httptools, налаштовуваними keep-alive, backlog
+і тайм-аутом graceful shutdown. Під час зупинки кожен воркер спершу дочікується
+незавершених запитів, а потім — завантажень у Cloudinary (див. app.services.uploads).
+
+Запуск:
+    python -m app.server
+
+Параметри беруться з WEB_* змінних середовища (див. app/conf/config.py).
+"""
+
+import os
+
+import uvicorn
+
+from app.conf.config import settings
+
+
+def cpu_count() -> int:
+    """
+    Кількість CPU, доступних процесу (з урахуванням обмежень контейнера через affinity).
+
+    :return: Кількість CPU, щонайменше 1
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return max(len(os.sched_getaffinity(0)), 1)
+    return os.cpu_count() or 1
+
+
+def worker_count() -> int:
+    """
+    :return: WEB_WORKERS або кількість доступних CPU, якщо WEB_WORKERS = 0
+    """
+    return settings.web_workers if settings.web_workers > 0 else cpu_count()
+
+
+def main() -> None:
+    """
+    Запускає uvicorn з production-налаштуваннями.
+    """
+    uvicorn.run(
+        "app.main:app",
+        host=settings.web_host,
+        port=settings.web_port,
+        workers=worker_count(),
+        loop="uvloop",
+        http="httptools",
+        timeout_keep_alive=settings.web_keep_alive,
+        backlog=settings.web_backlog,
+        timeout_graceful_shutdown=settings.web_graceful_timeout,
+        limit_max_requests=settings.web_limit_max_requests,
+        proxy_headers=True,
+        access_log=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+cloudinary_cleanup.py — черга public_id, які треба видалити з Cloudinary.
+
+Видалення поста чи користувача не чекає на Cloudinary: public_id зображень потрапляють
+у множину cloudinary:orphans у Redis, а періодична задача обслуговування (app.services.maintenance)
+видаляє їх пачками по 100 одним викликом cloudinary.api.delete_resources. Перед кожною пачкою
+з неї вилучаються public_id, на які знову посилається пост або запис ImageHash (файл завантажили
+повторно, поки він чекав у черзі). Пачка, яку не вдалося видалити (мережа, ліміт API), залишається
+в черзі до наступного запуску.
+
+Містить:
+- enqueue: додавання public_id у чергу
+- discard: вилучення public_id з черги (зображення знову використовується)
+- purge: видалення накопичених public_id пачками
+"""
+
+from typing import Iterable
+
+import cloudinary.api
+import cloudinary.exceptions
+from redis.exceptions import RedisError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.cache import redis_cache
+from app.repository import images as repository_images
+
+ORPHANS_KEY = "cloudinary:orphans"
+# Максимум public_id в одному виклику Admin API delete_resources
+DELETE_BATCH = 100
+
+
+async def enqueue(public_ids: Iterable[str]) -> None:
+    """
+    Додає public_id у чергу на видалення.
+
+    :param public_ids: public_id зображень
+    """
+    public_ids = [public_id for public_id in public_ids if public_id]
+    if not public_ids:
+        return
+    try:
+        await redis_cache.sadd(ORPHANS_KEY, *public_ids)
+    except RedisError as err:
+        print(f"Cloudinary cleanup queue error: {err}")
+
+
+async def discard(public_ids: Iterable[str]) -> None:
+    """
+    Вилучає public_id з черги на видалення, наприклад, коли той самий файл завантажили знову.
+
+    :param public_ids: public_id зображень
+    """
+    public_ids = [public_id for public_id in public_ids if public_id]
+    if not public_ids:
+        return
+    try:
+        await redis_cache.srem(ORPHANS_KEY, *public_ids)
+    except RedisError as err:
+        print(f"Cloudinary cleanup queue error: {err}")
+
+
+async def purge(limit: int, db: Session) -> int:
+    """
+    Видаляє з Cloudinary public_id з черги пачками по DELETE_BATCH.
+
+    public_id, які знову використовуються, прибираються з черги без видалення.
+    Невдала пачка залишається в черзі до наступного запуску.
+
+    :param limit: Максимальна кількість public_id за один запуск
+    :param db: SQLAlchemy сесія
+    :return: Кількість видалених public_id
+    """
+    public_ids = [
+        value.decode() if isinstance(value, bytes) else value
+        for value in await redis_cache.srandmember(ORPHANS_KEY, limit)
+    ]
+    purged = 0
+    for start in range(0, len(public_ids), DELETE_BATCH):
+        batch = public_ids[start:start + DELETE_BATCH]
+        # перевірка безпосередньо перед видаленням: попередні пачки могли йти довго
+        used = await repository_images.referenced_images(batch, db)
+        if used:
+            await redis_cache.srem(ORPHANS_KEY, *used)
+            batch = [public_id for public_id in batch if public_id not in used]
+        if not batch:
+            continue
+        try:
+            await run_in_threadpool(cloudinary.api.delete_resources, batch)
+        except cloudinary.exceptions.Error as err:
+            print(f"Cloudinary cleanup error: {err}")
+            continue
+        await redis_cache.srem(ORPHANS_KEY, *batch)
+        purged += len(batch)
+    return purged
@@ -0,0 +1,113 @@
+"""
+comment_cache.py — кеш першої сторінки коментарів поста в Redis.
+
+Перша сторінка треду читається найчастіше, тому вона (разом із загальною
+кількістю коментарів) зберігається в хеші comments:post:{post_id}, де поле —
+розмір сторінки. Будь-яка зміна коментарів поста видаляє весь хеш і збільшує
+версію comments:version:{post_id}. Сторінка, прочитана з БД, записується лише тоді,
+коли версія не змінилася з моменту перед читанням (WATCH/MULTI), тож запит, що
+прочитав БД до зміни, не поверне в кеш застарілу сторінку.
+
+Містить:
+- get_first_page: читання закешованої сторінки
+- get_version: поточна версія коментарів поста
+- set_first_page: запис сторінки з TTL, якщо версія не змінилася
+- invalidate: скидання кешу для набору постів
+
+Помилки Redis не піднімаються: читання повертає None, і repository йде в БД.
+"""
+
+from typing import Iterable, Optional
+
+from redis.exceptions import RedisError, WatchError
+
+from app.cache import redis_cache
+from app.conf.config import settings
+from app.schemas import CommentPage
+
+POST_KEY = "comments:post:{}"
+VERSION_KEY = "comments:version:{}"
+# версія живе значно довше за будь-який запит, що читає сторінку з БД
+VERSION_TTL = 86400
+
+
+async def get_first_page(post_id: int, limit: int) -> Optional[CommentPage]:
+    """
+    Повертає закешовану першу сторінку коментарів поста.
+
+    :param post_id: ID поста
+    :param limit: Розмір сторінки
+    :return: CommentPage або None, якщо в кеші немає чи Redis недоступний
+    """
+    try:
+        cached = await redis_cache.hget(POST_KEY.format(post_id), str(limit))
+    except RedisError as err:
+        print(f"Comment cache read error: {err}")
+        return None
+    if cached is None:
+        return None
+    return CommentPage.model_validate_json(cached)
+
+
+async def get_version(post_id: int) -> Optional[int]:
+    """
+    Повертає версію коментарів поста; її треба прочитати до читання сторінки з БД.
+
+    :param post_id: ID поста
+    :return: Версія (0, якщо коментарі ще не змінювалися) або None, якщо Redis недоступний
+    """
+    try:
+        return int(await redis_cache.get(VERSION_KEY.format(post_id)) or 0)
+    except RedisError as err:
+        print(f"Comment cache read error: {err}")
+        return None
+
+
+async def set_first_page(post_id: int, limit: int, page: CommentPage, version: Optional[int]) -> None:
+    """
+    Записує першу сторінку коментарів поста у кеш, якщо з моменту читання версії
+    коментарі поста не змінювалися.
+
+    :param post_id: ID поста
+    :param limit: Розмір сторінки
+    :param page: Сторінка коментарів
+    :param version: Версія, прочитана get_version перед читанням сторінки з БД
+    """
+    if version is None:
+        return
+    key, version_key = POST_KEY.format(post_id), VERSION_KEY.format(post_id)
+    try:
+        async with redis_cache.pipeline(transaction=True) as pipe:
+            await pipe.watch(version_key)
+            if int(await pipe.get(version_key) or 0) != version:
+                return
+            pipe.multi()
+            pipe.hset(key, str(limit), page.model_dump_json())
+            pipe.expire(key, settings.comments_cache_ttl)
+            await pipe.execute()
+    except WatchError:
+        # invalidate між перевіркою версії та записом — сторінка вже застаріла
+        return
+    except RedisError as err:
+        print(f"Comment cache write error: {err}")
+
+
+async def invalidate(post_ids: Iterable[int]) -> None:
+    """
+    Видаляє закешовані сторінки коментарів для постів і збільшує їхні версії.
+
+    :param post_ids: ID постів, коментарі яких змінилися
+    """
+    post_ids = {post_id for post_id in post_ids if post_id is not None}
+    if not post_ids:
+        return
+    try:
+        pipe = redis_cache.pipeline(transaction=True)
+        for post_id in post_ids:
+            version_key = VERSION_KEY.format(post_id)
+            pipe.incr(version_key)
+            pipe.expire(version_key, VERSION_TTL)
+            pipe.delete(POST_KEY.format(post_id))
+        await pipe.execute()
+    except RedisError as err:
+        print(f"Comment cache invalidate error: {err}")
@@ -0,0 +1,168 @@
+"""
+compression.py — стиснення HTTP-відповідей (Brotli або GZip).
+
+Алгоритм обирається за заголовком Accept-Encoding: Brotli, якщо клієнт його приймає
+і встановлено пакет brotli, інакше GZip. Відповіді, коротші за мінімальний розмір,
+і відповіді, що вже мають Content-Encoding, не стискаються. Потокові відповіді
+(NDJSON) стискаються по частинах: кожна частина одразу йде клієнту.
+
+Містить:
+- accepted_encodings: розбір Accept-Encoding з урахуванням q=0
+- CompressionMiddleware: ASGI middleware стиснення відповідей
+"""
+
+import zlib
+from typing import Callable, Set
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli — необов'язкова залежність, без неї працює лише GZip
+    brotli = None
+
+
+def accepted_encodings(header: str) -> Set[str]:
+    """
+    Повертає кодування, які приймає клієнт.
+
+    :param header: Значення заголовка Accept-Encoding
+    :return: Множина назв кодувань у нижньому регістрі (без тих, що мають q=0)
+    """
+    result = set()
+    for item in header.split(","):
+        name, *params = [part.strip() for part in item.split(";")]
+        if not name:
+            continue
+        quality = next((param[2:] for param in params if param.startswith("q=")), "1")
+        try:
+            if float(quality) > 0:
+                result.add(name.lower())
+        except ValueError:
+            continue
+    return result
+
+
+class _GzipCompressor:
+    """Потоковий компресор GZip (zlib з заголовком gzip)."""
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor:
+    """Потоковий компресор Brotli."""
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _CompressionResponder:
+    """
+    Стискає тіло однієї відповіді.
+
+    Повідомлення http.response.start затримується до першої частини тіла: лише тоді
+    відомо, чи стискати відповідь (розмір, вже встановлений Content-Encoding).
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int, encoding: str, compressor: Callable[[], object]):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoding = encoding
+        self.compressor = compressor
+        self.send: Send = None
+        self.start_message: Message = {}
+        self.started = False
+        self.passthrough = False
+        self.stream = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            self.passthrough = "content-encoding" in Headers(raw=message["headers"])
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            if not self.started and message["type"] == "http.response.body":
+                self.started = True
+                await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self.started:
+            self.started = True
+            if len(body) < self.minimum_size and not more_body:
+                await self.send(self.start_message)
+                await self.send(message)
+                self.passthrough = True
+                return
+            self.stream = self.compressor()
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = self.stream.compress(body) + self.stream.finish()
+                headers["Content-Length"] = str(len(body))
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            await self.send(self.start_message)
+
+        chunk = self.stream.compress(body)
+        if not more_body:
+            chunk += self.stream.finish()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+
+class CompressionMiddleware:
+    """
+    Стискає відповіді Brotli або GZip залежно від Accept-Encoding клієнта.
+
+    :param app: ASGI-застосунок
+    :param minimum_size: Мінімальний розмір тіла в байтах, з якого відповідь стискається
+    :param gzip_level: Рівень стиснення GZip (1–9)
+    :param brotli_quality: Якість стиснення Brotli (0–11)
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1000, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            encodings = accepted_encodings(Headers(scope=scope).get("Accept-Encoding", ""))
+            if brotli is not None and "br" in encodings:
+                responder = _CompressionResponder(
+                    self.app, self.minimum_size, "br", lambda: _BrotliCompressor(self.brotli_quality)
+                )
+                await responder(scope, receive, send)
+                return
+            if "gzip" in encodings:
+                responder = _CompressionResponder(
+                    self.app, self.minimum_size, "gzip", lambda: _GzipCompressor(self.gzip_level)
+                )
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
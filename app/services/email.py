@@ -1,6 +1,3 @@
-from pathlib import Path
-from typing import Optional
-
 from fastapi import APIRouter, HTTPException, Depends, status, Security, BackgroundTasks, Request
 from fastapi.security import OAuth2PasswordRequestForm, HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
@@ -18,46 +15,26 @@ from app.conf.messages import (
     USER_IS_LOGOUT, INVALID_TOKEN
 )
 
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from fastapi_mail.errors import ConnectionErrors
+from redis.exceptions import RedisError
+
+from app.services import mail_queue
 
 router = APIRouter(prefix='/auth', tags=["authentication"])
 security = HTTPBearer()
 
-# --- Mail configuration ---
-conf = ConnectionConfig(
-    MAIL_USERNAME="fatsapiuser@meta.ua",
-    MAIL_PASSWORD="pythonCourse2023",
-    MAIL_FROM="fatsapiuser@meta.ua",
-    MAIL_FROM_NAME="PhotoShare Application",
-    MAIL_SERVER="smtp.meta.ua",
-    MAIL_PORT=465,
-    MAIL_STARTTLS=False,
-    MAIL_SSL_TLS=True,
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True,
-    TEMPLATE_FOLDER=Path(__file__).parent / 'templates',
-)
-
 
 async def send_email(email: EmailStr, username: str, host: str):
-    """Send confirmation email with token"""
+    """Queue confirmation email with token (sent by the mail worker, see app.services.mail_queue)"""
     try:
         token_verification = auth_service.create_email_token({"sub": email})
-        message = MessageSchema(
-            subject="Confirm your email",
-            recipients=[str(email)],
-            template_body={
-                "host": host,
-                "username": username,
-                "token": token_verification
-            },
-            subtype=MessageType.html
+        await mail_queue.enqueue(
+            str(email),
+            "Confirm your email",
+            "example_email.html",
+            {"host": str(host), "username": username, "token": token_verification},
         )
-        fm = FastMail(conf)
-        await fm.send_message(message, template_name="example_email.html")
-    except ConnectionErrors as err:
-        print("Mail connection error:", err)
+    except RedisError as err:
+        print("Mail queue error:", err)
 
 
 # --- Signup ---
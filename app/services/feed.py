@@ -0,0 +1,97 @@
+"""
+feed.py — стрічки підписок (home feed) у Redis lists.
+
+Стрічка користувача — список feed:{user_id} з ID постів, найновіші зліва, обрізаний
+до FEED_MAX_LENGTH. Новий пост розсилається (fan-out-on-write) лише в уже наявні
+стрічки (LPUSHX): стрічку неактивного користувача не тримаємо в пам'яті, вона
+збирається з БД при першому читанні й живе FEED_TTL секунд від останнього читання.
+
+Містить:
+- push_post: розсилка ID нового поста підписникам пачками
+- read_feed / store_feed / drop_feed: читання, заповнення та скидання стрічки
+
+Якщо Redis недоступний, read_feed повертає None, і repository збирає сторінку з БД.
+"""
+
+from typing import Iterable, List, Optional
+
+from redis.exceptions import RedisError
+
+from app.cache import redis_cache
+from app.conf.config import settings
+
+FEED_KEY = "feed:{}"
+
+
+async def push_post(post_id: int, follower_ids: Iterable[int]) -> None:
+    """
+    Додає пост на початок стрічок підписників, що вже є в Redis.
+
+    :param post_id: ID нового поста
+    :param follower_ids: ID підписників автора
+    """
+    batch_size = settings.feed_fanout_batch_size
+    follower_ids = list(follower_ids)
+    try:
+        for start in range(0, len(follower_ids), batch_size):
+            pipe = redis_cache.pipeline(transaction=False)
+            for follower_id in follower_ids[start:start + batch_size]:
+                key = FEED_KEY.format(follower_id)
+                pipe.lpushx(key, post_id)
+                pipe.ltrim(key, 0, settings.feed_max_length - 1)
+            await pipe.execute()
+    except RedisError as err:
+        print(f"Feed fan-out error: {err}")
+
+
+async def read_feed(user_id: int, count: int) -> Optional[List[int]]:
+    """
+    Повертає перші count ID постів зі стрічки та продовжує її TTL.
+
+    :param user_id: ID користувача
+    :param count: Кількість ID
+    :return: Список ID або None, якщо стрічки немає чи Redis недоступний
+    """
+    key = FEED_KEY.format(user_id)
+    try:
+        pipe = redis_cache.pipeline(transaction=False)
+        pipe.lrange(key, 0, count - 1)
+        pipe.expire(key, settings.feed_ttl)
+        members, exists = await pipe.execute()
+    except RedisError as err:
+        print(f"Feed read error: {err}")
+        return None
+    if not exists:
+        return None
+    return [int(member) for member in members]
+
+
+async def store_feed(user_id: int, post_ids: List[int]) -> None:
+    """
+    Заповнює стрічку користувача заново (після збирання з БД).
+
+    :param user_id: ID користувача
+    :param post_ids: ID постів, найновіші першими
+    """
+    key = FEED_KEY.format(user_id)
+    try:
+        pipe = redis_cache.pipeline(transaction=True)
+        pipe.delete(key)
+        if post_ids:
+            pipe.rpush(key, *post_ids[:settings.feed_max_length])
+            pipe.expire(key, settings.feed_ttl)
+        await pipe.execute()
+    except RedisError as err:
+        print(f"Feed store error: {err}")
+
+
+async def drop_feed(user_id: int) -> None:
+    """
+    Скидає стрічку користувача (наприклад, після зміни підписок); наступне читання збере її з БД.
+
+    :param user_id: ID користувача
+    """
+    try:
+        await redis_cache.delete(FEED_KEY.format(user_id))
+    except RedisError as err:
+        print(f"Feed drop error: {err}")
@@ -0,0 +1,122 @@
+"""
+http_cache.py — умовні GET-запити (ETag / If-None-Match) та політики Cache-Control.
+
+Слабкий ETag (W/"...") будується з «версійних» полів запису (updated_at, лічильники
+агрегатів), а не з тіла відповіді, тож перевірка не потребує серіалізації. Якщо
+клієнт надіслав If-None-Match зі збіжним тегом, ендпоінт повертає 304 без тіла.
+
+Містить:
+- weak_etag: ETag з версійних полів
+- etag_matches: порівняння з заголовком If-None-Match (слабке порівняння, RFC 9110)
+- not_modified: 304-відповідь або заголовки ETag/Cache-Control для звичайної відповіді
+- post_etag / user_etag / profile_etag / tags_etag: ETag для постів, користувачів і хештегів
+"""
+
+import hashlib
+from typing import Iterable, Optional
+
+from fastapi import Request, Response
+from starlette import status
+
+from app.database.models import Hashtag, Post, User
+from app.schemas import UserProfileModel
+
+
+def weak_etag(*parts) -> str:
+    """
+    Будує слабкий ETag з версійних полів запису.
+
+    :param parts: Значення, зміна яких означає зміну відповіді
+    :return: Заголовок ETag виду W/"<hex>"
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Перевіряє, чи збігається ETag з одним із тегів у If-None-Match.
+
+    :param if_none_match: Значення заголовка If-None-Match (може бути None)
+    :param etag: Поточний ETag ресурсу
+    :return: True, якщо клієнт уже має актуальну версію
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = _opaque(etag)
+    return any(_opaque(tag) == current for tag in if_none_match.split(","))
+
+
+def not_modified(request: Request, response: Response, etag: str, cache_control: str) -> Optional[Response]:
+    """
+    Обробляє умовний GET.
+
+    Якщо If-None-Match збігається з etag, повертає порожню відповідь 304, яку ендпоінт
+    має віддати замість даних (response_model тоді не серіалізується). Інакше додає
+    ETag і Cache-Control до відповіді ендпоінта й повертає None.
+
+    :param request: Запит
+    :param response: Відповідь ендпоінта (з Depends/параметра Response)
+    :param etag: Поточний ETag ресурсу
+    :param cache_control: Політика Cache-Control для маршруту
+    :return: Відповідь 304 або None
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def post_etag(post: Post) -> str:
+    """
+    ETag поста: updated_at, агрегати рейтингу (оцінка не змінює updated_at) і хештеги.
+
+    :param post: Пост
+    :return: Слабкий ETag
+    """
+    return weak_etag(
+        "post", post.id, post.updated_at, post.rating_sum, post.rating_count,
+        [(tag.id, tag.title) for tag in post.hashtags],
+    )
+
+
+def user_etag(user: User) -> str:
+    """
+    ETag користувача за users.updated_at.
+
+    :param user: Користувач
+    :return: Слабкий ETag
+    """
+    return weak_etag("user", user.id, user.updated_at)
+
+
+def profile_etag(profile: UserProfileModel) -> str:
+    """
+    ETag профілю: лічильники постів, коментарів і оцінок не мають окремої версії,
+    тому до тегу входять самі значення профілю.
+
+    :param profile: Профіль користувача
+    :return: Слабкий ETag
+    """
+    return weak_etag(
+        "profile", profile.username, profile.email, profile.avatar, profile.is_active,
+        profile.post_count, profile.comment_count, profile.rates_count,
+    )
+
+
+def tags_etag(tags: Iterable[Hashtag]) -> str:
+    """
+    ETag хештегу чи списку хештегів: змінюваним полем хештегу є лише назва.
+
+    :param tags: Хештеги у порядку відповіді
+    :return: Слабкий ETag
+    """
+    return weak_etag("tags", [(tag.id, tag.title) for tag in tags])
@@ -0,0 +1,193 @@
+"""
+image_hash.py — перцептивний хеш зображень (pHash) і пошук схожих зображень.
+
+pHash рахується так само, як у бібліотеці imagehash: зображення в градаціях сірого
+зменшується до 32×32, з нього береться двовимірне DCT, а 64 біти хешу — це ознаки
+«коефіцієнт більший за медіану» для низьких частот 8×8. Схожі зображення (інший розмір,
+стиснення, дрібні правки) мають хеші з малою відстанню Хеммінга.
+
+Для пошуку використовується BK-дерево: завдяки нерівності трикутника пошук у радіусі d
+обходить лише гілки з відстанню від вузла в межах [D - d, D + d], а не всі хеші.
+
+Містить:
+- phash / phash_file: pHash зображення
+- hamming: відстань Хеммінга між хешами
+- BKTree: індекс хешів у пам'яті процесу
+- image_index: індекс pHash зображень постів
+"""
+
+import math
+import time
+from functools import lru_cache
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image, UnidentifiedImageError
+from starlette.concurrency import run_in_threadpool
+
+HASH_SIZE = 8
+IMAGE_SIZE = HASH_SIZE * 4
+
+
+@lru_cache(maxsize=1)
+def _dct_table() -> List[List[float]]:
+    # cos((2x + 1) * u * pi / 2N) для перших HASH_SIZE частот u
+    return [
+        [math.cos((2 * x + 1) * u * math.pi / (2 * IMAGE_SIZE)) for x in range(IMAGE_SIZE)]
+        for u in range(HASH_SIZE)
+    ]
+
+
+def phash(image: Image.Image) -> int:
+    """
+    Рахує 64-бітний pHash зображення.
+
+    :param image: Зображення Pillow
+    :return: Хеш як ціле число
+    """
+    pixels = list(image.convert("L").resize((IMAGE_SIZE, IMAGE_SIZE), Image.LANCZOS).getdata())
+    rows = [pixels[y * IMAGE_SIZE:(y + 1) * IMAGE_SIZE] for y in range(IMAGE_SIZE)]
+    table = _dct_table()
+    # DCT по рядках, а потім по стовпцях — лише для потрібних низьких частот
+    by_rows = [[sum(c * p for c, p in zip(cosines, row)) for cosines in table] for row in rows]
+    coefficients = [
+        sum(table[v][y] * by_rows[y][u] for y in range(IMAGE_SIZE))
+        for v in range(HASH_SIZE) for u in range(HASH_SIZE)
+    ]
+    median = sorted(coefficients)[len(coefficients) // 2]
+    value = 0
+    for coefficient in coefficients:
+        value = (value << 1) | (coefficient > median)
+    return value
+
+
+def _phash_file(file: BinaryIO) -> Optional[int]:
+    file.seek(0)
+    try:
+        with Image.open(file) as image:
+            # JPEG декодується одразу в зменшеному масштабі — для хешу 32×32 повний розмір не потрібен
+            image.draft("L", (IMAGE_SIZE * 2, IMAGE_SIZE * 2))
+            return phash(image)
+    except (UnidentifiedImageError, OSError):
+        return None
+    finally:
+        file.seek(0)
+
+
+async def phash_file(file: BinaryIO) -> Optional[int]:
+    """
+    Рахує pHash файлу зображення в пулі потоків. Після читання файл перемотується на початок.
+
+    :param file: Файл зображення
+    :return: Хеш або None, якщо файл не вдалося розпізнати як зображення
+    """
+    return await run_in_threadpool(_phash_file, file)
+
+
+def hamming(left: int, right: int) -> int:
+    """
+    :return: Кількість бітів, якими відрізняються два хеші
+    """
+    return (left ^ right).bit_count()
+
+
+class BKTree:
+    """
+    BK-дерево хешів у пам'яті процесу.
+
+    Вузол — хеш і ключі (public_id) зображень з цим хешем, діти — за відстанню до вузла.
+    Видалені ключі лише прибираються з вузла; дерево очищається під час перебудови,
+    яка відбувається, коли індекс старший за TTL, тож зміни інших процесів теж з'являються в ньому.
+    """
+
+    def __init__(self):
+        self._root: Optional[list] = None
+        self._hashes: Dict[str, int] = {}
+        self._nodes: Dict[int, list] = {}
+        self.built_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def is_stale(self, ttl: int) -> bool:
+        """
+        :param ttl: Максимальний вік індексу в секундах
+        :return: True, якщо індекс не побудований або застарів
+        """
+        return self.built_at is None or time.monotonic() - self.built_at > ttl
+
+    def rebuild(self, rows: Iterable[Tuple[str, int]]) -> None:
+        """
+        Будує дерево заново з пар (ключ, хеш).
+
+        :param rows: Пари (ключ, хеш)
+        """
+        self._root = None
+        self._hashes.clear()
+        self._nodes.clear()
+        for key, value in rows:
+            self.add(key, value)
+        self.built_at = time.monotonic()
+
+    def add(self, key: str, value: Optional[int]) -> None:
+        """
+        Додає хеш у дерево.
+
+        :param key: Ключ зображення
+        :param value: Хеш (None — лише видалити старе значення)
+        """
+        self.remove(key)
+        if value is None:
+            return
+        self._hashes[key] = value
+        node = self._nodes.get(value)
+        if node is not None:
+            node[1].add(key)
+            return
+        node = [value, {key}, {}]
+        self._nodes[value] = node
+        if self._root is None:
+            self._root = node
+            return
+        current = self._root
+        while True:
+            distance = hamming(value, current[0])
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def remove(self, key: str) -> None:
+        """
+        Прибирає ключ з дерева.
+
+        :param key: Ключ зображення
+        """
+        value = self._hashes.pop(key, None)
+        if value is not None:
+            self._nodes[value][1].discard(key)
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[str, int]]:
+        """
+        Шукає ключі, хеші яких відрізняються від value не більше ніж на max_distance бітів.
+
+        :param value: Хеш запиту
+        :param max_distance: Максимальна відстань Хеммінга
+        :return: Пари (ключ, відстань) від найближчих
+        """
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= max_distance:
+                found.extend((key, distance) for key in node[1])
+            for child_distance, child in node[2].items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        found.sort(key=lambda item: (item[1], item[0]))
+        return found
+
+
+# Індекс pHash зображень постів (ключ — public_id)
+image_index = BKTree()
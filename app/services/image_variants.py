@@ -0,0 +1,157 @@
+"""
+image_variants.py — адаптивні варіанти зображення поста (thumb / medium / large × jpg / webp / avif).
+
+Варіанти генеруються один раз під час завантаження, а їхні URL зберігаються в posts.variants
+у вигляді {"thumb": {"jpg": url, "webp": url, "avif": url}, "medium": {...}, "large": {...}},
+щоб клієнт сам обирав потрібний розмір і формат.
+
+Бекенди (IMAGE_VARIANTS_BACKEND):
+- cloudinary — eager-трансформації Cloudinary в тому ж запиті upload;
+- local — Pillow, файли зберігаються в media/variants/{public_id}/ і віддаються через /media.
+
+Містить:
+- upload_options: додаткові параметри для cloudinary.uploader.upload
+- build_variants: URL варіантів після завантаження оригіналу
+- delete_variants: видалення локальних файлів варіантів
+"""
+
+import io
+import os
+import shutil
+from typing import BinaryIO, Dict, List
+
+import cloudinary
+from fastapi import Request
+from PIL import Image, ImageOps, features
+from starlette.concurrency import run_in_threadpool
+
+from app.conf.config import MEDIA_DIR, settings
+
+# Абсолютний шлях, щоб файли потрапляли в ту саму теку, яку main монтує як /media
+VARIANTS_DIR = os.path.join(MEDIA_DIR, "variants")
+
+# Розміри: thumb — квадратна обрізка для сітки, medium/large — зменшення лише по ширині
+VARIANT_SIZES = {
+    "thumb": {"width": 200, "height": 200, "crop": "fill", "gravity": "auto"},
+    "medium": {"width": 800, "crop": "limit"},
+    "large": {"width": 1600, "crop": "limit"},
+}
+VARIANT_FORMATS = ("jpg", "webp", "avif")
+
+# Назви форматів для Image.save та параметри якості
+_PIL_FORMATS = {"jpg": "JPEG", "webp": "WEBP", "avif": "AVIF"}
+_QUALITY = {"jpg": 82, "webp": 80, "avif": 60}
+
+VariantUrls = Dict[str, Dict[str, str]]
+
+
+def _pairs():
+    return [(name, fmt) for name in VARIANT_SIZES for fmt in VARIANT_FORMATS]
+
+
+def eager_transformations() -> List[dict]:
+    """
+    Eager-трансформації Cloudinary для всіх варіантів (порядок збігається з _pairs).
+
+    :return: Список трансформацій для параметра eager
+    """
+    return [{**VARIANT_SIZES[name], "format": fmt, "quality": "auto"} for name, fmt in _pairs()]
+
+
+def upload_options() -> dict:
+    """
+    Параметри для cloudinary.uploader.upload, потрібні вибраному бекенду.
+
+    :return: {"eager": [...], "eager_async": True} для Cloudinary або порожній словник
+    """
+    if settings.image_variants_backend == "cloudinary":
+        # eager_async: Cloudinary генерує варіанти у фоні, upload не чекає на всі 9 трансформацій
+        return {"eager": eager_transformations(), "eager_async": True}
+    return {}
+
+
+def cloudinary_variants(public_id: str, upload_result: dict) -> VariantUrls:
+    """
+    URL варіантів з відповіді Cloudinary; якщо eager-результатів немає (наприклад, eager_async),
+    URL будуються за тими самими трансформаціями.
+
+    :param public_id: public_id завантаженого зображення
+    :param upload_result: Відповідь cloudinary.uploader.upload
+    :return: URL варіантів
+    """
+    eager = upload_result.get("eager") or []
+    variants: VariantUrls = {}
+    for index, (name, fmt) in enumerate(_pairs()):
+        url = eager[index].get("secure_url") if index < len(eager) else None
+        if not url:
+            url = cloudinary.CloudinaryImage(public_id).build_url(
+                transformation=[{**VARIANT_SIZES[name], "quality": "auto"}], format=fmt, secure=True
+            )
+        variants.setdefault(name, {})[fmt] = url
+    return variants
+
+
+def _resize(image: Image.Image, spec: dict) -> Image.Image:
+    width = spec["width"]
+    if spec["crop"] == "fill":
+        return ImageOps.fit(image, (width, spec["height"]))
+    if image.width <= width:
+        return image
+    return image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+
+
+def local_variants(data: bytes, public_id: str, base_url: str) -> VariantUrls:
+    """
+    Генерує варіанти Pillow і зберігає їх у media/variants/{public_id}/.
+    AVIF пропускається, якщо Pillow зібрано без його підтримки.
+
+    :param data: Байти оригінального зображення
+    :param public_id: public_id поста (назва теки)
+    :param base_url: Базовий URL сервера для посилань на /media
+    :return: URL варіантів
+    """
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+    directory = os.path.join(VARIANTS_DIR, public_id)
+    os.makedirs(directory, exist_ok=True)
+    formats = [fmt for fmt in VARIANT_FORMATS if fmt != "avif" or features.check("avif")]
+
+    variants: VariantUrls = {}
+    for name, spec in VARIANT_SIZES.items():
+        resized = _resize(image, spec)
+        for fmt in formats:
+            # JPEG не має альфа-каналу
+            output = resized.convert("RGB") if fmt == "jpg" or resized.mode not in ("RGB", "RGBA") else resized
+            filename = f"{name}.{fmt}"
+            output.save(os.path.join(directory, filename), format=_PIL_FORMATS[fmt], quality=_QUALITY[fmt])
+            variants.setdefault(name, {})[fmt] = f"{base_url}/media/variants/{public_id}/{filename}"
+    return variants
+
+
+async def build_variants(public_id: str, upload_result: dict, file: BinaryIO, request: Request) -> VariantUrls:
+    """
+    Повертає URL варіантів щойно завантаженого зображення.
+
+    Для локального бекенду файл перечитується з початку, а обробка Pillow
+    виконується в пулі потоків, щоб не блокувати event loop.
+
+    :param public_id: public_id зображення
+    :param upload_result: Відповідь cloudinary.uploader.upload
+    :param file: Файл завантаженого зображення
+    :param request: Запит (базовий URL сервера для локального бекенду)
+    :return: URL варіантів
+    """
+    if settings.image_variants_backend == "local":
+        file.seek(0)
+        data = file.read()
+        return await run_in_threadpool(local_variants, data, public_id, str(request.base_url).rstrip("/"))
+    return cloudinary_variants(public_id, upload_result)
+
+
+def delete_variants(public_id: str) -> None:
+    """
+    Видаляє локальні файли варіантів (похідні зображення Cloudinary видаляються разом з оригіналом).
+
+    :param public_id: public_id зображення
+    """
+    if settings.image_variants_backend == "local" and public_id:
+        shutil.rmtree(os.path.join(VARIANTS_DIR, public_id), ignore_errors=True)
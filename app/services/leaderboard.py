@@ -0,0 +1,152 @@
+"""
+leaderboard.py — таблиці найкращих постів у Redis (sorted sets).
+
+Містить:
+- bayesian_score: зважена оцінка поста за сумою та кількістю голосів
+- update_post / remove_post: синхронізація глобальної таблиці та таблиць за хештегами
+- rebuild / is_built / lock_rebuild: повна побудова таблиць з posts.rating_score
+- top_post_ids: сторінка ID найкращих постів
+
+Таблицям довіряють лише після повної побудови з БД (ключ leaderboard:built): після деплою
+чи очищення Redis перша нова оцінка створила б таблицю з одним постом. Доки таблиці
+не побудовані або Redis недоступний, читання повертає None, і repository переходить
+на запит до БД за індексованою колонкою posts.rating_score.
+"""
+
+from typing import Iterable, List, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from app.cache import redis_cache
+from app.conf.config import settings
+
+GLOBAL_KEY = "leaderboard:posts"
+HASHTAG_KEY = "leaderboard:hashtag:{}"
+BUILT_KEY = "leaderboard:built"
+REBUILD_LOCK_KEY = "leaderboard:rebuild"
+# Скільки секунд інші процеси не починають власну перебудову
+REBUILD_LOCK_TTL = 60
+
+
+def bayesian_score(rating_sum, rating_count):
+    """
+    Байєсівська оцінка: (C * m + sum) / (C + count).
+
+    Працює як з числами, так і з SQL-виразами SQLAlchemy, тому та сама формула
+    використовується і в UPDATE для posts.rating_score, і в Python-коді.
+
+    :param rating_sum: Сума оцінок поста
+    :param rating_count: Кількість оцінок поста
+    :return: Зважена оцінка (або SQL-вираз)
+    """
+    prior_weight = settings.rating_prior_weight
+    return (prior_weight * settings.rating_prior_mean + rating_sum) / (prior_weight + rating_count)
+
+
+def _keys(hashtags: Iterable[str]) -> List[str]:
+    return [GLOBAL_KEY] + [HASHTAG_KEY.format(title) for title in hashtags]
+
+
+async def update_post(post_id: int, score, hashtags: Iterable[str], stale_hashtags: Iterable[str] = ()) -> None:
+    """
+    Записує оцінку поста у глобальну таблицю та в таблиці його хештегів.
+
+    Пост без жодної оцінки (score is None) прибирається з таблиць.
+
+    :param post_id: ID поста
+    :param score: Значення posts.rating_score
+    :param hashtags: Назви поточних хештегів поста
+    :param stale_hashtags: Хештеги, які від поста відкріпили
+    """
+    try:
+        pipe = redis_cache.pipeline(transaction=False)
+        for key in _keys(hashtags):
+            if score is None:
+                pipe.zrem(key, post_id)
+            else:
+                pipe.zadd(key, {post_id: float(score)})
+        for title in stale_hashtags:
+            pipe.zrem(HASHTAG_KEY.format(title), post_id)
+        await pipe.execute()
+    except RedisError as err:
+        print(f"Leaderboard update error: {err}")
+
+
+async def remove_post(post_id: int, hashtags: Iterable[str]) -> None:
+    """
+    Прибирає пост з усіх таблиць (після видалення поста).
+
+    :param post_id: ID поста
+    :param hashtags: Назви хештегів поста
+    """
+    await update_post(post_id, None, hashtags)
+
+
+async def is_built() -> bool:
+    """
+    :return: True, якщо таблиці побудовані з БД (False і тоді, коли Redis недоступний)
+    """
+    try:
+        return bool(await redis_cache.exists(BUILT_KEY))
+    except RedisError as err:
+        print(f"Leaderboard read error: {err}")
+        return False
+
+
+async def lock_rebuild() -> bool:
+    """
+    Бере lock на перебудову, щоб таблиці будував лише один процес.
+
+    :return: True, якщо lock узято
+    """
+    try:
+        return bool(await redis_cache.set(REBUILD_LOCK_KEY, 1, nx=True, ex=REBUILD_LOCK_TTL))
+    except RedisError as err:
+        print(f"Leaderboard rebuild error: {err}")
+        return False
+
+
+async def rebuild(rows: Iterable[Tuple[int, float, Iterable[str]]]) -> None:
+    """
+    Атомарно замінює всі таблиці новими й позначає їх побудованими.
+
+    :param rows: Трійки (ID поста, posts.rating_score, назви хештегів поста) для постів з оцінками
+    """
+    boards = {}
+    for post_id, score, hashtags in rows:
+        for key in _keys(hashtags):
+            boards.setdefault(key, {})[post_id] = float(score)
+    try:
+        stale = [key async for key in redis_cache.scan_iter(match=HASHTAG_KEY.format("*"))]
+        pipe = redis_cache.pipeline(transaction=True)
+        pipe.delete(GLOBAL_KEY, *stale)
+        for key, members in boards.items():
+            pipe.zadd(key, members)
+        pipe.set(BUILT_KEY, 1)
+        pipe.delete(REBUILD_LOCK_KEY)
+        await pipe.execute()
+    except RedisError as err:
+        print(f"Leaderboard rebuild error: {err}")
+
+
+async def top_post_ids(skip: int, limit: int, hashtag: Optional[str] = None) -> Optional[List[int]]:
+    """
+    Повертає сторінку ID постів з найвищою оцінкою.
+
+    :param skip: Кількість пропущених позицій
+    :param limit: Розмір сторінки
+    :param hashtag: Назва хештегу (None — глобальна таблиця)
+    :return: Список ID або None, якщо таблиці не побудовані чи Redis недоступний
+    """
+    key = HASHTAG_KEY.format(hashtag) if hashtag else GLOBAL_KEY
+    try:
+        pipe = redis_cache.pipeline(transaction=False)
+        pipe.exists(BUILT_KEY)
+        pipe.zrevrange(key, skip, skip + limit - 1)
+        built, members = await pipe.execute()
+    except RedisError as err:
+        print(f"Leaderboard read error: {err}")
+        return None
+    if not built:
+        return None
+    return [int(member) for member in members]
@@ -0,0 +1,133 @@
+"""
+login_guard.py — захист /auth/login від перебору паролів.
+
+Невдалі спроби рахуються в Redis окремо для email і для IP (лічильники живуть
+LOGIN_FAILURE_WINDOW секунд). Коли лічильник досягає порогу, ключ блокується на
+LOGIN_LOCKOUT_BASE секунд, і кожна наступна невдача подвоює блокування (до LOGIN_LOCKOUT_MAX).
+Блокування перевіряється до запиту в БД і до bcrypt, тож атака на обліковий запис
+не перетворюється на навантаження на CPU.
+
+Для невідомого email пароль перевіряється проти заздалегідь обчисленого фіктивного хешу
+з тією самою вартістю bcrypt, щоб час відповіді не видавав, чи існує обліковий запис.
+
+Містить:
+- locked_for: скільки секунд ще діє блокування для email або IP
+- register_failure: облік невдалої спроби та продовження блокування
+- register_success: скидання лічильника email після успішного входу
+- verify_password: перевірка пароля в пулі потоків (з фіктивним хешем для невідомого email)
+
+Помилки Redis не піднімаються: без Redis вхід працює, але без блокувань.
+"""
+
+import secrets
+from functools import lru_cache
+from typing import Optional
+
+from redis.exceptions import RedisError
+from starlette.concurrency import run_in_threadpool
+
+from app.cache import redis_cache
+from app.conf.config import settings
+from app.services.auth import auth_service
+
+FAIL_KEY = "login_fail:{}:{}"
+LOCK_KEY = "login_lock:{}:{}"
+
+
+def _subjects(email: str, ip: str):
+    return [("email", email.strip().lower(), settings.login_max_email_failures), ("ip", ip, settings.login_max_ip_failures)]
+
+
+def lockout_seconds(failures: int, threshold: int) -> int:
+    """
+    :param failures: Кількість невдалих спроб у поточному вікні
+    :param threshold: Поріг, з якого починається блокування
+    :return: Тривалість блокування в секундах (0 — не блокувати)
+    """
+    if failures < threshold:
+        return 0
+    return min(settings.login_lockout_base * 2 ** (failures - threshold), settings.login_lockout_max)
+
+
+async def locked_for(email: str, ip: str) -> Optional[int]:
+    """
+    Перевіряє, чи заблоковано вхід для email або IP.
+
+    :param email: Email із форми входу
+    :param ip: IP клієнта
+    :return: Кількість секунд до зняття блокування або None
+    """
+    try:
+        pipe = redis_cache.pipeline(transaction=False)
+        for kind, value, _ in _subjects(email, ip):
+            pipe.ttl(LOCK_KEY.format(kind, value))
+        ttls = await pipe.execute()
+    except RedisError as err:
+        print(f"Login guard error: {err}")
+        return None
+    remaining = max(ttls)
+    return remaining if remaining > 0 else None
+
+
+async def register_failure(email: str, ip: str) -> None:
+    """
+    Збільшує лічильники невдач для email та IP і, якщо поріг досягнуто, блокує їх.
+
+    :param email: Email із форми входу
+    :param ip: IP клієнта
+    """
+    subjects = _subjects(email, ip)
+    try:
+        pipe = redis_cache.pipeline(transaction=False)
+        for kind, value, _ in subjects:
+            pipe.incr(FAIL_KEY.format(kind, value))
+            pipe.expire(FAIL_KEY.format(kind, value), settings.login_failure_window, nx=True)
+        counters = (await pipe.execute())[::2]
+
+        pipe = redis_cache.pipeline(transaction=False)
+        for (kind, value, threshold), failures in zip(subjects, counters):
+            seconds = lockout_seconds(int(failures), threshold)
+            if seconds:
+                pipe.set(LOCK_KEY.format(kind, value), failures, ex=seconds)
+        await pipe.execute()
+    except RedisError as err:
+        print(f"Login guard error: {err}")
+
+
+async def register_success(email: str) -> None:
+    """
+    Скидає лічильник невдач email після успішного входу (лічильник IP не скидається,
+    щоб один вдалий вхід не обнуляв перебір по інших облікових записах).
+
+    :param email: Email користувача
+    """
+    value = email.strip().lower()
+    try:
+        await redis_cache.delete(FAIL_KEY.format("email", value), LOCK_KEY.format("email", value))
+    except RedisError as err:
+        print(f"Login guard error: {err}")
+
+
+@lru_cache(maxsize=1)
+def _dummy_hash() -> str:
+    # обчислюється один раз на процес, з тими ж налаштуваннями bcrypt, що й справжні хеші
+    return auth_service.get_password_hash(secrets.token_urlsafe(16))
+
+
+def _verify_dummy(password: str) -> bool:
+    # і хешування при першому виклику, і перевірка виконуються в пулі потоків
+    return auth_service.verify_password(password, _dummy_hash())
+
+
+async def verify_password(password: str, hashed_password: Optional[str]) -> bool:
+    """
+    Перевіряє пароль у пулі потоків, не блокуючи event loop.
+
+    :param password: Пароль із форми входу
+    :param hashed_password: Хеш пароля користувача або None, якщо email невідомий
+    :return: True, якщо пароль правильний (для невідомого email — завжди False)
+    """
+    if hashed_password is None:
+        await run_in_threadpool(_verify_dummy, password)
+        return False
+    return await run_in_threadpool(auth_service.verify_password, password, hashed_password)
@@ -0,0 +1,261 @@
+"""
+mail_queue.py — черга вихідних листів у Redis і воркер, що її розбирає.
+
+Запит лише кладе завдання в список mail:queue, а листи відправляє окремий процес
+(python -m app.mail_worker), тож вони не губляться під час перезапуску веб-воркера
+і не займають його event loop.
+
+Воркер:
+- забирає завдання пачками (до MAIL_BATCH_SIZE) через LMOVE у свій список mail:processing:{name},
+  тож завдання, взяті воркером, який упав, повертаються в чергу під час його наступного запуску;
+- тримає одне SMTP-з'єднання на всі листи пачки й між пачками, перепідключаючись,
+  якщо сервер його закрив або воно простоювало довше за MAIL_SMTP_IDLE_TIMEOUT;
+- у разі помилки відкладає завдання в mail:delayed з експоненційною затримкою,
+  а після MAIL_MAX_ATTEMPTS спроб переносить його в mail:dead.
+
+Містить:
+- enqueue: додавання листа в чергу
+- default_worker_name: унікальна назва воркера за замовчуванням
+- MailWorker: воркер черги
+"""
+
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import List, Optional
+
+import aiosmtplib
+from jinja2 import TemplateError
+from redis.exceptions import RedisError
+
+from app.cache import redis_cache
+from app.conf.config import settings
+from app.services import templates
+
+QUEUE_KEY = "mail:queue"
+DELAYED_KEY = "mail:delayed"
+DEAD_KEY = "mail:dead"
+PROCESSING_KEY = "mail:processing:{}"
+
+
+async def enqueue(to: str, subject: str, template_name: str, context: dict) -> str:
+    """
+    Додає лист у чергу.
+
+    :param to: Email отримувача
+    :param subject: Тема листа
+    :param template_name: Назва шаблону в app/services/templates
+    :param context: Змінні шаблону (мають серіалізуватися в JSON)
+    :return: ID завдання
+    """
+    job_id = uuid.uuid4().hex
+    job = {"id": job_id, "to": to, "subject": subject, "template": template_name, "context": context, "attempts": 0}
+    await redis_cache.lpush(QUEUE_KEY, json.dumps(job))
+    return job_id
+
+
+def retry_delay(attempts: int) -> int:
+    """
+    :param attempts: Кількість невдалих спроб
+    :return: Затримка перед наступною спробою в секундах
+    """
+    return settings.mail_retry_base * 2 ** (attempts - 1)
+
+
+async def build_message(job: dict) -> EmailMessage:
+    """
+    Збирає лист із завдання черги.
+
+    :param job: Завдання (to, subject, template, context)
+    :return: EmailMessage з HTML-тілом
+    """
+    message = EmailMessage()
+    message["From"] = formataddr((settings.mail_from_name, settings.mail_from))
+    message["To"] = job["to"]
+    message["Subject"] = job["subject"]
+    message.set_content(await templates.render_async(job["template"], **job["context"]), subtype="html")
+    return message
+
+
+def default_worker_name() -> str:
+    """
+    Назва воркера, унікальна для процесу: recover() повертає в чергу лише завдання
+    зі списку обробки цього воркера, тож спільна назва забирала б завдання в живих воркерів.
+
+    :return: "{hostname}-{pid}"
+    """
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class MailWorker:
+    """
+    Розбирає чергу листів, відправляючи їх через одне SMTP-з'єднання.
+
+    :param name: Назва воркера (ключ його списку завдань в обробці); за замовчуванням — default_worker_name()
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        self.processing_key = PROCESSING_KEY.format(name or default_worker_name())
+        self._smtp: Optional[aiosmtplib.SMTP] = None
+        self._last_used = 0.0
+
+    # --- SMTP ---
+    async def _connection(self) -> aiosmtplib.SMTP:
+        idle = time.monotonic() - self._last_used > settings.mail_smtp_idle_timeout
+        if self._smtp is not None and (idle or not self._smtp.is_connected):
+            await self.close()
+        if self._smtp is None:
+            smtp = aiosmtplib.SMTP(
+                hostname=settings.mail_server,
+                port=settings.mail_port,
+                use_tls=settings.mail_ssl_tls,
+                start_tls=settings.mail_starttls,
+                timeout=settings.mail_timeout,
+            )
+            await smtp.connect()
+            if settings.mail_username:
+                await smtp.login(settings.mail_username, settings.mail_password)
+            self._smtp = smtp
+        return self._smtp
+
+    async def _send(self, message: EmailMessage) -> None:
+        try:
+            smtp = await self._connection()
+            await smtp.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            # сервер закрив з'єднання між листами — одна спроба з новим
+            await self.close()
+            smtp = await self._connection()
+            await smtp.send_message(message)
+        self._last_used = time.monotonic()
+
+    async def close(self) -> None:
+        """
+        Закриває SMTP-з'єднання.
+        """
+        smtp, self._smtp = self._smtp, None
+        if smtp is not None and smtp.is_connected:
+            try:
+                await smtp.quit()
+            except aiosmtplib.SMTPException:
+                smtp.close()
+
+    # --- черга ---
+    async def recover(self) -> int:
+        """
+        Повертає в чергу завдання, які цей воркер взяв, але не завершив до зупинки.
+
+        :return: Кількість повернутих завдань
+        """
+        moved = 0
+        while await redis_cache.lmove(self.processing_key, QUEUE_KEY, "LEFT", "RIGHT") is not None:
+            moved += 1
+        return moved
+
+    async def promote_due(self, now: Optional[float] = None) -> int:
+        """
+        Переносить у чергу відкладені завдання, час повтору яких настав.
+
+        :return: Кількість перенесених завдань
+        """
+        now = time.time() if now is None else now
+        due = await redis_cache.zrangebyscore(DELAYED_KEY, 0, now, start=0, num=settings.mail_batch_size)
+        if not due:
+            return 0
+        # кілька воркерів можуть прочитати ті самі завдання; переносить лише той, чий ZREM їх видалив
+        pipe = redis_cache.pipeline(transaction=False)
+        for raw in due:
+            pipe.zrem(DELAYED_KEY, raw)
+        claimed = [raw for raw, removed in zip(due, await pipe.execute()) if removed]
+        if claimed:
+            await redis_cache.rpush(QUEUE_KEY, *claimed)
+        return len(claimed)
+
+    async def next_batch(self, timeout: float = 0) -> List[bytes]:
+        """
+        Забирає до MAIL_BATCH_SIZE завдань у список обробки воркера.
+
+        :param timeout: Скільки секунд чекати на перше завдання (0 — не чекати)
+        :return: Сирі завдання в порядку надходження
+        """
+        if timeout:
+            first = await redis_cache.blmove(QUEUE_KEY, self.processing_key, timeout, "RIGHT", "LEFT")
+        else:
+            first = await redis_cache.lmove(QUEUE_KEY, self.processing_key, "RIGHT", "LEFT")
+        if first is None:
+            return []
+        pipe = redis_cache.pipeline(transaction=False)
+        for _ in range(settings.mail_batch_size - 1):
+            pipe.lmove(QUEUE_KEY, self.processing_key, "RIGHT", "LEFT")
+        return [first] + [raw for raw in await pipe.execute() if raw is not None]
+
+    async def _fail(self, raw: bytes, job: dict, err: Exception, permanent: bool = False) -> None:
+        job["attempts"] += 1
+        job["error"] = str(err)
+        pipe = redis_cache.pipeline(transaction=True)
+        pipe.lrem(self.processing_key, 1, raw)
+        if permanent or job["attempts"] >= settings.mail_max_attempts:
+            print(f"Mail to {job['to']} dropped after {job['attempts']} attempts: {err}")
+            pipe.lpush(DEAD_KEY, json.dumps(job))
+        else:
+            pipe.zadd(DELAYED_KEY, {json.dumps(job): time.time() + retry_delay(job["attempts"])})
+        await pipe.execute()
+
+    async def send_batch(self, batch: List[bytes]) -> int:
+        """
+        Відправляє пачку завдань; невдалі відкладаються для повтору, а ті, з яких
+        не вдалося зібрати лист, одразу переносяться в mail:dead.
+
+        :param batch: Сирі завдання з next_batch
+        :return: Кількість відправлених листів
+        """
+        sent = 0
+        for raw in batch:
+            job = json.loads(raw)
+            try:
+                message = await build_message(job)
+            except (TemplateError, ValueError) as err:
+                # зламаний шаблон чи адреса не виправляться повтором
+                await self._fail(raw, job, err, permanent=True)
+                continue
+            try:
+                await self._send(message)
+            except (aiosmtplib.SMTPException, OSError) as err:
+                await self._fail(raw, job, err)
+                continue
+            await redis_cache.lrem(self.processing_key, 1, raw)
+            sent += 1
+        return sent
+
+    async def run_once(self, timeout: float = 0) -> int:
+        """
+        Один цикл воркера: відкладені завдання, що настали, і одна пачка з черги.
+
+        :param timeout: Скільки секунд чекати на перше завдання
+        :return: Кількість відправлених листів
+        """
+        await self.promote_due()
+        return await self.send_batch(await self.next_batch(timeout))
+
+    async def run(self) -> None:
+        """
+        Розбирає чергу, доки процес не зупинять.
+        """
+        print(f"Mail worker: {len(templates.precompile())} template(s) compiled")
+        recovered = await self.recover()
+        if recovered:
+            print(f"Mail worker: {recovered} unfinished job(s) returned to the queue")
+        try:
+            while True:
+                try:
+                    await self.run_once(timeout=settings.mail_poll_interval)
+                except RedisError as err:
+                    print(f"Mail queue error: {err}")
+                    await asyncio.sleep(settings.mail_poll_interval)
+        finally:
+            await self.close()
@@ -0,0 +1,103 @@
+"""
+maintenance.py — періодичні задачі обслуговування, зареєстровані в планувальнику (app.services.scheduler).
+
+Задачі:
+- blacklist_tokens: видалення з чорного списку токенів, старших за MAINTENANCE_BLACKLIST_RETENTION
+  (до того часу вони вже прострочені й не пройдуть перевірку JWT);
+- refresh_tokens: очищення прострочених refresh_token у користувачів;
+- qrcodes: видалення PNG з media/qrcodes, старших за MAINTENANCE_QRCODE_TTL
+  (show_qr генерує їх заново на запит);
+- cloudinary_cleanup: видалення з Cloudinary зображень видалених постів і користувачів
+  (черга app.services.cloudinary_cleanup);
+- leaderboards: побудова таблиць лідерів з БД, якщо їх немає в Redis (наприклад, після очищення Redis).
+
+Записи БД видаляються пачками по MAINTENANCE_BATCH_SIZE. Задачі з БД і файлами виконуються
+в пулі потоків, щоб не зупиняти event loop веб-воркера (MAINTENANCE_IN_APP).
+"""
+
+import os
+import time
+from datetime import datetime, timedelta
+
+from starlette.concurrency import run_in_threadpool
+
+from app.conf.config import QRCODES_DIR, settings
+from app.database.connect_db import SessionLocal
+from app.repository import ratings as repository_ratings
+from app.repository import users as repository_users
+from app.services import cloudinary_cleanup
+from app.services.scheduler import job
+
+
+def _purge_blacklist(before: datetime) -> int:
+    # синхронні цикли SQLAlchemy виконуються в пулі потоків, а не в event loop веб-воркера
+    db = SessionLocal()
+    try:
+        return repository_users.purge_blacklist(before, settings.maintenance_batch_size, db)
+    finally:
+        db.close()
+
+
+@job("blacklist_tokens", lambda: settings.maintenance_blacklist_interval)
+async def purge_blacklist() -> int:
+    before = datetime.utcnow() - timedelta(seconds=settings.maintenance_blacklist_retention)
+    return await run_in_threadpool(_purge_blacklist, before)
+
+
+def _clear_refresh_tokens(now: datetime) -> int:
+    db = SessionLocal()
+    try:
+        return repository_users.clear_expired_refresh_tokens(now, settings.maintenance_batch_size, db)
+    finally:
+        db.close()
+
+
+@job("refresh_tokens", lambda: settings.maintenance_refresh_tokens_interval)
+async def clear_refresh_tokens() -> int:
+    return await run_in_threadpool(_clear_refresh_tokens, datetime.utcnow())
+
+
+def remove_old_files(directory: str, max_age: int) -> int:
+    """
+    Видаляє PNG-файли, змінені раніше ніж max_age секунд тому.
+
+    :param directory: Тека з файлами
+    :param max_age: Максимальний вік файлу в секундах
+    :return: Кількість видалених файлів
+    """
+    if not os.path.isdir(directory):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith(".png") and entry.stat().st_mtime < cutoff:
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+    return removed
+
+
+@job("qrcodes", lambda: settings.maintenance_qrcodes_interval)
+async def purge_qrcodes() -> int:
+    return await run_in_threadpool(remove_old_files, QRCODES_DIR, settings.maintenance_qrcode_ttl)
+
+
+@job("cloudinary_cleanup", lambda: settings.maintenance_cloudinary_interval)
+async def purge_cloudinary() -> int:
+    db = SessionLocal()
+    try:
+        return await cloudinary_cleanup.purge(settings.maintenance_cloudinary_limit, db)
+    finally:
+        db.close()
+
+
+@job("leaderboards", lambda: settings.maintenance_leaderboards_interval)
+async def build_leaderboards() -> None:
+    db = SessionLocal()
+    try:
+        await repository_ratings.build_leaderboards(db)
+    finally:
+        db.close()
@@ -0,0 +1,110 @@
+"""
+ndjson.py — читання та потокова видача NDJSON (один JSON-об'єкт на рядок).
+
+Містить:
+- iter_ndjson_chunks: розбиває потік тіла запиту на пачки рядків, не буферизуючи весь файл
+- parse_chunk: валідує пачку рядків Pydantic-схемою і записує помилки по рядках у звіт
+- ndjson_stream: серіалізує ітератор ORM-об'єктів у рядки NDJSON для StreamingResponse
+"""
+
+import json
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.orm import Session
+
+from app.schemas import ImportReport, ImportLineError
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+MAX_REPORTED_ERRORS = 1000
+
+
+async def iter_ndjson_chunks(stream: AsyncIterator[bytes], chunk_size: int) -> AsyncIterator[List[Tuple[int, str]]]:
+    """
+    Читає потік байтів і повертає пачки непорожніх рядків разом з їх номерами (з 1).
+
+    :param stream: Асинхронний потік тіла запиту (request.stream())
+    :param chunk_size: Кількість рядків у пачці
+    :return: Асинхронний ітератор пачок [(номер_рядка, рядок), ...]
+    """
+    buffer = b""
+    line_no = 0
+    chunk: List[Tuple[int, str]] = []
+    async for data in stream:
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for raw in lines:
+            line_no += 1
+            if raw.strip():
+                chunk.append((line_no, raw.decode("utf-8", errors="replace")))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if buffer.strip():
+        chunk.append((line_no + 1, buffer.decode("utf-8", errors="replace")))
+    if chunk:
+        yield chunk
+
+
+def record_error(report: ImportReport, line_no: int, error: str) -> None:
+    """
+    Додає помилку рядка у звіт (зберігається не більше MAX_REPORTED_ERRORS записів).
+
+    :param report: Звіт імпорту
+    :param line_no: Номер рядка у вхідному файлі
+    :param error: Опис помилки
+    """
+    report.failed += 1
+    if len(report.errors) < MAX_REPORTED_ERRORS:
+        report.errors.append(ImportLineError(line=line_no, error=error))
+
+
+def parse_chunk(chunk: List[Tuple[int, str]], model: Type[BaseModel], report: ImportReport) -> List[Tuple[int, BaseModel]]:
+    """
+    Розбирає JSON та валідує кожен рядок пачки.
+
+    :param chunk: Пачка [(номер_рядка, рядок), ...]
+    :param model: Pydantic-схема рядка
+    :param report: Звіт, куди записуються помилки
+    :return: Валідні рядки [(номер_рядка, об'єкт схеми), ...]
+    """
+    valid = []
+    for line_no, raw in chunk:
+        try:
+            valid.append((line_no, model.model_validate(json.loads(raw))))
+        except json.JSONDecodeError as err:
+            record_error(report, line_no, f"Invalid JSON: {err.msg}")
+        except ValidationError as err:
+            record_error(report, line_no, "; ".join(
+                f"{'.'.join(str(loc) for loc in e['loc'])}: {e['msg']}" for e in err.errors()
+            ))
+    return valid
+
+
+def ndjson_stream(rows: Iterable, model: Type[BaseModel], db: Optional[Session] = None,
+                  batch_size: int = 500) -> Iterator[str]:
+    """
+    Перетворює ітератор ORM-об'єктів на шматки NDJSON для StreamingResponse.
+
+    Рядки групуються по batch_size, щоб не робити окремий write на кожен об'єкт.
+    Сесія закривається після останнього рядка: залежність get_db завершується
+    ще до того, як тіло відповіді буде віддане клієнту.
+
+    :param rows: Ітератор ORM-об'єктів (бажано з yield_per)
+    :param model: Pydantic-схема для серіалізації
+    :param db: Сесія, яку треба закрити після видачі
+    :param batch_size: Кількість рядків в одному шматку відповіді
+    :return: Ітератор рядків NDJSON
+    """
+    try:
+        lines = []
+        for row in rows:
+            lines.append(model.model_validate(row, from_attributes=True).model_dump_json())
+            if len(lines) >= batch_size:
+                yield "\n".join(lines) + "\n"
+                lines = []
+        if lines:
+            yield "\n".join(lines) + "\n"
+    finally:
+        if db is not None:
+            db.close()
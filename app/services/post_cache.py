@@ -0,0 +1,79 @@
+"""
+post_cache.py — кеш серіалізованих постів у Redis.
+
+Кожен пост зберігається окремим рядком post:{post_id} (JSON PostResponse), тож сторінку
+з N постів можна прочитати одним MGET, а в БД іде запит лише по відсутні ID.
+Будь-яка зміна поста (редагування, видалення, оцінка, трансформація, перейменування
+хештегу) видаляє його ключ.
+
+Містить:
+- get_many: читання постів за списком ID одним MGET
+- set_many: запис постів з TTL одним pipeline
+- invalidate: скидання кешу для набору постів
+
+Помилки Redis не піднімаються: читання повертає порожній словник, і repository йде в БД.
+"""
+
+from typing import Dict, Iterable, List
+
+from redis.exceptions import RedisError
+
+from app.cache import redis_cache
+from app.conf.config import settings
+from app.schemas import PostResponse
+
+POST_KEY = "post:{}"
+
+
+async def get_many(post_ids: List[int]) -> Dict[int, PostResponse]:
+    """
+    Повертає закешовані пости за списком ID.
+
+    :param post_ids: ID постів
+    :return: Словник ID -> PostResponse лише для знайдених у кеші постів
+    """
+    if not post_ids:
+        return {}
+    try:
+        cached = await redis_cache.mget([POST_KEY.format(post_id) for post_id in post_ids])
+    except RedisError as err:
+        print(f"Post cache read error: {err}")
+        return {}
+    return {
+        post_id: PostResponse.model_validate_json(value)
+        for post_id, value in zip(post_ids, cached)
+        if value is not None
+    }
+
+
+async def set_many(posts: Iterable[PostResponse]) -> None:
+    """
+    Записує пости у кеш.
+
+    :param posts: Серіалізовані пости
+    """
+    posts = list(posts)
+    if not posts:
+        return
+    try:
+        pipe = redis_cache.pipeline(transaction=False)
+        for post in posts:
+            pipe.set(POST_KEY.format(post.id), post.model_dump_json(), ex=settings.post_cache_ttl)
+        await pipe.execute()
+    except RedisError as err:
+        print(f"Post cache write error: {err}")
+
+
+async def invalidate(post_ids: Iterable[int]) -> None:
+    """
+    Видаляє закешовані пости.
+
+    :param post_ids: ID змінених постів
+    """
+    keys = [POST_KEY.format(post_id) for post_id in set(post_ids) if post_id is not None]
+    if not keys:
+        return
+    try:
+        await redis_cache.delete(*keys)
+    except RedisError as err:
+        print(f"Post cache invalidate error: {err}")
@@ -0,0 +1,207 @@
+"""
+rate_limit.py — розподілене обмеження частоти запитів з бюджетами для окремих маршрутів і ролей.
+
+Ліміти задаються в RATE_LIMITS: назва маршруту -> {роль: "N/одиниця"}, наприклад
+{"create_post": {"user": "10/minute", "admin": "100/minute"}}. Ключ "default" діє для ролей,
+яких немає в словнику, "anonymous" — для запитів без користувача (ліміт за IP, наприклад login).
+
+Загальний лічильник вікна живе в Redis (фіксоване вікно, INCRBY), але для великих лімітів
+(від RATE_LIMIT_BATCH_MIN) кожен процес резервує токени пачками (частка RATE_LIMIT_BATCH від
+ліміту) і витрачає їх локально, тож більшість перевірок обходиться без запиту до Redis.
+Невитрачені токени пачки лишаються в процесі до кінця вікна: клієнт, чиї запити балансувальник
+розкидає по воркерах, може отримати відмову раніше, ніж вичерпає бюджет, — не більше ніж на
+(воркери − 1) × пачка запитів. Для малих лімітів (login 10/хв) така похибка — більша частина
+бюджету, тому вони рахуються точно, по одному токену.
+
+Коли бюджет вікна вичерпано, процес запам'ятовує це до кінця вікна й відхиляє наступні запити
+також без Redis. Якщо Redis недоступний, діє лише локальний ліміт процесу.
+
+Містить:
+- parse_limit: розбір рядка "N/одиниця"
+- acquire: спроба взяти один токен з бюджету
+- RateLimiter: залежність FastAPI з лімітом за IP клієнта
+- UserRateLimiter: залежність FastAPI з лімітом за користувачем і його роллю
+- reset: очищення локального стану (для тестів)
+"""
+
+import math
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+from redis.exceptions import RedisError
+
+from app.cache import redis_cache
+from app.conf.config import settings
+from app.conf.messages import TOO_MANY_REQUESTS
+from app.database.models import User
+from app.services.auth import auth_service
+
+RATE_KEY = "rate:{}:{}:{}"
+
+_UNITS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+# Скільки локальних записів тримати, перш ніж прибирати ті, чиє вікно вже минуло
+_MAX_LEASES = 10000
+
+
+@dataclass(frozen=True)
+class Limit:
+    times: int
+    seconds: int
+
+
+@dataclass
+class _Lease:
+    window: int
+    expires_at: float
+    tokens: int = 0
+    granted: int = 0
+    exhausted: bool = False
+
+
+_leases: Dict[Tuple[str, str], _Lease] = {}
+
+
+@lru_cache(maxsize=None)
+def parse_limit(spec: str) -> Limit:
+    """
+    Розбирає ліміт у форматі "N/одиниця" або "N/секунд".
+
+    :param spec: Наприклад "10/minute", "1000/day" або "5/30"
+    :return: Limit з кількістю запитів і довжиною вікна в секундах
+    """
+    times, _, period = spec.partition("/")
+    period = period.strip().lower().rstrip("s") or "minute"
+    seconds = int(period) if period.isdigit() else _UNITS.get(period)
+    if not seconds or int(times) < 0:
+        raise ValueError(f"Invalid rate limit: {spec!r}")
+    return Limit(int(times), seconds)
+
+
+def limit_for(name: str, role: Optional[str]) -> Optional[Limit]:
+    """
+    :param name: Назва маршруту в RATE_LIMITS
+    :param role: Назва ролі користувача або "anonymous"
+    :return: Ліміт для ролі, ліміт "default" або None, якщо маршрут не обмежено
+    """
+    budgets = settings.rate_limits.get(name) or {}
+    spec = budgets.get(role) or budgets.get("default")
+    return parse_limit(spec) if spec else None
+
+
+def _batch(limit: Limit) -> int:
+    if limit.times < settings.rate_limit_batch_min:
+        return 1
+    return max(1, math.ceil(limit.times * settings.rate_limit_batch))
+
+
+async def _reserve(name: str, identity: str, limit: Limit, lease: _Lease) -> int:
+    """
+    Резервує пачку токенів у спільному лічильнику вікна.
+
+    :return: Кількість отриманих токенів (0 — бюджет вікна вичерпано)
+    """
+    batch = min(_batch(limit), limit.times)
+    key = RATE_KEY.format(name, identity, lease.window)
+    try:
+        pipe = redis_cache.pipeline(transaction=True)
+        pipe.incrby(key, batch)
+        pipe.expire(key, limit.seconds + 1)
+        used, _ = await pipe.execute()
+    except RedisError as err:
+        print(f"Rate limit error: {err}")
+        # без Redis процес обмежує себе сам
+        return max(0, min(batch, limit.times - lease.granted))
+    return max(0, min(batch, limit.times - (int(used) - batch)))
+
+
+def _prune(now: float) -> None:
+    for key in [key for key, lease in _leases.items() if lease.expires_at <= now]:
+        del _leases[key]
+
+
+async def acquire(name: str, identity: str, limit: Limit, now: Optional[float] = None) -> Optional[float]:
+    """
+    Бере один токен з бюджету маршруту для ідентичності (користувача чи IP).
+
+    :param name: Назва маршруту
+    :param identity: Ключ, за яким рахуються запити ("user:1", "ip:10.0.0.1")
+    :param limit: Ліміт для цієї ідентичності
+    :param now: Поточний час (для тестів)
+    :return: None, якщо запит дозволено, інакше кількість секунд до початку нового вікна
+    """
+    now = time.time() if now is None else now
+    window = int(now // limit.seconds)
+    expires_at = (window + 1) * limit.seconds
+    key = (name, identity)
+
+    lease = _leases.get(key)
+    if lease is None or lease.window != window:
+        if len(_leases) >= _MAX_LEASES:
+            _prune(now)
+        lease = _leases[key] = _Lease(window, expires_at)
+
+    if not lease.tokens and not lease.exhausted:
+        granted = await _reserve(name, identity, limit, lease)
+        lease.tokens += granted
+        lease.granted += granted
+        lease.exhausted = not granted
+
+    if not lease.tokens:
+        return expires_at - now
+    lease.tokens -= 1
+    return None
+
+
+def reset() -> None:
+    """
+    Очищає локальні резерви токенів усіх маршрутів.
+    """
+    _leases.clear()
+
+
+class RateLimiter:
+    """
+    Ліміт маршруту за IP клієнта (для запитів без автентифікації, наприклад login).
+
+    :param name: Назва маршруту в RATE_LIMITS
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    async def check(self, identity: str, role: Optional[str]) -> None:
+        """
+        Піднімає 429 із заголовком Retry-After, якщо бюджет вичерпано.
+
+        :param identity: Ключ, за яким рахуються запити
+        :param role: Роль для вибору ліміту
+        """
+        limit = limit_for(self.name, role)
+        if limit is None:
+            return
+        retry_after = await acquire(self.name, identity, limit)
+        if retry_after is not None:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+    async def __call__(self, request: Request):
+        client = request.client.host if request.client else "unknown"
+        await self.check(f"ip:{client}", "anonymous")
+        return True
+
+
+class UserRateLimiter(RateLimiter):
+    """
+    Ліміт маршруту за поточним користувачем; розмір бюджету залежить від його ролі.
+    """
+
+    async def __call__(self, current_user: User = Depends(auth_service.get_current_user)):
+        role = getattr(current_user.role, "name", current_user.role)
+        await self.check(f"user:{current_user.id}", role)
+        return True
@@ -0,0 +1,141 @@
+"""
+scheduler.py — планувальник періодичних задач з вибором лідера через Redis.
+
+Задача реєструється декоратором @job(name, interval). Перед запуском кожен процес
+(веб-воркер, репліка чи окремий python -m app.maintenance) пробує взяти lock
+maintenance:lock:{name} командою SET NX з TTL, рівним інтервалу задачі. Хто взяв lock,
+той і виконує задачу; решта пропускає її до наступного інтервалу, тож задача
+виконується один раз на інтервал незалежно від кількості реплік.
+
+Після кожного запуску в хеш maintenance:job:{name} пишуться метрики: час запуску,
+тривалість, кількість оброблених записів, статус і помилка, а також лічильники
+запусків і невдач.
+
+Містить:
+- job: реєстрація періодичної задачі
+- run_job: запуск однієї задачі під lock
+- run_pending: один прохід по всіх задачах
+- run_forever: нескінченний цикл планувальника
+- job_metrics: метрики всіх задач
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional
+
+from redis.exceptions import RedisError
+
+from app.cache import redis_cache
+from app.conf.config import settings
+
+LOCK_KEY = "maintenance:lock:{}"
+METRICS_KEY = "maintenance:job:{}"
+
+JobFunc = Callable[[], Awaitable[int]]
+
+
+@dataclass
+class Job:
+    name: str
+    interval: Callable[[], int]
+    func: JobFunc
+
+
+_jobs: Dict[str, Job] = {}
+
+
+def job(name: str, interval: Callable[[], int]):
+    """
+    Реєструє періодичну задачу.
+
+    :param name: Унікальна назва задачі (ключ lock і метрик)
+    :param interval: Функція, що повертає інтервал у секундах (читається з settings під час запуску)
+    :return: Декоратор для async-функції без аргументів, що повертає кількість оброблених записів
+    """
+    def decorator(func: JobFunc) -> JobFunc:
+        _jobs[name] = Job(name, interval, func)
+        return func
+    return decorator
+
+
+def registered() -> Dict[str, Job]:
+    """
+    :return: Зареєстровані задачі за назвою
+    """
+    return dict(_jobs)
+
+
+async def run_job(task: Job, force: bool = False) -> Optional[dict]:
+    """
+    Запускає задачу, якщо вдалося взяти її lock.
+
+    :param task: Задача
+    :param force: Запустити, навіть якщо lock тримає інший процес (ручний запуск)
+    :return: Метрики запуску або None, якщо задачу виконує інший процес
+    """
+    if not force and not await redis_cache.set(LOCK_KEY.format(task.name), 1, nx=True, ex=task.interval()):
+        return None
+
+    started = time.time()
+    metrics = {"last_run": started, "processed": 0, "status": "ok", "error": ""}
+    try:
+        metrics["processed"] = await task.func()
+    except Exception as err:  # одна зламана задача не повинна зупиняти решту
+        metrics["status"] = "failed"
+        metrics["error"] = str(err)[:500]
+    metrics["duration_ms"] = round((time.time() - started) * 1000, 1)
+    print(f"Maintenance job {task.name}: {metrics['status']}, {metrics['processed']} processed in {metrics['duration_ms']} ms")
+
+    pipe = redis_cache.pipeline(transaction=False)
+    pipe.hset(METRICS_KEY.format(task.name), mapping=metrics)
+    pipe.hincrby(METRICS_KEY.format(task.name), "runs", 1)
+    if metrics["status"] == "failed":
+        pipe.hincrby(METRICS_KEY.format(task.name), "failures", 1)
+    await pipe.execute()
+    return metrics
+
+
+async def run_pending(force: bool = False) -> Dict[str, dict]:
+    """
+    Один прохід планувальника: запускає всі задачі, lock яких вільний.
+
+    :param force: Запустити всі задачі без lock
+    :return: Метрики виконаних задач за назвою
+    """
+    results = {}
+    for task in list(_jobs.values()):
+        try:
+            metrics = await run_job(task, force)
+        except RedisError as err:
+            print(f"Maintenance scheduler error: {err}")
+            continue
+        if metrics is not None:
+            results[task.name] = metrics
+    return results
+
+
+async def run_forever() -> None:
+    """
+    Перевіряє задачі кожні MAINTENANCE_TICK секунд, доки його не скасують.
+    """
+    while True:
+        await run_pending()
+        await asyncio.sleep(settings.maintenance_tick)
+
+
+async def job_metrics() -> Dict[str, dict]:
+    """
+    :return: Метрики останнього запуску кожної задачі за назвою
+    """
+    pipe = redis_cache.pipeline(transaction=False)
+    for name in _jobs:
+        pipe.hgetall(METRICS_KEY.format(name))
+    values = await pipe.execute()
+    return {
+        name: {
+            (key.decode() if isinstance(key, bytes) else key): (value.decode() if isinstance(value, bytes) else value)
+            for key, value in raw.items()
+        }
+        for name, raw in zip(_jobs, values)
+    }
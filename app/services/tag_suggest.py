@@ -0,0 +1,162 @@
+"""
+tag_suggest.py — автодоповнення хештегів за префіксом (Redis sorted sets).
+
+Індекс складається з двох ключів:
+- hashtags:suggest — усі хештеги з однаковою оцінкою 0, член "назва_в_нижньому_регістрі\\x00Назва",
+  тому ZRANGEBYLEX за префіксом повертає кандидатів без урахування регістру;
+- hashtags:usage — кількість постів із хештегом, за нею кандидати ранжуються.
+
+Містить:
+- rebuild / is_built: повна побудова індексу з таблиці hashtags
+- add_tag / rename_tag / remove_tag: синхронізація з CRUD хештегів
+- record_usage: зміна кількості використань при прикріпленні/відкріпленні від постів
+- suggest: підказки за префіксом
+
+Якщо Redis недоступний, suggest повертає None, і repository шукає в БД.
+"""
+
+from typing import Iterable, List, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from app.cache import redis_cache
+
+INDEX_KEY = "hashtags:suggest"
+USAGE_KEY = "hashtags:usage"
+SEPARATOR = b"\x00"
+# Скільки кандидатів з лексикографічного діапазону ранжується за популярністю
+SUGGEST_SCAN = 100
+
+
+def _member(title: str) -> bytes:
+    return title.lower().encode() + SEPARATOR + title.encode()
+
+
+async def is_built() -> bool:
+    """
+    Перевіряє, чи індекс уже побудований.
+
+    :return: True, якщо ключ індексу існує
+    """
+    try:
+        return bool(await redis_cache.exists(INDEX_KEY))
+    except RedisError as err:
+        print(f"Tag suggest read error: {err}")
+        return False
+
+
+async def rebuild(rows: Iterable[Tuple[str, int]]) -> None:
+    """
+    Атомарно замінює індекс новим, побудованим з пар (назва, кількість постів).
+
+    :param rows: Пари (назва хештегу, кількість постів з ним)
+    """
+    rows = list(rows)
+    try:
+        pipe = redis_cache.pipeline(transaction=True)
+        pipe.delete(INDEX_KEY, USAGE_KEY)
+        if rows:
+            pipe.zadd(INDEX_KEY, {_member(title): 0 for title, _ in rows})
+            pipe.zadd(USAGE_KEY, {title: uses for title, uses in rows})
+        await pipe.execute()
+    except RedisError as err:
+        print(f"Tag suggest rebuild error: {err}")
+
+
+async def add_tag(title: str) -> None:
+    """
+    Додає хештег в індекс.
+
+    :param title: Назва хештегу
+    """
+    try:
+        await redis_cache.zadd(INDEX_KEY, {_member(title): 0})
+    except RedisError as err:
+        print(f"Tag suggest update error: {err}")
+
+
+async def rename_tag(old_title: str, new_title: str) -> None:
+    """
+    Перейменовує хештег в індексі, зберігаючи кількість використань.
+
+    :param old_title: Стара назва
+    :param new_title: Нова назва
+    """
+    try:
+        uses = await redis_cache.zscore(USAGE_KEY, old_title)
+        pipe = redis_cache.pipeline(transaction=True)
+        pipe.zrem(INDEX_KEY, _member(old_title))
+        pipe.zrem(USAGE_KEY, old_title)
+        pipe.zadd(INDEX_KEY, {_member(new_title): 0})
+        if uses:
+            pipe.zincrby(USAGE_KEY, uses, new_title)
+        await pipe.execute()
+    except RedisError as err:
+        print(f"Tag suggest update error: {err}")
+
+
+async def remove_tag(title: str) -> None:
+    """
+    Прибирає хештег з індексу.
+
+    :param title: Назва хештегу
+    """
+    try:
+        pipe = redis_cache.pipeline(transaction=True)
+        pipe.zrem(INDEX_KEY, _member(title))
+        pipe.zrem(USAGE_KEY, title)
+        await pipe.execute()
+    except RedisError as err:
+        print(f"Tag suggest update error: {err}")
+
+
+async def record_usage(added: Iterable[str], removed: Iterable[str] = ()) -> None:
+    """
+    Оновлює кількість використань хештегів після зміни хештегів поста.
+
+    Прикріплені хештеги заодно додаються в індекс, бо posts.get_hashtags
+    може створити їх неявно.
+
+    :param added: Назви хештегів, прикріплених до поста
+    :param removed: Назви хештегів, відкріплених від поста
+    """
+    added, removed = list(added), list(removed)
+    if not (added or removed):
+        return
+    try:
+        pipe = redis_cache.pipeline(transaction=False)
+        if added:
+            pipe.zadd(INDEX_KEY, {_member(title): 0 for title in added})
+        for title in added:
+            pipe.zincrby(USAGE_KEY, 1, title)
+        for title in removed:
+            pipe.zincrby(USAGE_KEY, -1, title)
+        await pipe.execute()
+    except RedisError as err:
+        print(f"Tag suggest update error: {err}")
+
+
+async def suggest(prefix: str, limit: int) -> Optional[List[str]]:
+    """
+    Повертає хештеги, що починаються з prefix (без урахування регістру),
+    від найуживаніших до найменш уживаних.
+
+    :param prefix: Початок назви хештегу
+    :param limit: Кількість підказок
+    :return: Список назв або None, якщо індекс не побудований чи Redis недоступний
+    """
+    start = prefix.lower().encode()
+    try:
+        pipe = redis_cache.pipeline(transaction=False)
+        pipe.exists(INDEX_KEY)
+        pipe.zrangebylex(INDEX_KEY, b"[" + start, b"[" + start + b"\xff", start=0, num=SUGGEST_SCAN)
+        exists, members = await pipe.execute()
+        if not exists:
+            return None
+        titles = [member.split(SEPARATOR, 1)[1].decode() for member in members]
+        uses = await redis_cache.zmscore(USAGE_KEY, titles) if titles else []
+    except RedisError as err:
+        print(f"Tag suggest read error: {err}")
+        return None
+    ranked = sorted(zip(titles, uses), key=lambda item: (-(item[1] or 0), item[0]))
+    return [title for title, _ in ranked[:limit]]
@@ -0,0 +1,71 @@
+"""
+templates.py — рендеринг HTML-шаблонів листів (Jinja2).
+
+Шаблони лежать у app/services/templates/. Середовище Jinja2 створюється один раз на процес,
+а скомпільовані шаблони кешуються в ньому (auto_reload вимкнено). precompile під час запуску
+воркера листів читає й компілює всі шаблони наперед, тож під час відправки диск і компілятор
+Jinja2 не задіяні, а рендеринг виконується в пулі потоків, не блокуючи event loop.
+
+Містить:
+- environment: спільне середовище Jinja2 з кешем скомпільованих шаблонів
+- precompile: завантаження й компіляція всіх шаблонів наперед
+- render: рендеринг шаблону з контекстом
+- render_async: рендеринг у пулі потоків
+"""
+
+from functools import lru_cache
+from pathlib import Path
+from typing import List
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from starlette.concurrency import run_in_threadpool
+
+TEMPLATE_FOLDER = Path(__file__).parent / "templates"
+
+
+@lru_cache(maxsize=1)
+def environment() -> Environment:
+    """
+    :return: Середовище Jinja2 для шаблонів листів
+    """
+    return Environment(
+        loader=FileSystemLoader(TEMPLATE_FOLDER),
+        autoescape=select_autoescape(["html"]),
+        auto_reload=False,
+        cache_size=-1,
+    )
+
+
+def precompile() -> List[str]:
+    """
+    Завантажує й компілює всі шаблони в кеш середовища.
+
+    :return: Назви скомпільованих шаблонів
+    """
+    env = environment()
+    names = env.list_templates()
+    for name in names:
+        env.get_template(name)
+    return names
+
+
+def render(template_name: str, **context) -> str:
+    """
+    Рендерить шаблон листа.
+
+    :param template_name: Назва файлу шаблону (наприклад, "example_email.html")
+    :param context: Змінні шаблону
+    :return: Готовий HTML
+    """
+    return environment().get_template(template_name).render(**context)
+
+
+async def render_async(template_name: str, **context) -> str:
+    """
+    Рендерить шаблон листа в пулі потоків.
+
+    :param template_name: Назва файлу шаблону
+    :param context: Змінні шаблону
+    :return: Готовий HTML
+    """
+    return await run_in_threadpool(render, template_name, **context)
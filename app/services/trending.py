@@ -0,0 +1,103 @@
+"""
+trending.py — «популярні зараз» хештеги на ковзних вікнах у Redis.
+
+Кожна година — окремий sorted set trending:hashtags:{година} (година = unix-час // 3600),
+у якому рахується, скільки разів хештег прикріпили до поста. Топ за вікно з N годин —
+це ZUNIONSTORE останніх N кошиків; результат кешується на TRENDING_CACHE_TTL секунд,
+щоб часті запити не перераховували об'єднання. Старі кошики видаляються по TTL.
+
+Містить:
+- record_usage: збільшення лічильників у поточному кошику
+- forget_usage: зменшення лічильників після видалення поста
+- top_hashtags: топ-N хештегів за вікно
+
+Якщо Redis недоступний, top_hashtags повертає None, і repository рахує топ у БД.
+"""
+
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from app.cache import redis_cache
+from app.conf.config import settings
+
+BUCKET_KEY = "trending:hashtags:{}"
+WINDOW_KEY = "trending:hashtags:window:{}:{}"
+BUCKET_SECONDS = 3600
+TRENDING_CACHE_TTL = 60
+
+
+def _bucket(now: Optional[float] = None) -> int:
+    return int((time.time() if now is None else now) // BUCKET_SECONDS)
+
+
+async def record_usage(hashtags: Iterable[str], now: Optional[float] = None) -> None:
+    """
+    Враховує прикріплення хештегів до поста у поточному годинному кошику.
+
+    :param hashtags: Назви прикріплених хештегів
+    :param now: Поточний unix-час (для тестів)
+    """
+    hashtags = list(hashtags)
+    if not hashtags:
+        return
+    key = BUCKET_KEY.format(_bucket(now))
+    try:
+        pipe = redis_cache.pipeline(transaction=False)
+        for title in hashtags:
+            pipe.zincrby(key, 1, title)
+        # кошик живе рівно стільки, скільки його може зачепити найдовше вікно
+        pipe.expire(key, (max(settings.trending_windows) + 1) * BUCKET_SECONDS)
+        await pipe.execute()
+    except RedisError as err:
+        print(f"Trending update error: {err}")
+
+
+async def forget_usage(hashtags: Iterable[str], at: float) -> None:
+    """
+    Прибирає хештеги видаленого поста з кошика години, в якій пост створено.
+    Кошики, що вже видалено по TTL, не відновлюються.
+
+    :param hashtags: Назви хештегів поста
+    :param at: Unix-час створення поста
+    """
+    hashtags = list(hashtags)
+    if not hashtags:
+        return
+    key = BUCKET_KEY.format(_bucket(at))
+    try:
+        if not await redis_cache.exists(key):
+            return
+        pipe = redis_cache.pipeline(transaction=True)
+        for title in hashtags:
+            pipe.zincrby(key, -1, title)
+        pipe.zremrangebyscore(key, "-inf", 0)
+        await pipe.execute()
+    except RedisError as err:
+        print(f"Trending update error: {err}")
+
+
+async def top_hashtags(window_hours: int, limit: int, now: Optional[float] = None) -> Optional[List[Tuple[str, int]]]:
+    """
+    Повертає найуживаніші хештеги за останні window_hours годин.
+
+    :param window_hours: Розмір вікна в годинах
+    :param limit: Кількість хештегів
+    :param now: Поточний unix-час (для тестів)
+    :return: Список (назва, кількість) або None, якщо Redis недоступний
+    """
+    current = _bucket(now)
+    window_key = WINDOW_KEY.format(window_hours, current)
+    try:
+        if not await redis_cache.exists(window_key):
+            buckets = [BUCKET_KEY.format(current - offset) for offset in range(window_hours)]
+            pipe = redis_cache.pipeline(transaction=True)
+            pipe.zunionstore(window_key, buckets)
+            pipe.expire(window_key, TRENDING_CACHE_TTL)
+            await pipe.execute()
+        members = await redis_cache.zrevrange(window_key, 0, limit - 1, withscores=True)
+    except RedisError as err:
+        print(f"Trending read error: {err}")
+        return None
+    return [(title.decode() if isinstance(title, bytes) else title, int(score)) for title, score in members]
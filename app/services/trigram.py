@@ -0,0 +1,140 @@
+"""
+trigram.py — нечіткий пошук рядків за триграмами.
+
+Триграми рахуються так само, як у розширенні PostgreSQL pg_trgm: рядок переводиться
+в нижній регістр, кожне слово доповнюється двома пробілами спереду й одним ззаду,
+схожість — частка спільних триграм (|A ∩ B| / |A ∪ B|).
+
+Містить:
+- trigrams / similarity: триграми рядка та схожість двох рядків
+- TrigramIndex: інвертований індекс у пам'яті процесу (триграма -> ID)
+- username_index: індекс username для баз без pg_trgm (SQLite)
+"""
+
+import re
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+WORD_RE = re.compile(r"[^\W_]+")
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Повертає множину триграм рядка (як show_trgm у pg_trgm).
+
+    :param text: Рядок
+    :return: Множина триграм
+    """
+    grams = set()
+    for word in WORD_RE.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(left: str, right: str) -> float:
+    """
+    Схожість двох рядків від 0 до 1 (як similarity у pg_trgm).
+
+    :param left: Перший рядок
+    :param right: Другий рядок
+    :return: Частка спільних триграм
+    """
+    a, b = trigrams(left), trigrams(right)
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class TrigramIndex:
+    """
+    Інвертований індекс триграм у пам'яті процесу.
+
+    Пошук перебирає лише рядки, що мають хоча б одну спільну триграму із запитом,
+    а не всю таблицю. Індекс перебудовується з БД, коли він старший за TTL,
+    тож зміни, зроблені іншими процесами, теж з'являються в ньому.
+    """
+
+    def __init__(self):
+        self._grams: Dict[str, Set[int]] = defaultdict(set)
+        self._texts: Dict[int, str] = {}
+        self._sizes: Dict[int, int] = {}
+        self.built_at: Optional[float] = None
+
+    def is_stale(self, ttl: int) -> bool:
+        """
+        :param ttl: Максимальний вік індексу в секундах
+        :return: True, якщо індекс не побудований або застарів
+        """
+        return self.built_at is None or time.monotonic() - self.built_at > ttl
+
+    def rebuild(self, rows: Iterable[Tuple[int, str]]) -> None:
+        """
+        Будує індекс заново з пар (ID, рядок).
+
+        :param rows: Пари (ID, рядок)
+        """
+        self._grams.clear()
+        self._texts.clear()
+        self._sizes.clear()
+        for item_id, text in rows:
+            self.add(item_id, text)
+        self.built_at = time.monotonic()
+
+    def add(self, item_id: int, text: Optional[str]) -> None:
+        """
+        Додає або оновлює рядок в індексі.
+
+        :param item_id: ID запису
+        :param text: Рядок (None — лише видалити старе значення)
+        """
+        self.remove(item_id)
+        if item_id is None or not text:
+            return
+        grams = trigrams(text)
+        self._texts[item_id] = text
+        self._sizes[item_id] = len(grams)
+        for gram in grams:
+            self._grams[gram].add(item_id)
+
+    def remove(self, item_id: int) -> None:
+        """
+        Прибирає запис з індексу.
+
+        :param item_id: ID запису
+        """
+        text = self._texts.pop(item_id, None)
+        self._sizes.pop(item_id, None)
+        if text is None:
+            return
+        for gram in trigrams(text):
+            ids = self._grams.get(gram)
+            if ids is not None:
+                ids.discard(item_id)
+                if not ids:
+                    del self._grams[gram]
+
+    def search(self, query: str, threshold: float, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Шукає записи, схожі на query, або ті, що містять його як підрядок.
+
+        :param query: Рядок пошуку
+        :param threshold: Мінімальна схожість
+        :param limit: Максимальна кількість результатів (None — усі)
+        :return: Пари (ID, схожість) від найбільш схожих
+        """
+        grams = trigrams(query)
+        shared = Counter(item_id for gram in grams for item_id in self._grams.get(gram, ()))
+        needle = query.lower()
+        ranked = []
+        for item_id, common in shared.items():
+            score = common / (len(grams) + self._sizes[item_id] - common)
+            if score >= threshold or needle in self._texts[item_id].lower():
+                ranked.append((item_id, score))
+        ranked.sort(key=lambda item: (-item[1], self._texts[item[0]]))
+        return ranked if limit is None else ranked[:limit]
+
+
+# Індекс username для SQLite (у PostgreSQL пошук іде через GIN-індекс pg_trgm)
+username_index = TrigramIndex()
@@ -0,0 +1,157 @@
+"""
+upload_validation.py — перевірка завантажених зображень до відправки в Cloudinary.
+
+Перевірка відбувається у два етапи, і жоден з них не тримає весь файл у пам'яті:
+- UploadSizeMiddleware відхиляє multipart-запит з відповіддю 413, щойно тіло перевищить
+  UPLOAD_MAX_SIZE: за заголовком Content-Length ще до читання тіла, а без нього —
+  під час читання, рахуючи отримані байти;
+- validate_image читає файл частинами: за першою частиною визначає формат за сигнатурою
+  (magic bytes) і одразу відповідає 415 для непідтримуваного типу, рахує розмір (413)
+  і SHA-256, а розміри зображення в пікселях бере із заголовка файлу без декодування (413).
+
+Містить:
+- sniff: формат зображення за першими байтами файлу
+- ImageInfo: результат перевірки
+- validate_image: потокова перевірка файлу зображення
+- UploadSizeMiddleware: ліміт розміру тіла multipart-запиту
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+
+from fastapi import HTTPException, status
+from PIL import Image, UnidentifiedImageError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.conf.config import settings
+from app.conf.messages import FILE_TOO_LARGE, IMAGE_TOO_LARGE, UNSUPPORTED_IMAGE
+
+# Розмір частини, якою читається файл
+CHUNK_SIZE = 1024 * 1024
+# Запас на межі multipart і текстові поля форми понад розмір самого файлу
+FORM_OVERHEAD = 64 * 1024
+
+# Назва формату -> назва плагіна Pillow
+PIL_FORMATS = {"jpeg": "JPEG", "png": "PNG", "gif": "GIF", "webp": "WEBP", "avif": "AVIF"}
+
+
+def sniff(head: bytes) -> Optional[str]:
+    """
+    Визначає формат зображення за сигнатурою на початку файлу.
+
+    :param head: Перші байти файлу (достатньо 12)
+    :return: jpeg, png, gif, webp, avif або None
+    """
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis"):
+        return "avif"
+    return None
+
+
+@dataclass
+class ImageInfo:
+    format: str
+    size: int
+    width: int
+    height: int
+    sha256: str
+
+
+def _inspect(file: BinaryIO) -> ImageInfo:
+    file.seek(0)
+    chunk = file.read(CHUNK_SIZE)
+    image_format = sniff(chunk[:12])
+    if image_format is None or image_format not in settings.upload_allowed_formats:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=UNSUPPORTED_IMAGE)
+
+    digest = hashlib.sha256()
+    size = 0
+    while chunk:
+        size += len(chunk)
+        if size > settings.upload_max_size:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=FILE_TOO_LARGE)
+        digest.update(chunk)
+        chunk = file.read(CHUNK_SIZE)
+
+    # Image.open читає лише заголовок; піксельні дані не декодуються
+    file.seek(0)
+    try:
+        with Image.open(file, formats=[PIL_FORMATS[image_format]]) as image:
+            width, height = image.size
+    except Image.DecompressionBombError:
+        # Pillow сам відмовляється відкривати зображення з надто великою кількістю пікселів
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=IMAGE_TOO_LARGE)
+    except (UnidentifiedImageError, OSError):
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=UNSUPPORTED_IMAGE)
+    finally:
+        file.seek(0)
+    if max(width, height) > settings.upload_max_dimension or width * height > settings.upload_max_pixels:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=IMAGE_TOO_LARGE)
+    return ImageInfo(image_format, size, width, height, digest.hexdigest())
+
+
+async def validate_image(file: BinaryIO) -> ImageInfo:
+    """
+    Перевіряє файл зображення, читаючи його частинами по CHUNK_SIZE у пулі потоків.
+    Після перевірки файл перемотується на початок.
+
+    :param file: Файл (наприклад, UploadFile.file)
+    :return: Формат, розмір у байтах, ширина, висота та SHA-256 файлу
+    :raises HTTPException: 415 — не зображення або непідтримуваний формат;
+        413 — файл більший за UPLOAD_MAX_SIZE або зображення більше за UPLOAD_MAX_DIMENSION / UPLOAD_MAX_PIXELS
+    """
+    return await run_in_threadpool(_inspect, file)
+
+
+class UploadSizeMiddleware:
+    """
+    Відповідає 413 на multipart-запити, тіло яких більше за max_size байтів,
+    не дочитуючи тіло до кінця.
+
+    :param app: ASGI-застосунок
+    :param max_size: Максимальний розмір тіла в байтах
+    """
+
+    def __init__(self, app: ASGIApp, max_size: int):
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if not headers.get("content-type", "").startswith("multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        length = headers.get("content-length")
+        if length is not None and length.isdigit() and int(length) > self.max_size:
+            response = JSONResponse({"detail": FILE_TOO_LARGE}, status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def receive_limited() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_size:
+                    # FastAPI пропускає HTTPException з читання тіла без змін
+                    raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=FILE_TOO_LARGE)
+            return message
+
+        await self.app(scope, receive_limited, send)
@@ -0,0 +1,80 @@
+"""
+uploads.py — завантаження файлів у Cloudinary поза event loop з обліком незавершених запитів.
+
+cloudinary.uploader.upload — блокуючий HTTP-виклик, тому він виконується в пулі потоків.
+Кількість завантажень «у польоті» рахується, щоб під час зупинки воркера (SIGTERM)
+дочекатися їх завершення, а не обірвати разом із процесом.
+
+public_id зображення поста виводиться з SHA-256 його вмісту (рахується під час перевірки
+файлу в app.services.upload_validation): однакові файли отримують однаковий public_id,
+тож різні пости не перезаписують зображення одне одного, а повторне завантаження того
+самого файлу можна пропустити.
+
+Містить:
+- content_public_id: public_id зображення за хешем вмісту
+- upload: завантаження файлу в Cloudinary у пулі потоків
+- in_flight: кількість незавершених завантажень
+- drain: очікування завершення всіх завантажень (з тайм-аутом)
+"""
+
+import asyncio
+from typing import Any
+
+import cloudinary.uploader
+from starlette.concurrency import run_in_threadpool
+
+# 128 біт хешу: колізія практично неможлива, а public_id вміщується в posts.public_id (String(50))
+PUBLIC_ID_LENGTH = 32
+
+_in_flight = 0
+_idle = asyncio.Event()
+_idle.set()
+
+
+def content_public_id(digest: str) -> str:
+    """
+    :param digest: SHA-256 вмісту файлу
+    :return: public_id зображення в Cloudinary
+    """
+    return digest[:PUBLIC_ID_LENGTH]
+
+
+async def upload(file: Any, **options) -> dict:
+    """
+    Завантажує файл у Cloudinary, не блокуючи event loop.
+
+    :param file: Файл або шлях/URL, який приймає cloudinary.uploader.upload
+    :param options: Параметри cloudinary.uploader.upload (public_id, eager, ...)
+    :return: Відповідь Cloudinary
+    """
+    global _in_flight
+    _in_flight += 1
+    _idle.clear()
+    try:
+        return await run_in_threadpool(cloudinary.uploader.upload, file, **options)
+    finally:
+        _in_flight -= 1
+        if not _in_flight:
+            _idle.set()
+
+
+def in_flight() -> int:
+    """
+    :return: Кількість завантажень, що ще виконуються
+    """
+    return _in_flight
+
+
+async def drain(timeout: float) -> bool:
+    """
+    Чекає, доки завершаться всі завантаження.
+
+    :param timeout: Максимальний час очікування в секундах
+    :return: True, якщо всі завантаження завершилися вчасно
+    """
+    try:
+        await asyncio.wait_for(_idle.wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        print(f"Upload drain timeout: {_in_flight} upload(s) still in flight")
+        return False
@@ -0,0 +1,89 @@
+"""
+responses.py — бенчмарк серіалізації та стиснення великих відповідей List[PostResponse].
+
+Порівнює повний шлях FastAPI (валідація response_model + jsonable_encoder + рендер)
+для стандартного JSONResponse і ORJSONResponse, а також розмір тіла без стиснення,
+з GZip і з Brotli (якщо встановлено brotli).
+
+Запуск з кореня проєкту:
+    python -m benchmarks.responses --posts 1000 --rounds 20
+"""
+
+import argparse
+import asyncio
+import gzip
+import time
+from datetime import datetime
+from statistics import median
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+from httpx import ASGITransport, AsyncClient
+
+from app.schemas import HashtagModel, PostResponse
+from app.services.compression import brotli
+
+
+def make_posts(count: int) -> List[PostResponse]:
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    tags = [HashtagModel(id=i, title=f"tag{i}", user_id=1, created_at=now) for i in range(5)]
+    return [
+        PostResponse(
+            id=i,
+            image_url=f"https://res.cloudinary.com/demo/image/upload/v1/photoshare/{i:08d}.jpg",
+            transform_url=None,
+            title=f"Post {i}",
+            descr="Sunset over the sea, shot on film. " * 4,
+            hashtags=tags,
+            avg_rating=4.25,
+            rating_count=12,
+            rating_score=4.1,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def make_app(posts: List[PostResponse], response_class) -> FastAPI:
+    app = FastAPI(default_response_class=response_class)
+
+    @app.get("/posts", response_model=List[PostResponse])
+    async def read_posts():
+        return posts
+
+    return app
+
+
+async def time_requests(app: FastAPI, rounds: int) -> tuple[float, bytes]:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        body = (await client.get("/posts")).content  # прогрів
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            await client.get("/posts")
+            timings.append(time.perf_counter() - start)
+    return median(timings) * 1000, body
+
+
+async def main(count: int, rounds: int) -> None:
+    posts = make_posts(count)
+    print(f"{count} posts, median of {rounds} requests")
+    for name, response_class in (("JSONResponse", JSONResponse), ("ORJSONResponse", ORJSONResponse)):
+        elapsed, body = await time_requests(make_app(posts, response_class), rounds)
+        print(f"{name:<16} {elapsed:8.2f} ms   {len(body):>9} bytes")
+
+    sizes = {"gzip -6": len(gzip.compress(body, compresslevel=6))}
+    if brotli is not None:
+        sizes["brotli q4"] = len(brotli.compress(body, quality=4))
+    for name, size in sizes.items():
+        print(f"{name:<16} {size:>21} bytes ({size / len(body):.1%})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--posts", type=int, default=1000, help="кількість постів у відповіді")
+    parser.add_argument("--rounds", type=int, default=20, help="кількість вимірів")
+    args = parser.parse_args()
+    asyncio.run(main(args.posts, args.rounds))
@@ -0,0 +1,67 @@
+"""
+templates.py — мікробенчмарк рендерингу листа підтвердження email.
+
+Порівнює вартість одного листа:
+- нове середовище Jinja2 на кожен лист (шаблон щоразу читається з диска й компілюється —
+  так працювала відправка через FastMail з template_folder);
+- спільне середовище з попередньо скомпільованими шаблонами (app.services.templates);
+- те саме через render_async (з переходом у пул потоків).
+
+Запуск з кореня проєкту:
+    python -m benchmarks.templates --emails 2000
+"""
+
+import argparse
+import asyncio
+import time
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from app.services import templates
+
+TEMPLATE = "example_email.html"
+
+
+def context(number: int) -> dict:
+    return {"host": "https://photoshare.example/", "username": f"user{number}", "token": f"token-{number:08d}"}
+
+
+def render_fresh(number: int) -> str:
+    env = Environment(loader=FileSystemLoader(templates.TEMPLATE_FOLDER), autoescape=select_autoescape(["html"]))
+    return env.get_template(TEMPLATE).render(**context(number))
+
+
+def render_cached(number: int) -> str:
+    return templates.render(TEMPLATE, **context(number))
+
+
+async def render_threadpool(emails: int) -> None:
+    for number in range(emails):
+        await templates.render_async(TEMPLATE, **context(number))
+
+
+def per_email_us(started: float, emails: int) -> float:
+    return (time.perf_counter() - started) / emails * 1_000_000
+
+
+def main(emails: int) -> None:
+    started = time.perf_counter()
+    templates.precompile()
+    print(f"precompile (once at startup)      {(time.perf_counter() - started) * 1000:9.2f} ms")
+
+    for name, render in (("fresh environment per email", render_fresh), ("precompiled, cached", render_cached)):
+        started = time.perf_counter()
+        for number in range(emails):
+            render(number)
+        print(f"{name:<33} {per_email_us(started, emails):9.1f} µs/email")
+
+    started = time.perf_counter()
+    asyncio.run(render_threadpool(emails))
+    print(f"{'precompiled, render_async':<33} {per_email_us(started, emails):9.1f} µs/email")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--emails", type=int, default=2000, help="кількість листів у кожному прогоні")
+    args = parser.parse_args()
+    main(args.emails)
@@ -0,0 +1,83 @@
+"""
+workers.py — бенчмарк пропускної здатності production-сервера: один воркер проти кількох.
+
+Для кожної кількості воркерів запускає `python -m app.server` на окремому порту
+(потрібні ті самі змінні середовища, БД і Redis, що й для звичайного запуску),
+навантажує вказаний шлях паралельними запитами протягом --duration секунд
+і виводить кількість запитів за секунду та медіанну затримку.
+
+Запуск з кореня проєкту:
+    python -m benchmarks.workers --workers 1 4 --path / --concurrency 64 --duration 10
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+from statistics import median
+
+import httpx
+
+from app.server import cpu_count
+
+
+async def wait_ready(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start in {timeout} s")
+
+
+async def load(url: str, concurrency: int, duration: float) -> tuple[int, float]:
+    latencies = []
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        async def worker():
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                response = await client.get(url)
+                if response.status_code < 500:
+                    latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return len(latencies), median(latencies) * 1000 if latencies else 0.0
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = {**os.environ, "WEB_WORKERS": str(workers), "WEB_PORT": str(port), "WEB_HOST": "127.0.0.1"}
+    return subprocess.Popen([sys.executable, "-m", "app.server"], env=env)
+
+
+async def main(worker_counts: list[int], path: str, concurrency: int, duration: float, port: int) -> None:
+    print(f"{cpu_count()} CPU available, {concurrency} concurrent clients, {duration:.0f} s per run, GET {path}")
+    for workers in worker_counts:
+        server = start_server(workers, port)
+        try:
+            url = f"http://127.0.0.1:{port}{path}"
+            await wait_ready(url)
+            requests, latency = await load(url, concurrency, duration)
+            print(f"workers={workers:<3} {requests / duration:10.1f} req/s   median {latency:7.2f} ms")
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, cpu_count()], help="кількості воркерів для порівняння")
+    parser.add_argument("--path", default="/", help="шлях, який навантажується")
+    parser.add_argument("--concurrency", type=int, default=64, help="кількість паралельних клієнтів")
+    parser.add_argument("--duration", type=float, default=10, help="тривалість кожного прогону в секундах")
+    parser.add_argument("--port", type=int, default=8099, help="порт тестового сервера")
+    args = parser.parse_args()
+    asyncio.run(main(args.workers, args.path, args.concurrency, args.duration, args.port))
@@ -1,9 +1,14 @@
 import pytest
+import fakeredis.aioredis
 from unittest.mock import AsyncMock, patch
-from app.database.connect_db import get_db
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.database.connect_db import enable_sqlite_foreign_keys, get_db
 from httpx import AsyncClient
 from app.main import app
-from app.database.models import User, UserRoleEnum
+from app.database.models import Base, User, UserRoleEnum
+from app.services.trigram import TrigramIndex
 
 # --------------------------------------
 # MOCK ASYNC DB SESSION
@@ -68,6 +73,18 @@ def mock_redis():
         mock_redis.return_value = mock_instance
         yield mock_redis
 
+# --------------------------------------
+# RATE LIMITS
+# --------------------------------------
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """Локальні резерви токенів не переносяться між тестами."""
+    from app.services import rate_limit
+
+    rate_limit.reset()
+    yield
+    rate_limit.reset()
+
 # --------------------------------------
 # MOCK DATABASE
 # --------------------------------------
@@ -75,3 +92,68 @@ def mock_redis():
 def mock_db():
     with patch("app.database.connect_db.get_db", return_value=FakeAsyncSession()):
         yield
+
+
+# --------------------------------------
+# CURRENT USER OVERRIDE
+# --------------------------------------
+@pytest.fixture
+def login_as():
+    """
+    Підставляє користувача замість auth_service.get_current_user у всіх Depends().
+
+    Деякі тести підміняють атрибут auth_service.get_current_user, тому ключем override
+    беремо саме метод класу, прив'язаний до auth_service (його й захоплюють Depends()).
+    """
+    from app.services.auth import Auth, auth_service
+
+    get_current_user = Auth.get_current_user.__get__(auth_service, Auth)
+
+    def _login(user):
+        app.dependency_overrides[get_current_user] = lambda: user
+
+    yield _login
+    app.dependency_overrides.pop(get_current_user, None)
+
+# --------------------------------------
+# REAL IN-MEMORY SQLITE SESSION
+# --------------------------------------
+@pytest.fixture
+def sqlite_db(monkeypatch):
+    """
+    Справжня сесія SQLAlchemy поверх SQLite у пам'яті зі створеними таблицями.
+
+    Індекс username у пам'яті процесу замінюється порожнім, щоб не тягнути дані з інших тестів.
+    """
+    monkeypatch.setattr("app.repository.users.username_index", TrigramIndex())
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    enable_sqlite_foreign_keys(engine)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+# --------------------------------------
+# FAKE REDIS FOR REDIS-BACKED SERVICES
+# --------------------------------------
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """In-memory Redis (fakeredis), підставлений у сервіси замість справжнього клієнта."""
+    fake = fakeredis.aioredis.FakeRedis()
+    monkeypatch.setattr("app.services.leaderboard.redis_cache", fake)
+    monkeypatch.setattr("app.services.comment_cache.redis_cache", fake)
+    monkeypatch.setattr("app.services.trending.redis_cache", fake)
+    monkeypatch.setattr("app.services.tag_suggest.redis_cache", fake)
+    monkeypatch.setattr("app.services.feed.redis_cache", fake)
+    monkeypatch.setattr("app.services.post_cache.redis_cache", fake)
+    monkeypatch.setattr("app.services.rate_limit.redis_cache", fake)
+    monkeypatch.setattr("app.services.login_guard.redis_cache", fake)
+    monkeypatch.setattr("app.services.mail_queue.redis_cache", fake)
+    monkeypatch.setattr("app.services.scheduler.redis_cache", fake)
+    monkeypatch.setattr("app.services.cloudinary_cleanup.redis_cache", fake)
+    return fake
@@ -82,12 +82,12 @@ async def test_login_user_invalid_email(mock_get_user):
         response = await ac.post("/api/auth/login", data={"username": "wrong@example.com", "password": "123"})
 
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
-    assert response.json()["detail"] == "Invalid email"
+    assert response.json()["detail"] == "Invalid email or password"
 
 
 @pytest.mark.asyncio
 @patch("app.repository.users.get_user_by_email", new_callable=AsyncMock)
-@patch("app.services.auth.auth_service.verify_password", new_callable=AsyncMock)
+@patch("app.services.login_guard.verify_password", new_callable=AsyncMock)
 async def test_login_user_wrong_password(mock_verify, mock_get_user):
     class User:
         email = "test@example.com"
@@ -102,7 +102,31 @@ async def test_login_user_wrong_password(mock_verify, mock_get_user):
         response = await ac.post("/api/auth/login", data={"username": "test@example.com", "password": "wrong"})
 
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
-    assert response.json()["detail"] == "Invalid password"
+    assert response.json()["detail"] == "Invalid email or password"
+
+
+@pytest.mark.asyncio
+@patch("app.repository.users.get_user_by_email", new_callable=AsyncMock)
+@patch("app.services.login_guard.verify_password", new_callable=AsyncMock)
+async def test_login_unverified_user_checks_password_first(mock_verify, mock_get_user):
+    class User:
+        email = "test@example.com"
+        password = "hashed"
+        is_verify = False
+        is_active = True
+
+    mock_get_user.return_value = User()
+    mock_verify.return_value = False
+
+    async with AsyncClient(app=app, base_url="http://testserver") as ac:
+        wrong = await ac.post("/api/auth/login", data={"username": "test@example.com", "password": "wrong"})
+        mock_verify.return_value = True
+        right = await ac.post("/api/auth/login", data={"username": "test@example.com", "password": "right"})
+
+    # стан акаунта видно лише тому, хто знає пароль
+    assert wrong.status_code == status.HTTP_401_UNAUTHORIZED
+    assert wrong.json()["detail"] == "Invalid email or password"
+    assert right.json()["detail"] == "Email not confirmed"
 
 
 # ---------------------------------------
@@ -0,0 +1,43 @@
+import hashlib
+
+import httpx
+import pytest
+
+from app import backfill_images
+from app.database.models import ImageHash, Post, User
+from app.repository import images as repository_images
+from app.services.image_hash import BKTree
+from tests.test_image_hash import jpeg, picture
+
+
+@pytest.mark.asyncio
+async def test_backfill_hashes_existing_posts(sqlite_db, monkeypatch):
+    monkeypatch.setattr(repository_images, "image_index", BKTree())
+    sqlite_db.add(User(id=1, username="author", email="a@x.com", password="x"))
+    sqlite_db.add_all([
+        Post(id=1, title="a", descr="", user_id=1, public_id="Photoshare/a", image_url="https://img/a.jpg"),
+        Post(id=2, title="b", descr="", user_id=1, public_id="Photoshare/a", image_url="https://img/a.jpg"),
+        Post(id=3, title="c", descr="", user_id=1, public_id="Photoshare/gone", image_url="https://img/gone.jpg"),
+        Post(id=4, title="d", descr="", user_id=1, public_id="Photoshare/d", image_url="https://img/d.jpg"),
+    ])
+    sqlite_db.commit()
+    images = {"/a.jpg": jpeg(picture(1)).getvalue(), "/d.jpg": jpeg(picture(2)).getvalue()}
+    requested = []
+
+    def handler(request):
+        requested.append(request.url.path)
+        if request.url.path not in images:
+            return httpx.Response(404)
+        return httpx.Response(200, content=images[request.url.path])
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        assert await backfill_images.backfill(sqlite_db, client, batch_size=2) == (2, 1)
+        # повторний запуск пробує лише зображення, яке не вдалося завантажити
+        requested.clear()
+        assert await backfill_images.backfill(sqlite_db, client, batch_size=2) == (0, 1)
+
+    assert requested == ["/gone.jpg"]
+    image = sqlite_db.get(ImageHash, "Photoshare/a")
+    assert image.sha256 == hashlib.sha256(images["/a.jpg"]).hexdigest()
+    assert len(image.phash) == 16
+    assert len(repository_images.image_index) == 2
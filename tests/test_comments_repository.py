@@ -1,9 +1,11 @@
 import pytest
+from datetime import datetime, timedelta
 from unittest.mock import MagicMock
 from fastapi import HTTPException
-from app.repository import comments
-from app.database.models import Comment, User, UserRoleEnum
+from app.repository import comments, posts
+from app.database.models import Comment, Post, User, UserRoleEnum
 from app.schemas import CommentBase
+from app.conf import messages as message
 
 # -----------------------------
 # Fake DB Session
@@ -107,14 +109,124 @@ async def test_show_single_comment_unauthorized(fake_db, comment_obj):
     result = await comments.show_single_comment(comment_id=1, db=fake_db, user=other_user)
     assert result is None
 
-@pytest.mark.asyncio
-async def test_show_user_comments(fake_db, user, comment_obj):
-    fake_db.comments.append(comment_obj)
-    result = await comments.show_user_comments(user_id=user.id, db=fake_db)
-    assert result == [comment_obj]
-
 @pytest.mark.asyncio
 async def test_show_user_post_comments(fake_db, user, comment_obj):
     fake_db.comments.append(comment_obj)
     result = await comments.show_user_post_comments(user_id=user.id, post_id=1, db=fake_db)
     assert result == [comment_obj]
+
+
+# -----------------------------
+# Bulk import / export (real SQLite)
+# -----------------------------
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.fixture
+def seeded(sqlite_db):
+    sqlite_db.add_all([
+        User(id=1, username="author", email="author@example.com", password="x"),
+        Post(id=10, title="sea", user_id=1),
+    ])
+    sqlite_db.commit()
+    return sqlite_db
+
+
+@pytest.mark.asyncio
+async def test_import_comments(seeded):
+    report = await comments.import_comments(_chunks([
+        (1, '{"post_id": 10, "user_id": 1, "text": "first"}'),
+        (2, '{"post_id": 11, "user_id": 1, "text": "no post"}'),
+        (3, '{"post_id": 10, "user_id": 1}'),
+        (4, '{"post_id": 10, "user_id": 1, "text": "second", "created_at": "2020-05-01T10:00:00"}'),
+    ]), seeded)
+
+    assert report.imported == 2
+    errors = {e.line: e.error for e in report.errors}
+    assert errors[2] == message.NO_POST_ID
+    assert "text" in errors[3]
+    assert [c.text for c in comments.iter_comments(seeded, batch_size=10)] == ["first", "second"]
+
+
+# -----------------------------
+# Keyset pagination and first-page cache (real SQLite)
+# -----------------------------
+@pytest.fixture
+def thread(seeded):
+    start = datetime(2024, 1, 1)
+    seeded.add_all([
+        Comment(id=i, text=f"c{i}", post_id=10, user_id=1, created_at=start + timedelta(minutes=i % 3))
+        for i in range(1, 8)
+    ])
+    seeded.commit()
+    return seeded
+
+
+@pytest.mark.asyncio
+async def test_post_comments_keyset_pages(thread, fake_redis):
+    seen = []
+    cursor = None
+    while True:
+        page = await posts.get_post_comments(10, thread, limit=3, cursor=cursor)
+        assert page.total == 7
+        seen += [c.id for c in page.items]
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    # порядок (created_at, id): хвилини 0 -> [3, 6], 1 -> [1, 4, 7], 2 -> [2, 5]
+    assert seen == [3, 6, 1, 4, 7, 2, 5]
+
+
+@pytest.mark.asyncio
+async def test_post_comments_first_page_cached_and_invalidated(thread, fake_redis, user):
+    first = await posts.get_post_comments(10, thread, limit=2)
+    assert await fake_redis.exists("comments:post:10")
+
+    thread.query(Comment).filter(Comment.id == 3).delete()
+    thread.commit()
+    # зміна в обхід repository — кеш ще віддає стару сторінку
+    assert await posts.get_post_comments(10, thread, limit=2) == first
+
+    await comments.create_comment(10, CommentBase(text="new"), thread, user)
+    assert not await fake_redis.exists("comments:post:10")
+    page = await posts.get_post_comments(10, thread, limit=2)
+    assert page.total == 7
+    assert [c.id for c in page.items] == [6, 1]
+
+
+@pytest.mark.asyncio
+async def test_stale_first_page_is_not_cached_after_invalidate(thread, fake_redis, monkeypatch):
+    get_version = posts.comment_cache.get_version
+
+    async def racing_get_version(post_id):
+        version = await get_version(post_id)
+        # коментар додано іншим запитом між читанням версії і записом сторінки в кеш
+        await posts.comment_cache.invalidate([post_id])
+        return version
+
+    monkeypatch.setattr(posts.comment_cache, "get_version", racing_get_version)
+    await posts.get_post_comments(10, thread, limit=2)
+    assert not await fake_redis.exists("comments:post:10")
+
+    monkeypatch.setattr(posts.comment_cache, "get_version", get_version)
+    await posts.get_post_comments(10, thread, limit=2)
+    assert await fake_redis.exists("comments:post:10")
+
+
+@pytest.mark.asyncio
+async def test_show_user_comments(thread):
+    page = await comments.show_user_comments(user_id=1, db=thread, limit=5)
+    assert [c.id for c in page.items] == [3, 6, 1, 4, 7]
+    assert page.total == 7
+    assert page.next_cursor is not None
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor(thread):
+    with pytest.raises(HTTPException) as exc:
+        await comments.show_user_comments(user_id=1, db=thread, cursor="not-a-cursor")
+    assert exc.value.status_code == 400
+    assert exc.value.detail == message.INVALID_CURSOR
@@ -6,7 +6,7 @@ from httpx import AsyncClient
 from datetime import datetime
 from app.main import app  # твій FastAPI app
 from app.database.models import User
-from app.schemas import CommentBase, CommentResponse 
+from app.schemas import CommentBase, CommentPage, CommentResponse
 
 mock_comment = CommentResponse(
     id=1,
@@ -104,17 +104,17 @@ async def test_by_user_comments(mocker, mock_user, mock_db):
     mocker.patch(
         "app.repository.comments.show_user_comments",
         new_callable=AsyncMock,
-        return_value=[
+        return_value=CommentPage(items=[
             CommentResponse(id=1, text="Comment 1", user_id=1, post_id=1),
             CommentResponse(id=2, text="Comment 2", user_id=1, post_id=2)
-        ]
+        ], total=2)
     )
 
     async with AsyncClient(app=app, base_url="http://test") as ac:
         response = await ac.get("/api/comments/by_author/1")
 
     assert response.status_code == status.HTTP_200_OK
-    assert len(response.json()) == 2
+    assert len(response.json()["items"]) == 2
 
 
 @pytest.mark.asyncio
@@ -160,7 +160,7 @@ async def test_by_user_comments(mocker, mock_user, mock_db):
     mocker.patch(
         "app.repository.comments.show_user_comments",
         new_callable=AsyncMock,
-        return_value=[
+        return_value=CommentPage(items=[
             CommentResponse(
                 id=1, text="Comment 1", user_id=1, post_id=1,
                 created_at=datetime.utcnow(), updated_at=datetime.utcnow()
@@ -169,11 +169,11 @@ async def test_by_user_comments(mocker, mock_user, mock_db):
                 id=2, text="Comment 2", user_id=1, post_id=2,
                 created_at=datetime.utcnow(), updated_at=datetime.utcnow()
             )
-        ]
+        ], total=2)
     )
 
     async with AsyncClient(app=app, base_url="http://test") as ac:
         response = await ac.get("/api/comments/by_author/1")
 
     assert response.status_code == status.HTTP_200_OK
-    assert len(response.json()) == 2
\ No newline at end of file
+    assert len(response.json()["items"]) == 2
\ No newline at end of file
@@ -0,0 +1,85 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from httpx import AsyncClient
+
+from app.services import compression
+from app.services.compression import CompressionMiddleware, accepted_encodings
+
+BODY = "photo " * 500
+
+
+@pytest.fixture
+def compressed_app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/big")
+    def big():
+        return PlainTextResponse(BODY)
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([BODY, BODY]), media_type="application/x-ndjson")
+
+    @app.get("/encoded")
+    def encoded():
+        return PlainTextResponse(BODY, headers={"Content-Encoding": "identity"})
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("ok")
+
+    return app
+
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip, br;q=0.5") == {"gzip", "br"}
+    assert accepted_encodings("gzip;q=0, deflate") == {"deflate"}
+    assert accepted_encodings("") == set()
+
+
+@pytest.mark.asyncio
+async def test_gzip_above_threshold_only(compressed_app, monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    async with AsyncClient(app=compressed_app, base_url="http://test") as ac:
+        big = await ac.get("/big", headers={"Accept-Encoding": "gzip, br"})
+        small = await ac.get("/small", headers={"Accept-Encoding": "gzip"})
+        plain = await ac.get("/big", headers={"Accept-Encoding": "identity"})
+
+    assert big.headers["content-encoding"] == "gzip"
+    assert int(big.headers["content-length"]) < len(BODY)
+    assert big.text == BODY
+    assert "content-encoding" not in small.headers
+    assert "content-encoding" not in plain.headers
+
+
+@pytest.mark.asyncio
+async def test_gzip_streaming_and_existing_encoding(compressed_app, monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    async with AsyncClient(app=compressed_app, base_url="http://test") as ac:
+        streamed = await ac.get("/stream", headers={"Accept-Encoding": "gzip"})
+        encoded = await ac.get("/encoded", headers={"Accept-Encoding": "gzip"})
+
+    assert streamed.headers["content-encoding"] == "gzip"
+    assert "content-length" not in streamed.headers
+    assert streamed.headers["vary"] == "Accept-Encoding"
+    assert streamed.text == BODY * 2
+    # відповідь, яка вже має Content-Encoding, не стискається вдруге
+    assert encoded.headers["content-encoding"] == "identity"
+    assert encoded.text == BODY
+
+
+@pytest.mark.asyncio
+async def test_brotli_preferred_when_available(compressed_app):
+    pytest.importorskip("brotli")
+    async with AsyncClient(app=compressed_app, base_url="http://test") as ac:
+        response = await ac.get("/big", headers={"Accept-Encoding": "gzip, br"})
+        streamed = await ac.get("/stream", headers={"Accept-Encoding": "br"})
+
+    assert streamed.headers["content-encoding"] == "br"
+    assert streamed.text == BODY * 2
+    assert response.headers["content-encoding"] == "br"
+    assert int(response.headers["content-length"]) < len(BODY)
+    # httpx розпаковує br сам, якщо встановлено brotli
+    assert response.text == BODY
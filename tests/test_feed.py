@@ -0,0 +1,119 @@
+import pytest
+from datetime import datetime, timedelta
+
+from app.conf.config import settings
+from app.database.models import Follow, Post, User
+from app.repository import posts, users
+from app.services import feed
+
+T0 = datetime(2024, 1, 1)
+
+
+# -----------------------------
+# REDIS LISTS
+# -----------------------------
+@pytest.mark.asyncio
+async def test_push_only_into_existing_feeds(fake_redis):
+    await feed.store_feed(1, [5, 3])
+    await feed.push_post(7, [1, 2])
+
+    assert await feed.read_feed(1, 10) == [7, 5, 3]
+    # стрічку неактивного користувача не створюємо
+    assert await feed.read_feed(2, 10) is None
+
+
+@pytest.mark.asyncio
+async def test_feed_is_trimmed(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "feed_max_length", 3)
+    await feed.store_feed(1, [5, 4, 3, 2, 1])
+    await feed.push_post(6, [1])
+
+    assert await feed.read_feed(1, 10) == [6, 5, 4]
+
+
+@pytest.mark.asyncio
+async def test_drop_feed(fake_redis):
+    await feed.store_feed(1, [1])
+    await feed.drop_feed(1)
+    assert await feed.read_feed(1, 10) is None
+
+
+# -----------------------------
+# REPOSITORY (справжня SQLite + fakeredis)
+# -----------------------------
+@pytest.fixture
+def graph(sqlite_db):
+    sqlite_db.add_all([
+        User(id=i, username=name, email=f"{name}@example.com", password="x")
+        for i, name in enumerate(["reader", "alice", "bob", "star"], 1)
+    ])
+    sqlite_db.add_all([
+        Post(id=i, title=f"p{i}", descr="", user_id=author, created_at=T0 + timedelta(minutes=i))
+        for i, author in [(1, 2), (2, 3), (3, 4), (4, 1)]
+    ])
+    sqlite_db.commit()
+    return sqlite_db
+
+
+@pytest.mark.asyncio
+async def test_follow_and_unfollow_update_counts(graph, fake_redis):
+    reader = graph.get(User, 1)
+    assert await users.follow_user(reader, 2, graph) is True
+    assert await users.follow_user(reader, 2, graph) is False
+    graph.expire_all()
+    assert graph.get(User, 2).followers_count == 1
+
+    assert await users.unfollow_user(reader, 2, graph) is True
+    assert await users.unfollow_user(reader, 2, graph) is False
+    graph.expire_all()
+    assert graph.get(User, 2).followers_count == 0
+    assert graph.query(Follow).count() == 0
+
+
+@pytest.mark.asyncio
+async def test_feed_rebuilt_from_db_then_fanned_out(graph, fake_redis):
+    reader = graph.get(User, 1)
+    await users.follow_user(reader, 2, graph)
+    await users.follow_user(reader, 3, graph)
+
+    assert [p.id for p in await posts.get_feed(reader, 0, 10, graph)] == [2, 1]
+    assert await feed.read_feed(1, 10) == [2, 1]
+
+    new_post = Post(id=5, title="p5", descr="", user_id=2, created_at=T0 + timedelta(minutes=5))
+    graph.add(new_post)
+    graph.commit()
+    await posts.fan_out_post(new_post, graph)
+
+    assert [p.id for p in await posts.get_feed(reader, 0, 2, graph)] == [5, 2]
+    assert [p.id for p in await posts.get_feed(reader, 1, 10, graph)] == [2, 1]
+
+
+@pytest.mark.asyncio
+async def test_celebrity_posts_pulled_on_read(graph, fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "feed_celebrity_threshold", 0)
+    reader = graph.get(User, 1)
+    await users.follow_user(reader, 4, graph)
+
+    star_post = Post(id=5, title="p5", descr="", user_id=4, created_at=T0 + timedelta(minutes=5))
+    graph.add(star_post)
+    graph.commit()
+    await posts.fan_out_post(star_post, graph)
+
+    # у Redis пости «зірки» не потрапляють, але стрічка їх показує
+    assert await feed.read_feed(1, 10) is None
+    assert [p.id for p in await posts.get_feed(reader, 0, 10, graph)] == [5, 3]
+
+
+@pytest.mark.asyncio
+async def test_feed_works_without_redis(graph, monkeypatch):
+    async def unavailable(*args):
+        return None
+
+    monkeypatch.setattr(feed, "read_feed", unavailable)
+    monkeypatch.setattr(feed, "store_feed", unavailable)
+    monkeypatch.setattr(feed, "drop_feed", unavailable)
+    reader = graph.get(User, 1)
+    await users.follow_user(reader, 3, graph)
+
+    assert [p.id for p in await posts.get_feed(reader, 0, 10, graph)] == [2]
+
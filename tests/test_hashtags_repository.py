@@ -1,7 +1,8 @@
 import pytest
-from unittest.mock import MagicMock
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
 from app.repository import hashtags
-from app.database.models import Hashtag, User
+from app.database.models import Hashtag, Post, User
 from app.schemas import HashtagBase
 
 # -----------------------------
@@ -111,3 +112,67 @@ async def test_remove_tag_existing(fake_db, tag_obj):
 async def test_remove_tag_not_found(fake_db):
     result = await hashtags.remove_tag(tag_id=1, db=fake_db)
     assert result is None
+
+
+# -----------------------------
+# Trending (real SQLite)
+# -----------------------------
+@pytest.mark.asyncio
+async def test_get_trending_tags_from_redis(sqlite_db, fake_redis):
+    await hashtags.trending.record_usage(["sea", "sea", "sun"])
+    result = await hashtags.get_trending_tags(24, 10, sqlite_db)
+    assert [(t.title, t.uses) for t in result] == [("sea", 2), ("sun", 1)]
+
+
+@pytest.mark.asyncio
+async def test_get_trending_tags_db_fallback(sqlite_db, monkeypatch):
+    monkeypatch.setattr(hashtags.trending, "top_hashtags", AsyncMock(return_value=None))
+    sea = Hashtag(id=1, title="sea", user_id=1)
+    sun = Hashtag(id=2, title="sun", user_id=1)
+    sqlite_db.add_all([
+        User(id=1, username="author", email="author@example.com", password="x"),
+        Post(id=1, user_id=1, hashtags=[sea, sun], created_at=datetime.now()),
+        Post(id=2, user_id=1, hashtags=[sun], created_at=datetime.now()),
+        Post(id=3, user_id=1, hashtags=[sea], created_at=datetime.now() - timedelta(days=3)),
+    ])
+    sqlite_db.commit()
+
+    result = await hashtags.get_trending_tags(24, 10, sqlite_db)
+    assert [(t.title, t.uses) for t in result] == [("sun", 2), ("sea", 1)]
+
+
+# -----------------------------
+# Autocomplete (real SQLite)
+# -----------------------------
+@pytest.fixture
+def tagged(sqlite_db):
+    sea = Hashtag(id=1, title="sea", user_id=1)
+    seaside = Hashtag(id=2, title="Seaside", user_id=1)
+    sqlite_db.add_all([
+        User(id=1, username="author", email="author@example.com", password="x"),
+        Hashtag(id=3, title="sun", user_id=1),
+        Hashtag(id=4, title="se%", user_id=1),
+        Post(id=1, user_id=1, hashtags=[sea, seaside]),
+        Post(id=2, user_id=1, hashtags=[seaside]),
+    ])
+    sqlite_db.commit()
+    return sqlite_db
+
+
+@pytest.mark.asyncio
+async def test_suggest_index_built_and_kept_in_sync(tagged, fake_redis):
+    await hashtags.build_suggest_index(tagged)
+    assert await hashtags.suggest_tags("se", 10, tagged) == ["Seaside", "sea", "se%"]
+
+    await hashtags.create_tag(HashtagBase(title="sepia"), User(id=1), tagged)
+    await hashtags.update_tag(1, HashtagBase(title="ocean"), tagged)
+    await hashtags.remove_tag(2, tagged)
+    assert await hashtags.suggest_tags("se", 10, tagged) == ["se%", "sepia"]
+    assert await hashtags.suggest_tags("oc", 10, tagged) == ["ocean"]
+
+
+@pytest.mark.asyncio
+async def test_suggest_tags_db_fallback(tagged, monkeypatch):
+    monkeypatch.setattr(hashtags.tag_suggest, "suggest", AsyncMock(return_value=None))
+    assert await hashtags.suggest_tags("SE", 10, tagged) == ["Seaside", "sea", "se%"]
+    assert await hashtags.suggest_tags("se%", 10, tagged) == ["se%"]
@@ -5,7 +5,7 @@ from httpx import AsyncClient
 from datetime import datetime
 
 from app.main import app
-from app.schemas import HashtagBase, HashtagResponse
+from app.schemas import HashtagBase, HashtagResponse, TrendingHashtag
 from app.database.models import User
 
 @pytest.mark.asyncio
@@ -137,3 +137,52 @@ async def test_remove_tag_not_found(mocker):
         response = await ac.delete("/api/hashtags/del/999")
 
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_read_trending_tags(monkeypatch, login_as):
+    login_as(User(id=1, role="user"))
+    trending_mock = AsyncMock(return_value=[TrendingHashtag(title="sea", uses=3)])
+    monkeypatch.setattr("app.repository.hashtags.get_trending_tags", trending_mock)
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/api/hashtags/trending", params={"window": 1, "limit": 5})
+        unsupported = await ac.get("/api/hashtags/trending", params={"window": 5})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [{"title": "sea", "uses": 3}]
+    assert trending_mock.await_args.args[:2] == (1, 5)
+    assert unsupported.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_suggest_tags(monkeypatch, login_as):
+    login_as(User(id=1, role="user"))
+    suggest_mock = AsyncMock(return_value=["sea", "season"])
+    monkeypatch.setattr("app.repository.hashtags.suggest_tags", suggest_mock)
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/api/hashtags/suggest", params={"prefix": "se", "limit": 2})
+        empty = await ac.get("/api/hashtags/suggest", params={"prefix": ""})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == ["sea", "season"]
+    assert suggest_mock.await_args.args[:2] == ("se", 2)
+    assert empty.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_read_tag_by_id_conditional_get(monkeypatch, login_as):
+    from app.database.models import Hashtag
+
+    login_as(User(id=1, role="user"))
+    tag = Hashtag(id=1, title="sea", user_id=1, created_at=datetime(2024, 1, 1))
+    monkeypatch.setattr("app.repository.hashtags.get_tag_by_id", AsyncMock(return_value=tag))
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        first = await ac.get("/api/hashtags/by_id/1")
+        cached = await ac.get("/api/hashtags/by_id/1", headers={"If-None-Match": first.headers["etag"]})
+
+    assert first.status_code == status.HTTP_200_OK
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    assert cached.headers["cache-control"] == first.headers["cache-control"]
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from app.database.models import Hashtag, Post
+from app.services import http_cache
+
+
+def test_etag_matches_weak_comparison():
+    etag = http_cache.weak_etag("post", 1)
+    assert etag.startswith('W/"')
+    assert http_cache.etag_matches(etag, etag)
+    # слабке порівняння: префікс W/ не враховується, список тегів через кому
+    assert http_cache.etag_matches(f'"other", {etag[2:]}', etag)
+    assert http_cache.etag_matches("*", etag)
+    assert not http_cache.etag_matches('W/"other"', etag)
+    assert not http_cache.etag_matches(None, etag)
+
+
+def test_post_etag_follows_version_fields():
+    tag = Hashtag(id=1, title="sea")
+    post = Post(id=1, updated_at=datetime(2024, 1, 1), rating_sum=4, rating_count=1, hashtags=[tag])
+    etag = http_cache.post_etag(post)
+    assert http_cache.post_etag(post) == etag
+
+    post.rating_sum, post.rating_count = 9, 2
+    rated = http_cache.post_etag(post)
+    assert rated != etag
+
+    tag.title = "ocean"
+    assert http_cache.post_etag(post) != rated
+
+
+def test_tags_etag_changes_on_rename():
+    tag = Hashtag(id=1, title="sea")
+    etag = http_cache.tags_etag([tag])
+    tag.title = "ocean"
+    assert http_cache.tags_etag([tag]) != etag
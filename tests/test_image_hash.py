@@ -0,0 +1,69 @@
+import io
+import random
+
+import pytest
+from PIL import Image, ImageDraw
+
+from app.services.image_hash import BKTree, hamming, phash, phash_file
+
+
+def picture(seed: int, size=(320, 240)) -> Image.Image:
+    rng = random.Random(seed)
+    image = Image.new("RGB", size, (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        draw.ellipse((x, y, x + rng.randrange(20, 120), y + rng.randrange(20, 120)),
+                     fill=(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    return image
+
+
+def jpeg(image: Image.Image, quality: int = 90) -> io.BytesIO:
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    buffer.seek(0)
+    return buffer
+
+
+def test_phash_survives_resize_and_recompression():
+    original = phash(picture(1))
+    assert hamming(original, phash(picture(1).resize((160, 120)))) <= 4
+    assert hamming(original, phash(Image.open(jpeg(picture(1), quality=40)))) <= 4
+    assert hamming(original, phash(picture(2))) > 10
+
+
+@pytest.mark.asyncio
+async def test_phash_file_rewinds_and_skips_non_images():
+    file = jpeg(picture(3))
+    assert hamming(await phash_file(file), phash(picture(3))) <= 4
+    assert file.tell() == 0
+    assert await phash_file(io.BytesIO(b"not an image")) is None
+
+
+def test_bk_tree_matches_linear_scan():
+    rng = random.Random(7)
+    hashes = {f"img{i}": rng.getrandbits(64) for i in range(500)}
+    # кілька близьких до першого хешу
+    for i in range(5):
+        hashes[f"near{i}"] = hashes["img0"] ^ (1 << i) ^ (1 << (i + 20))
+    tree = BKTree()
+    tree.rebuild(hashes.items())
+
+    for query in [hashes["img0"], rng.getrandbits(64)]:
+        expected = sorted(((key, hamming(query, value)) for key, value in hashes.items()
+                           if hamming(query, value) <= 12), key=lambda item: (item[1], item[0]))
+        assert tree.search(query, 12) == expected
+
+    assert [key for key, _ in tree.search(hashes["img0"], 2)] == ["img0"] + [f"near{i}" for i in range(5)]
+
+
+def test_bk_tree_remove_and_shared_hash():
+    tree = BKTree()
+    tree.add("a", 0b1010)
+    tree.add("b", 0b1010)
+    tree.add("c", 0b1011)
+    tree.remove("a")
+    assert tree.search(0b1010, 1) == [("b", 0), ("c", 1)]
+    tree.add("c", None)
+    assert tree.search(0b1010, 1) == [("b", 0)]
+    assert len(tree) == 1
@@ -0,0 +1,70 @@
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from app.conf.config import MEDIA_DIR, settings
+from app.services import image_variants
+
+
+def _png(width, height):
+    buffer = io.BytesIO()
+    Image.new("RGBA", (width, height), (200, 50, 50, 255)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_cloudinary_variants_from_eager_response():
+    eager = [{"secure_url": f"https://res.cloudinary.com/demo/{i}"} for i in range(len(image_variants.eager_transformations()))]
+    variants = image_variants.cloudinary_variants("sunset", {"eager": eager})
+
+    assert set(variants) == {"thumb", "medium", "large"}
+    assert variants["thumb"]["jpg"] == "https://res.cloudinary.com/demo/0"
+    assert variants["large"]["avif"] == f"https://res.cloudinary.com/demo/{len(eager) - 1}"
+
+
+def test_cloudinary_variants_built_without_eager():
+    variants = image_variants.cloudinary_variants("sunset", {})
+    url = variants["medium"]["webp"]
+    assert url.startswith("https://") and "w_800" in url and url.endswith("sunset.webp")
+
+
+def test_upload_options_request_async_eager(monkeypatch):
+    monkeypatch.setattr(settings, "image_variants_backend", "cloudinary")
+    options = image_variants.upload_options()
+    assert options["eager_async"] is True
+    assert len(options["eager"]) == len(image_variants.eager_transformations())
+
+    monkeypatch.setattr(settings, "image_variants_backend", "local")
+    assert image_variants.upload_options() == {}
+    assert image_variants.VARIANTS_DIR == os.path.join(MEDIA_DIR, "variants")
+
+
+def test_local_variants_sizes_and_formats(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_variants, "VARIANTS_DIR", str(tmp_path / "media" / "variants"))
+    monkeypatch.chdir(tmp_path)
+    variants = image_variants.local_variants(_png(2000, 1000), "sunset", "http://test")
+
+    thumb = variants["thumb"]["jpg"]
+    assert thumb == "http://test/media/variants/sunset/thumb.jpg"
+    assert Image.open("media/variants/sunset/thumb.jpg").size == (200, 200)
+    assert Image.open("media/variants/sunset/medium.webp").size == (800, 400)
+    assert Image.open("media/variants/sunset/large.jpg").size == (1600, 800)
+
+    monkeypatch.setattr(settings, "image_variants_backend", "local")
+    image_variants.delete_variants("sunset")
+    assert not os.path.exists("media/variants/sunset")
+
+
+@pytest.mark.asyncio
+async def test_local_variants_keep_small_images(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_variants, "VARIANTS_DIR", str(tmp_path / "media" / "variants"))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(settings, "image_variants_backend", "local")
+
+    class FakeRequest:
+        base_url = "http://test/"
+
+    variants = await image_variants.build_variants("small", {}, io.BytesIO(_png(300, 150)), FakeRequest())
+    assert Image.open("media/variants/small/large.webp").size == (300, 150)
+    assert variants["medium"]["webp"] == "http://test/media/variants/small/medium.webp"
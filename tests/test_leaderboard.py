@@ -0,0 +1,82 @@
+import pytest
+
+from app.services import leaderboard
+from app.conf.config import settings
+
+
+# -----------------------------
+# BAYESIAN SCORE
+# -----------------------------
+def test_bayesian_score_without_votes_is_prior_mean():
+    assert leaderboard.bayesian_score(0, 0) == pytest.approx(settings.rating_prior_mean)
+
+
+def test_bayesian_score_prefers_many_votes():
+    # один голос "5" важить менше, ніж сто голосів по 4.8
+    single = leaderboard.bayesian_score(5, 1)
+    many = leaderboard.bayesian_score(480, 100)
+    assert many > single
+
+
+# -----------------------------
+# REDIS SORTED SETS
+# -----------------------------
+@pytest.mark.asyncio
+async def test_top_post_ids_without_board_returns_none(fake_redis):
+    assert await leaderboard.top_post_ids(0, 10) is None
+
+
+@pytest.mark.asyncio
+async def test_update_post_orders_global_and_hashtag_boards(fake_redis):
+    await leaderboard.rebuild([])
+    await leaderboard.update_post(1, 3.5, ["sea"])
+    await leaderboard.update_post(2, 4.5, ["sea", "sun"])
+    await leaderboard.update_post(3, 4.0, [])
+
+    assert await leaderboard.top_post_ids(0, 10) == [2, 3, 1]
+    assert await leaderboard.top_post_ids(1, 1) == [3]
+    assert await leaderboard.top_post_ids(0, 10, "sea") == [2, 1]
+    assert await leaderboard.top_post_ids(0, 10, "sun") == [2]
+
+
+@pytest.mark.asyncio
+async def test_update_post_moves_between_hashtags(fake_redis):
+    await leaderboard.rebuild([])
+    await leaderboard.update_post(1, 4.0, ["sea"])
+    await leaderboard.update_post(1, 4.0, ["sun"], stale_hashtags=["sea"])
+
+    assert await leaderboard.top_post_ids(0, 10, "sea") == []
+    assert await leaderboard.top_post_ids(0, 10, "sun") == [1]
+
+
+@pytest.mark.asyncio
+async def test_remove_post(fake_redis):
+    await leaderboard.rebuild([])
+    await leaderboard.update_post(1, 4.0, ["sea"])
+    await leaderboard.update_post(2, 3.0, ["sea"])
+    await leaderboard.remove_post(1, ["sea"])
+
+    assert await leaderboard.top_post_ids(0, 10) == [2]
+    assert await leaderboard.top_post_ids(0, 10, "sea") == [2]
+
+
+@pytest.mark.asyncio
+async def test_partial_board_is_not_trusted_until_rebuilt(fake_redis):
+    # після очищення Redis перша нова оцінка створює таблицю з одним постом
+    await leaderboard.update_post(3, 4.0, ["sea"])
+    assert await leaderboard.top_post_ids(0, 10) is None
+
+    await fake_redis.zadd(leaderboard.HASHTAG_KEY.format("old"), {99: 1.0})
+    await leaderboard.rebuild([(1, 4.5, ["sea"]), (2, 3.0, []), (3, 4.0, ["sea"])])
+
+    assert await leaderboard.top_post_ids(0, 10) == [1, 3, 2]
+    assert await leaderboard.top_post_ids(0, 10, "sea") == [1, 3]
+    assert await leaderboard.top_post_ids(0, 10, "old") == []
+
+
+@pytest.mark.asyncio
+async def test_rebuild_lock_is_taken_once(fake_redis):
+    assert await leaderboard.lock_rebuild() is True
+    assert await leaderboard.lock_rebuild() is False
+    await leaderboard.rebuild([])
+    assert await leaderboard.lock_rebuild() is True
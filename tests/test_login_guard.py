@@ -0,0 +1,91 @@
+import threading
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.services import login_guard
+
+
+def test_lockout_doubles_and_is_capped(monkeypatch):
+    monkeypatch.setattr(login_guard.settings, "login_lockout_base", 30)
+    monkeypatch.setattr(login_guard.settings, "login_lockout_max", 200)
+
+    assert login_guard.lockout_seconds(4, 5) == 0
+    assert login_guard.lockout_seconds(5, 5) == 30
+    assert login_guard.lockout_seconds(6, 5) == 60
+    assert login_guard.lockout_seconds(9, 5) == 200
+
+
+@pytest.mark.asyncio
+async def test_email_locked_after_threshold(fake_redis, monkeypatch):
+    monkeypatch.setattr(login_guard.settings, "login_max_email_failures", 3)
+
+    for _ in range(2):
+        await login_guard.register_failure("Victim@Example.com", "1.1.1.1")
+    assert await login_guard.locked_for("victim@example.com", "2.2.2.2") is None
+
+    await login_guard.register_failure("victim@example.com", "3.3.3.3")
+    assert 0 < await login_guard.locked_for("victim@example.com", "2.2.2.2") <= 30
+    # інший email з того ж IP не заблоковано
+    assert await login_guard.locked_for("other@example.com", "1.1.1.1") is None
+
+    await login_guard.register_success("victim@example.com")
+    assert await login_guard.locked_for("victim@example.com", "2.2.2.2") is None
+
+
+@pytest.mark.asyncio
+async def test_ip_locked_across_emails(fake_redis, monkeypatch):
+    monkeypatch.setattr(login_guard.settings, "login_max_ip_failures", 3)
+
+    for number in range(3):
+        await login_guard.register_failure(f"user{number}@example.com", "6.6.6.6")
+
+    assert await login_guard.locked_for("new@example.com", "6.6.6.6") > 0
+
+
+@pytest.mark.asyncio
+async def test_unknown_email_still_checks_dummy_hash(monkeypatch):
+    calls = []
+    monkeypatch.setattr(login_guard.auth_service, "verify_password", lambda password, hashed: calls.append(hashed) or True)
+    login_guard._dummy_hash.cache_clear()
+
+    assert await login_guard.verify_password("secret", None) is False
+    assert await login_guard.verify_password("secret", "stored") is True
+    assert calls[0].startswith("$2") and calls[1] == "stored"
+
+
+@pytest.mark.asyncio
+async def test_dummy_hash_is_computed_off_the_event_loop(monkeypatch):
+    threads = []
+    monkeypatch.setattr(
+        login_guard.auth_service, "get_password_hash", lambda password: threads.append(threading.get_ident()) or "$2b$dummy"
+    )
+    monkeypatch.setattr(login_guard.auth_service, "verify_password", lambda password, hashed: False)
+    login_guard._dummy_hash.cache_clear()
+
+    await login_guard.verify_password("secret", None)
+    login_guard._dummy_hash.cache_clear()
+
+    assert threads and threads[0] != threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_locked_login_skips_db_and_bcrypt(fake_redis, monkeypatch):
+    monkeypatch.setattr(login_guard.settings, "login_max_email_failures", 2)
+    get_user = AsyncMock(return_value=None)
+    verify = AsyncMock(return_value=False)
+    monkeypatch.setattr("app.repository.users.get_user_by_email", get_user)
+    monkeypatch.setattr(login_guard, "verify_password", verify)
+    form = {"username": "victim@example.com", "password": "guess"}
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        first = await client.post("/api/auth/login", data=form)
+        second = await client.post("/api/auth/login", data=form)
+        third = await client.post("/api/auth/login", data=form)
+
+    assert [first.status_code, second.status_code] == [401, 401]
+    assert third.status_code == 429
+    assert int(third.headers["Retry-After"]) > 0
+    assert get_user.await_count == 2 and verify.await_count == 2
@@ -0,0 +1,148 @@
+import json
+import socket
+from unittest.mock import AsyncMock
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from app.services import mail_queue
+from app.services.mail_queue import DEAD_KEY, DELAYED_KEY, QUEUE_KEY, MailWorker
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_stub(monkeypatch):
+    """Локальний SMTP-сервер (aiosmtpd) замість справжнього поштового сервера."""
+    handler = RecordingHandler()
+    port = free_port()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    monkeypatch.setattr(mail_queue.settings, "mail_server", "127.0.0.1")
+    monkeypatch.setattr(mail_queue.settings, "mail_port", port)
+    monkeypatch.setattr(mail_queue.settings, "mail_ssl_tls", False)
+    monkeypatch.setattr(mail_queue.settings, "mail_starttls", False)
+    monkeypatch.setattr(mail_queue.settings, "mail_username", "")
+    monkeypatch.setattr(mail_queue.settings, "mail_from", "noreply@example.com")
+    yield handler
+    controller.stop()
+
+
+async def enqueue_many(count: int):
+    for number in range(count):
+        await mail_queue.enqueue(
+            f"user{number}@example.com",
+            "Confirm your email",
+            "example_email.html",
+            {"host": "http://test/", "username": f"user{number}", "token": f"token{number}"},
+        )
+
+
+@pytest.mark.asyncio
+async def test_batch_is_sent_over_one_connection(fake_redis, smtp_stub):
+    await enqueue_many(3)
+    worker = MailWorker()
+
+    sent = await worker.run_once()
+    await worker.close()
+
+    assert sent == 3
+    assert [envelope.rcpt_tos for envelope in smtp_stub.messages] == [
+        ["user0@example.com"], ["user1@example.com"], ["user2@example.com"]
+    ]
+    assert len(smtp_stub.sessions) == 1
+    assert b"http://test/api/auth/confirmed_email/token0" in smtp_stub.messages[0].content
+    assert await fake_redis.llen(QUEUE_KEY) == 0
+    assert await fake_redis.llen(worker.processing_key) == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_size_limits_one_run(fake_redis, smtp_stub, monkeypatch):
+    monkeypatch.setattr(mail_queue.settings, "mail_batch_size", 2)
+    await enqueue_many(3)
+    worker = MailWorker()
+
+    assert await worker.run_once() == 2
+    assert await worker.run_once() == 1
+    await worker.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_send_is_retried_with_backoff(fake_redis, monkeypatch):
+    monkeypatch.setattr(mail_queue.settings, "mail_server", "127.0.0.1")
+    monkeypatch.setattr(mail_queue.settings, "mail_port", free_port())
+    monkeypatch.setattr(mail_queue.settings, "mail_ssl_tls", False)
+    monkeypatch.setattr(mail_queue.settings, "mail_starttls", False)
+    monkeypatch.setattr(mail_queue.settings, "mail_from", "noreply@example.com")
+    monkeypatch.setattr(mail_queue.settings, "mail_retry_base", 30)
+    monkeypatch.setattr(mail_queue.settings, "mail_max_attempts", 2)
+    await enqueue_many(1)
+    worker = MailWorker()
+
+    assert await worker.run_once() == 0
+    [(raw, due)] = await fake_redis.zrange(DELAYED_KEY, 0, -1, withscores=True)
+    assert json.loads(raw)["attempts"] == 1
+    assert await worker.promote_due(now=due - 1) == 0
+
+    # час повтору настав — друга невдала спроба переносить лист у mail:dead
+    await worker.promote_due(now=due)
+    assert await worker.run_once() == 0
+    assert await fake_redis.zcard(DELAYED_KEY) == 0
+    assert json.loads(await fake_redis.lindex(DEAD_KEY, 0))["attempts"] == 2
+
+
+@pytest.mark.asyncio
+async def test_due_job_is_promoted_by_one_worker_only(fake_redis, monkeypatch):
+    await fake_redis.zadd(DELAYED_KEY, {b'{"id": "1"}': 10, b'{"id": "2"}': 10})
+    first, second = MailWorker("a"), MailWorker("b")
+    # обидва воркери прочитали ті самі завдання до того, як перший їх переніс
+    due = await fake_redis.zrangebyscore(DELAYED_KEY, 0, 20)
+    monkeypatch.setattr(fake_redis, "zrangebyscore", AsyncMock(return_value=due))
+
+    assert await first.promote_due(now=20) == 2
+    assert await second.promote_due(now=20) == 0
+    assert await fake_redis.llen(QUEUE_KEY) == 2
+
+
+def test_default_worker_names_differ_between_processes(monkeypatch):
+    name = mail_queue.default_worker_name()
+    monkeypatch.setattr(mail_queue.os, "getpid", lambda: -1)
+    assert mail_queue.default_worker_name() != name
+    assert MailWorker().processing_key == f"mail:processing:{mail_queue.default_worker_name()}"
+
+
+@pytest.mark.asyncio
+async def test_recover_returns_unfinished_jobs(fake_redis):
+    await enqueue_many(2)
+    worker = MailWorker("crashed")
+    batch = await worker.next_batch()
+    assert len(batch) == 2 and await fake_redis.llen(QUEUE_KEY) == 0
+
+    assert await MailWorker("crashed").recover() == 2
+    assert [json.loads(raw)["to"] for raw in await MailWorker("other").next_batch()] == [
+        "user0@example.com", "user1@example.com"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_unrenderable_job_goes_straight_to_dead(fake_redis):
+    await mail_queue.enqueue("user@example.com", "Hi", "missing.html", {})
+
+    assert await MailWorker().run_once() == 0
+    assert json.loads(await fake_redis.lindex(DEAD_KEY, 0))["attempts"] == 1
+    assert await fake_redis.zcard(DELAYED_KEY) == 0
@@ -0,0 +1,180 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import cloudinary.exceptions
+import pytest
+from jose import jwt
+
+from app.conf.config import MEDIA_DIR
+from app.database.models import BlacklistToken, ImageHash, Post, User
+from app.repository import users as repository_users
+from app.services import cloudinary_cleanup, leaderboard, maintenance, scheduler
+from app.services.cloudinary_cleanup import ORPHANS_KEY
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    registry = {}
+    monkeypatch.setattr(scheduler, "_jobs", registry)
+    return registry
+
+
+@pytest.mark.asyncio
+async def test_job_runs_once_per_interval_across_processes(fake_redis, jobs):
+    calls = []
+
+    @scheduler.job("demo", lambda: 60)
+    async def demo():
+        calls.append(1)
+        return 3
+
+    first = await scheduler.run_pending()
+    # інший процес (або наступний тік) не бере lock, поки не мине інтервал
+    second = await scheduler.run_pending()
+
+    assert first["demo"]["processed"] == 3 and second == {}
+    assert len(calls) == 1
+    assert 0 < await fake_redis.ttl("maintenance:lock:demo") <= 60
+
+    metrics = (await scheduler.job_metrics())["demo"]
+    assert metrics["status"] == "ok" and metrics["runs"] == "1" and metrics["processed"] == "3"
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_recorded_and_does_not_stop_others(fake_redis, jobs):
+    @scheduler.job("broken", lambda: 60)
+    async def broken():
+        raise RuntimeError("boom")
+
+    @scheduler.job("healthy", lambda: 60)
+    async def healthy():
+        return 1
+
+    results = await scheduler.run_pending()
+
+    assert results["broken"]["status"] == "failed" and results["broken"]["error"] == "boom"
+    assert results["healthy"]["status"] == "ok"
+    assert (await scheduler.job_metrics())["broken"]["failures"] == "1"
+
+
+def test_maintenance_jobs_are_registered():
+    assert {"blacklist_tokens", "refresh_tokens", "qrcodes", "cloudinary_cleanup", "leaderboards"} <= set(scheduler.registered())
+
+
+def test_purge_blacklist_in_batches(sqlite_db):
+    now = datetime(2024, 1, 2)
+    for number in range(5):
+        sqlite_db.add(BlacklistToken(token=f"old{number}", blacklisted_on=now - timedelta(days=2)))
+    sqlite_db.add(BlacklistToken(token="fresh", blacklisted_on=now))
+    sqlite_db.commit()
+
+    deleted = repository_users.purge_blacklist(now - timedelta(days=1), 2, sqlite_db)
+
+    assert deleted == 5
+    assert [row.token for row in sqlite_db.query(BlacklistToken).all()] == ["fresh"]
+
+
+def test_clear_expired_refresh_tokens(sqlite_db):
+    now = datetime(2024, 1, 2)
+    expired = jwt.encode({"sub": "a", "exp": now - timedelta(hours=1)}, "secret")
+    valid = jwt.encode({"sub": "b", "exp": now + timedelta(days=1)}, "secret")
+    stamp = datetime(2023, 12, 1)
+    tokens = [expired, valid, "garbage", None, expired]
+    for number, token in enumerate(tokens):
+        sqlite_db.add(User(email=f"u{number}@example.com", password="x", refresh_token=token, updated_at=stamp))
+    sqlite_db.commit()
+
+    cleared = repository_users.clear_expired_refresh_tokens(now, 2, sqlite_db)
+
+    sqlite_db.expire_all()
+    users = sqlite_db.query(User).order_by(User.id).all()
+    assert cleared == 3
+    assert [user.refresh_token for user in users] == [None, valid, None, None, None]
+    assert all(user.updated_at == stamp for user in users)
+
+
+@pytest.mark.asyncio
+async def test_db_jobs_run_off_the_event_loop(monkeypatch):
+    threads = []
+    session = MagicMock()
+    monkeypatch.setattr(maintenance, "SessionLocal", lambda: session)
+    monkeypatch.setattr(repository_users, "purge_blacklist", lambda *args: threads.append(threading.get_ident()) or 2)
+    monkeypatch.setattr(
+        repository_users, "clear_expired_refresh_tokens", lambda *args: threads.append(threading.get_ident()) or 1
+    )
+
+    assert await maintenance.purge_blacklist() == 2
+    assert await maintenance.clear_refresh_tokens() == 1
+    assert len(threads) == 2 and threading.get_ident() not in threads
+    assert session.close.call_count == 2
+
+
+def test_qrcodes_dir_does_not_depend_on_cwd():
+    assert os.path.isabs(maintenance.QRCODES_DIR)
+    assert maintenance.QRCODES_DIR == os.path.join(MEDIA_DIR, "qrcodes")
+
+
+def test_remove_old_qrcodes(tmp_path):
+    old, fresh, other = tmp_path / "1.png", tmp_path / "2.png", tmp_path / "notes.txt"
+    for path in (old, fresh, other):
+        path.write_bytes(b"x")
+    week_ago = time.time() - 7 * 86400
+    os.utime(old, (week_ago, week_ago))
+    os.utime(other, (week_ago, week_ago))
+
+    assert maintenance.remove_old_files(str(tmp_path), 86400) == 1
+    assert not old.exists() and fresh.exists() and other.exists()
+    assert maintenance.remove_old_files(str(tmp_path / "missing"), 86400) == 0
+
+
+@pytest.mark.asyncio
+async def test_cloudinary_queue_is_purged_in_batches(fake_redis, sqlite_db, monkeypatch):
+    await cloudinary_cleanup.enqueue(f"post-{number}" for number in range(1, 151))
+    assert await fake_redis.scard(ORPHANS_KEY) == 150
+
+    delete_resources = MagicMock()
+    monkeypatch.setattr("cloudinary.api.delete_resources", delete_resources)
+
+    assert await cloudinary_cleanup.purge(limit=1000, db=sqlite_db) == 150
+    assert [len(call.args[0]) for call in delete_resources.call_args_list] == [100, 50]
+    assert await fake_redis.scard(ORPHANS_KEY) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_stays_queued(fake_redis, sqlite_db, monkeypatch):
+    await cloudinary_cleanup.enqueue(["post-1", "post-2"])
+    monkeypatch.setattr(
+        "cloudinary.api.delete_resources", MagicMock(side_effect=cloudinary.exceptions.Error("rate limited"))
+    )
+
+    assert await cloudinary_cleanup.purge(limit=1000, db=sqlite_db) == 0
+    assert await fake_redis.scard(ORPHANS_KEY) == 2
+
+
+@pytest.mark.asyncio
+async def test_purge_skips_images_in_use_again(fake_redis, sqlite_db, monkeypatch):
+    sqlite_db.add(User(id=1, username="author", email="a@example.com", password="x"))
+    sqlite_db.add(Post(id=1, title="p", descr="", user_id=1, public_id="post-1"))
+    sqlite_db.add(ImageHash(public_id="post-2", sha256="0" * 64))
+    sqlite_db.commit()
+    await cloudinary_cleanup.enqueue(["post-1", "post-2", "post-3"])
+    delete_resources = MagicMock()
+    monkeypatch.setattr("cloudinary.api.delete_resources", delete_resources)
+
+    assert await cloudinary_cleanup.purge(limit=1000, db=sqlite_db) == 1
+    delete_resources.assert_called_once_with(["post-3"])
+    assert await fake_redis.scard(ORPHANS_KEY) == 0
+
+
+@pytest.mark.asyncio
+async def test_leaderboards_job_rebuilds_missing_boards(fake_redis, sqlite_db, monkeypatch):
+    sqlite_db.add(User(id=1, username="author", email="a@example.com", password="x"))
+    sqlite_db.add(Post(id=1, title="p", descr="", user_id=1, rating_sum=4, rating_count=1, rating_score=4))
+    sqlite_db.commit()
+    monkeypatch.setattr(maintenance, "SessionLocal", lambda: sqlite_db)
+
+    await maintenance.build_leaderboards()
+    assert await leaderboard.top_post_ids(0, 10) == [1]
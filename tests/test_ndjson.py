@@ -0,0 +1,63 @@
+import json
+import pytest
+
+from app.schemas import ImportReport, RatingImportModel, RatingModel
+from app.services import ndjson
+
+
+async def _stream(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def _collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+# -----------------------------
+# READING
+# -----------------------------
+@pytest.mark.asyncio
+async def test_iter_ndjson_chunks_splits_across_network_chunks():
+    stream = _stream(b'{"a": 1}\n{"a"', b': 2}\n\n{"a": 3}')
+    chunks = await _collect(ndjson.iter_ndjson_chunks(stream, chunk_size=2))
+
+    assert chunks == [
+        [(1, '{"a": 1}'), (2, '{"a": 2}')],
+        [(4, '{"a": 3}')],
+    ]
+
+
+def test_parse_chunk_reports_line_errors():
+    report = ImportReport()
+    chunk = [
+        (1, json.dumps({"post_id": 1, "user_id": 2, "rate": 5})),
+        (2, "not json"),
+        (3, json.dumps({"post_id": 1, "user_id": 2, "rate": 9})),
+    ]
+    valid = ndjson.parse_chunk(chunk, RatingImportModel, report)
+
+    assert [line for line, _ in valid] == [1]
+    assert report.failed == 2
+    assert [e.line for e in report.errors] == [2, 3]
+    assert "rate" in report.errors[1].error
+
+
+# -----------------------------
+# WRITING
+# -----------------------------
+def test_ndjson_stream_batches_rows_and_closes_session():
+    class Session:
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    db = Session()
+    rows = [RatingModel(id=i, post_id=1, user_id=2, rate=3, created_at="2024-01-01T00:00:00") for i in range(3)]
+    parts = list(ndjson.ndjson_stream(rows, RatingModel, db, batch_size=2))
+
+    assert len(parts) == 2
+    lines = "".join(parts).splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [0, 1, 2]
+    assert db.closed
@@ -1,12 +1,16 @@
+import hashlib
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime
-from fastapi import UploadFile
+from fastapi import HTTPException, UploadFile
 from io import BytesIO
 
 from app.repository import posts
-from app.database.models import User, Post, Hashtag, UserRoleEnum
-from app.schemas import PostUpdate
+from app.database.models import User, Post, Hashtag, ImageHash, UserRoleEnum
+from app.schemas import PostSearch, PostUpdate
+from app.services.image_hash import BKTree
+from tests.test_image_hash import jpeg, picture
 
 
 # -------------------------
@@ -29,6 +33,12 @@ class FakeDBSession:
         mock.join.return_value.filter.return_value.all.side_effect = lambda: self.posts
         return mock
 
+    def scalars(self, statement):
+        # select(...) -> підписників у фейковій БД немає
+        mock = MagicMock()
+        mock.all.return_value = []
+        return mock
+
     def add(self, obj):
         self.added.append(obj)
 
@@ -54,7 +64,7 @@ def fake_user():
 
 @pytest.fixture
 def fake_upload_file():
-    return UploadFile(filename="test.png", file=BytesIO(b"fake image data"))
+    return UploadFile(filename="test.jpg", file=jpeg(picture(0)))
 
 
 # -------------------------
@@ -83,6 +93,35 @@ async def test_create_post(mock_upload, fake_db, fake_user, fake_upload_file):
     assert mock_upload.called
 
 
+@pytest.mark.asyncio
+@patch("app.repository.posts.cloudinary.uploader.upload")
+async def test_create_post_rejects_non_image(mock_upload, fake_db, fake_user):
+    with pytest.raises(HTTPException) as error:
+        await posts.create_post(
+            request=None, title="Test Post", descr="", hashtags=[],
+            file=UploadFile(filename="test.png", file=BytesIO(b"fake image data")),
+            db=fake_db, current_user=fake_user
+        )
+    assert error.value.status_code == 415
+    assert not mock_upload.called
+    assert not fake_db.added
+
+
+@pytest.mark.asyncio
+async def test_create_post_rejects_too_many_hashtags_before_upload(sqlite_db, fake_redis, fake_user, fake_upload_file, monkeypatch):
+    upload = MagicMock(return_value={"secure_url": "https://fakeurl.com/image.png"})
+    monkeypatch.setattr("app.services.uploads.cloudinary.uploader.upload", upload)
+
+    with pytest.raises(HTTPException) as error:
+        await posts.create_post(
+            request=None, title="Test Post", descr="", hashtags=["a,b,c", "d,e,f"],
+            file=fake_upload_file, db=sqlite_db, current_user=fake_user
+        )
+    assert error.value.status_code == 400
+    upload.assert_not_called()
+    assert sqlite_db.query(ImageHash).count() == 0
+
+
 @pytest.mark.asyncio
 async def test_get_all_posts(fake_db):
     posts_list = await posts.get_all_posts(skip=0, limit=10, db=fake_db)
@@ -98,16 +137,127 @@ async def test_get_post_by_id(fake_db, fake_user):
 
 
 @pytest.mark.asyncio
-@patch("app.repository.posts.cloudinary.uploader.destroy")
-async def test_remove_post(mock_destroy, fake_db, fake_user):
+@patch("app.repository.posts.cloudinary_cleanup.enqueue", new_callable=AsyncMock)
+async def test_remove_post(mock_enqueue, fake_db, fake_user):
     post = Post(id=1, title="Test", descr="Desc", user_id=fake_user.id, public_id="abc123")
     fake_db.posts.append(post)
     result = await posts.remove_post(post_id=1, user=fake_user, db=fake_db)
     assert result == post
-    assert mock_destroy.called
+    mock_enqueue.assert_awaited_once_with(["abc123"])
     assert post in fake_db.deleted
 
 
+@pytest.mark.asyncio
+async def test_identical_upload_reuses_image(sqlite_db, fake_redis, monkeypatch):
+    author = User(id=1, username="author", email="a@x.com", password="x", role=UserRoleEnum.user)
+    sqlite_db.add(author)
+    sqlite_db.commit()
+    upload = MagicMock(return_value={"secure_url": "https://fakeurl.com/image.png"})
+    monkeypatch.setattr("app.services.uploads.cloudinary.uploader.upload", upload)
+    monkeypatch.setattr(posts.image_variants.settings, "image_variants_backend", "cloudinary")
+
+    created = []
+    same, other = jpeg(picture(1)).getvalue(), jpeg(picture(2)).getvalue()
+    for title, data in [("a", same), ("b", same), ("c", other)]:
+        created.append(await posts.create_post(
+            request=None, title=title, descr="", hashtags=[],
+            file=UploadFile(filename="x.jpg", file=BytesIO(data)), db=sqlite_db, current_user=author
+        ))
+
+    first, second, third = created
+    assert upload.call_count == 2
+    assert first.public_id == second.public_id != third.public_id
+    assert len(first.public_id) == 32
+    assert second.image_url == first.image_url and second.variants == first.variants
+    image = sqlite_db.get(ImageHash, first.public_id)
+    assert image.sha256 == hashlib.sha256(same).hexdigest()
+    assert len(image.phash) == 16
+
+    # спільне зображення видаляється лише разом з останнім постом
+    await posts.remove_post(first.id, author, sqlite_db)
+    assert await fake_redis.smembers("cloudinary:orphans") == set()
+    await posts.remove_post(second.id, author, sqlite_db)
+    assert await fake_redis.smembers("cloudinary:orphans") == {first.public_id.encode()}
+    assert sqlite_db.get(ImageHash, first.public_id) is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_upload_reuses_stored_image(sqlite_db, fake_redis, monkeypatch):
+    author = User(id=1, username="author", email="a@x.com", password="x", role=UserRoleEnum.user)
+    sqlite_db.add(author)
+    sqlite_db.commit()
+    data = jpeg(picture(1)).getvalue()
+    sha256 = hashlib.sha256(data).hexdigest()
+    public_id = posts.uploads.content_public_id(sha256)
+    # інший запит зберіг той самий файл між перевіркою get_image і add_image
+    sqlite_db.add(ImageHash(public_id=public_id, sha256=sha256, image_url="https://x/first"))
+    sqlite_db.commit()
+    monkeypatch.setattr(posts.repository_images, "get_image", AsyncMock(return_value=None))
+    monkeypatch.setattr(posts.repository_images, "image_index", BKTree())
+    monkeypatch.setattr("app.services.uploads.cloudinary.uploader.upload", MagicMock(return_value={"secure_url": "https://x/second"}))
+    monkeypatch.setattr(posts.image_variants.settings, "image_variants_backend", "cloudinary")
+
+    post = await posts.create_post(
+        request=None, title="a", descr="", hashtags=[],
+        file=UploadFile(filename="x.jpg", file=BytesIO(data)), db=sqlite_db, current_user=author
+    )
+
+    assert post.public_id == public_id and post.image_url == "https://x/first"
+    assert sqlite_db.query(ImageHash).count() == 1
+    # pHash додається в індекс лише тим запитом, чий запис закомічено
+    assert len(posts.repository_images.image_index) == 0
+
+
+@pytest.mark.asyncio
+async def test_upload_reuses_legacy_image_with_same_content(sqlite_db, fake_redis, monkeypatch):
+    author = User(id=1, username="author", email="a@x.com", password="x", role=UserRoleEnum.user)
+    sqlite_db.add(author)
+    sqlite_db.commit()
+    data = jpeg(picture(1)).getvalue()
+    sqlite_db.add(ImageHash(public_id="Photoshare/legacy", sha256=hashlib.sha256(data).hexdigest(), image_url="https://x/legacy"))
+    sqlite_db.commit()
+    upload = MagicMock()
+    monkeypatch.setattr("app.services.uploads.cloudinary.uploader.upload", upload)
+
+    post = await posts.create_post(
+        request=None, title="a", descr="", hashtags=[],
+        file=UploadFile(filename="x.jpg", file=BytesIO(data)), db=sqlite_db, current_user=author
+    )
+
+    upload.assert_not_called()
+    assert post.public_id == "Photoshare/legacy" and post.image_url == "https://x/legacy"
+
+
+@pytest.mark.asyncio
+async def test_similar_posts_by_phash(sqlite_db, fake_redis, monkeypatch):
+    author = User(id=1, username="author", email="a@x.com", password="x", role=UserRoleEnum.user)
+    sqlite_db.add(author)
+    sqlite_db.commit()
+    upload = MagicMock(side_effect=lambda file, **options: {"secure_url": f"https://x/{options['public_id']}"})
+    monkeypatch.setattr("app.services.uploads.cloudinary.uploader.upload", upload)
+    monkeypatch.setattr(posts.image_variants.settings, "image_variants_backend", "cloudinary")
+    monkeypatch.setattr(posts.repository_images, "image_index", BKTree())
+    monkeypatch.setattr(posts.repository_images.settings, "image_index_ttl", 0)
+
+    original = picture(1)
+    files = [jpeg(original), jpeg(original), jpeg(original.resize((160, 120))), jpeg(picture(2))]
+    created = []
+    for index, data in enumerate(files):
+        created.append(await posts.create_post(
+            request=None, title=f"p{index}", descr="", hashtags=[],
+            file=UploadFile(filename="x.jpg", file=data), db=sqlite_db, current_user=author
+        ))
+
+    assert upload.call_count == 3
+    assert created[2].public_id != created[0].public_id
+
+    similar = await posts.get_similar_posts(created[0].id, 10, 20, sqlite_db)
+    # точна копія (те саме зображення) і зменшена копія; інша картинка не схожа
+    assert [item.post.id for item in similar] == [created[1].id, created[2].id]
+    assert similar[0].distance == 0 and similar[1].distance <= 10
+    assert await posts.get_similar_posts(999, 10, 20, sqlite_db) is None
+
+
 @pytest.mark.asyncio
 async def test_update_post(fake_db, fake_user):
     post = Post(id=1, title="Old", descr="Old desc", user_id=fake_user.id)
@@ -117,3 +267,127 @@ async def test_update_post(fake_db, fake_user):
     assert result.title == "New"
     assert result.descr == "New desc"
     assert result.hashtags
+
+
+# -------------------------
+# Потокове читання (real SQLite)
+# -------------------------
+def test_iter_posts_loads_hashtags_per_batch(sqlite_db):
+    author = User(id=1, username="author", email="author@example.com", password="x")
+    tag = Hashtag(id=1, title="sea", user_id=1)
+    sqlite_db.add_all([author, tag] + [Post(id=i, title=f"p{i}", user_id=1, hashtags=[tag]) for i in range(1, 6)])
+    sqlite_db.commit()
+    sqlite_db.expunge_all()
+
+    result = [(p.id, [h.title for h in p.hashtags]) for p in posts.iter_posts(sqlite_db, batch_size=2)]
+
+    assert result == [(i, ["sea"]) for i in range(1, 6)]
+
+
+# -------------------------
+# Пошук з комбінованими фільтрами (справжня SQLite)
+# -------------------------
+@pytest.fixture
+def searchable(sqlite_db):
+    sea, sun, city = (Hashtag(id=i, title=t, user_id=1) for i, t in enumerate(["sea", "sun", "city"], 1))
+    sqlite_db.add_all([
+        User(id=1, username="anna", email="anna@example.com", password="x"),
+        User(id=2, username="bob", email="bob@example.com", password="x"),
+        Post(id=1, title="Sea at dawn", descr="calm", user_id=1, hashtags=[sea, sun],
+             created_at=datetime(2024, 1, 1), avg_rating=4.5, rating_score=4.0),
+        Post(id=2, title="Beach", descr="100% sun", user_id=2, hashtags=[sun],
+             created_at=datetime(2024, 2, 1), avg_rating=3.0, rating_score=3.2),
+        Post(id=3, title="Night city", descr="lights", user_id=1, hashtags=[city, sea],
+             created_at=datetime(2024, 3, 1)),
+        Post(id=4, title="Empty", descr="", user_id=2, created_at=datetime(2024, 4, 1)),
+    ])
+    sqlite_db.commit()
+    return sqlite_db
+
+
+async def _search_ids(db, skip=0, limit=10, **filters):
+    return [p.id for p in await posts.search_posts(PostSearch(**filters), skip, limit, db)]
+
+
+@pytest.mark.asyncio
+async def test_search_posts_hashtags_any_and_all(searchable):
+    assert await _search_ids(searchable, hashtags=["sea", "sun"]) == [3, 2, 1]
+    assert await _search_ids(searchable, hashtags=["sea", "sun", " sea "], match="all") == [1]
+    assert await _search_ids(searchable, hashtags=["missing"]) == []
+
+
+@pytest.mark.asyncio
+async def test_search_posts_combined_filters(searchable):
+    assert await _search_ids(searchable, keyword="SEA") == [1]
+    assert await _search_ids(searchable, keyword="100%") == [2]
+    assert await _search_ids(searchable, author="anna", hashtags=["sea"]) == [3, 1]
+    assert await _search_ids(searchable, date_from=datetime(2024, 1, 15), date_to=datetime(2024, 3, 15)) == [3, 2]
+    assert await _search_ids(searchable, min_rating=4) == [1]
+
+
+@pytest.mark.asyncio
+async def test_search_posts_sort_and_pagination(searchable):
+    assert await _search_ids(searchable, sort="top_rated") == [1, 2, 4, 3]
+    assert await _search_ids(searchable, skip=1, limit=2) == [3, 2]
+
+    found = await posts.search_posts(PostSearch(hashtags=["city"]), 0, 10, searchable)
+    assert {h.title for h in found[0].hashtags} == {"sea", "city"}
+
+
+
+@pytest.mark.asyncio
+async def test_get_posts_by_username_covers_all_matches(sqlite_db):
+    sqlite_db.add_all([
+        User(id=1, username="anna", email="anna@example.com", password="x"),
+        User(id=2, username="hanna", email="hanna@example.com", password="x"),
+        User(id=3, username="bob", email="bob@example.com", password="x"),
+        Post(id=1, title="a", user_id=1, created_at=datetime(2024, 1, 1)),
+        Post(id=2, title="h", user_id=2, created_at=datetime(2024, 2, 1)),
+        Post(id=3, title="b", user_id=3, created_at=datetime(2024, 3, 1)),
+    ])
+    sqlite_db.commit()
+
+    assert [p.id for p in await posts.get_posts_by_username("anna", sqlite_db)] == [2, 1]
+    assert await posts.get_posts_by_username("zzz", sqlite_db) == []
+
+
+# -------------------------
+# Гідрація постів за списком ID (справжня SQLite + fakeredis)
+# -------------------------
+@pytest.fixture
+def hydratable(sqlite_db):
+    author = User(id=1, username="anna", email="anna@example.com", password="x", role=UserRoleEnum.user)
+    tag = Hashtag(id=1, title="sea", user_id=1)
+    sqlite_db.add_all([author, tag] + [
+        Post(id=i, title=f"p{i}", descr="d", user_id=1, hashtags=[tag], created_at=datetime(2024, 1, i))
+        for i in range(1, 4)
+    ])
+    sqlite_db.commit()
+    return sqlite_db
+
+
+@pytest.mark.asyncio
+async def test_get_posts_by_ids_keeps_order(hydratable, fake_redis):
+    result = await posts.get_posts_by_ids([3, 99, 1, 2], hydratable)
+    assert [p.id for p in result] == [3, 1, 2]
+    assert [h.title for h in result[0].hashtags] == ["sea"]
+    assert await posts.get_posts_by_ids([], hydratable) == []
+
+
+@pytest.mark.asyncio
+async def test_get_posts_by_ids_served_from_cache(hydratable, fake_redis):
+    await posts.get_posts_by_ids([1, 2], hydratable)
+    # пости 1 і 2 вже в кеші: БД більше не читається
+    hydratable.query(Post).filter(Post.id.in_([1, 2])).update({Post.title: "changed"}, synchronize_session=False)
+    hydratable.commit()
+
+    assert [p.title for p in await posts.get_posts_by_ids([2, 3, 1], hydratable)] == ["p2", "p3", "p1"]
+
+
+@pytest.mark.asyncio
+async def test_update_post_invalidates_cache(hydratable, fake_redis):
+    author = hydratable.get(User, 1)
+    await posts.get_posts_by_ids([1], hydratable)
+    await posts.update_post(1, PostUpdate(title="new", descr="d"), author, hydratable)
+
+    assert [p.title for p in await posts.get_posts_by_ids([1], hydratable)] == ["new"]
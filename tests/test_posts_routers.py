@@ -2,6 +2,7 @@ import pytest
 from io import BytesIO
 from httpx import AsyncClient
 from unittest.mock import AsyncMock
+from datetime import datetime
 
 from app.main import app
 from app.schemas import PostResponse 
@@ -142,3 +143,68 @@ async def test_read_all_posts(mocker):
     assert len(data) == 2
     assert data[0]["title"] == "Post 1"
     assert data[1]["title"] == "Post 2"
+
+
+@pytest.mark.asyncio
+async def test_search_posts(monkeypatch, login_as):
+    login_as(MockUser())
+    search_mock = AsyncMock(return_value=[])
+    monkeypatch.setattr("app.repository.posts.search_posts", search_mock)
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/api/posts/search", params=[
+            ("hashtags", "sea"), ("hashtags", "sun"), ("match", "all"),
+            ("min_rating", "4"), ("sort", "top_rated"), ("skip", "20"), ("limit", "10"),
+        ])
+        invalid = await ac.get("/api/posts/search", params={"sort": "oldest"})
+
+    assert response.status_code == 404
+    filters, skip, limit = search_mock.await_args.args[:3]
+    assert filters.hashtags == ["sea", "sun"]
+    assert filters.match == "all" and filters.sort == "top_rated" and filters.min_rating == 4
+    assert (skip, limit) == (20, 10)
+    assert invalid.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_read_post_by_id_conditional_get(monkeypatch, login_as):
+    from app.database.models import Post
+
+    login_as(MockUser())
+    post = Post(id=1, title="Post", descr="d", hashtags=[], rating_sum=0, rating_count=0,
+                created_at=datetime(2024, 1, 1), updated_at=datetime(2024, 1, 1))
+    monkeypatch.setattr("app.repository.posts.get_post_by_id", AsyncMock(return_value=post))
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        first = await ac.get("/api/posts/by_id/1")
+        etag = first.headers["etag"]
+        cached = await ac.get("/api/posts/by_id/1", headers={"If-None-Match": etag})
+        post.updated_at = datetime(2024, 1, 2)
+        changed = await ac.get("/api/posts/by_id/1", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200 and first.json()["title"] == "Post"
+    assert "must-revalidate" in first.headers["cache-control"]
+    assert cached.status_code == 304 and cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_find_duplicate_posts_for_moderators(monkeypatch, login_as):
+    from app.database.models import User, UserRoleEnum
+
+    similar_mock = AsyncMock(return_value=[])
+    monkeypatch.setattr("app.repository.posts.get_similar_posts", similar_mock)
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        login_as(User(id=1, role=UserRoleEnum.user))
+        forbidden = await ac.get("/api/posts/duplicates/1")
+        login_as(User(id=2, role=UserRoleEnum.moder))
+        response = await ac.get("/api/posts/duplicates/1", params={"max_distance": 4})
+        similar_mock.return_value = None
+        missing = await ac.get("/api/posts/duplicates/2")
+
+    assert forbidden.status_code == 403
+    assert response.status_code == 200 and response.json() == []
+    assert similar_mock.await_args_list[0].args[:3] == (1, 4, 20)
+    assert missing.status_code == 404
@@ -0,0 +1,107 @@
+"""
+Перевірка планів запитів: гарячі запити repository не повинні читати таблиці повним скануванням.
+
+Таблиці наповнюються даними, збирається статистика (ANALYZE), після чого кожен SELECT,
+виконаний функцією repository, проганяється через EXPLAIN QUERY PLAN (SQLite).
+"""
+
+import re
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, insert, text
+
+from app.database.models import Comment, Hashtag, Post, Rating, User, post_m2m_hashtag
+from app.repository import comments, hashtags, posts, ratings, users
+from app.schemas import PostSearch
+
+# У SQLite повне сканування таблиці виглядає як "SCAN <table>" без "USING ... INDEX"
+SEQ_SCAN = re.compile(r"^SCAN \w+$")
+
+USERS, POSTS, TAGS = 100, 2000, 50
+
+
+@pytest.fixture
+def seeded_db(sqlite_db):
+    sqlite_db.execute(insert(User), [
+        {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "password": "x"}
+        for i in range(1, USERS + 1)
+    ])
+    sqlite_db.execute(insert(Hashtag), [
+        {"id": i, "title": f"tag{i}", "user_id": i % USERS + 1} for i in range(1, TAGS + 1)
+    ])
+    sqlite_db.execute(insert(Post), [
+        {"id": i, "title": f"post{i}", "user_id": i % USERS + 1} for i in range(1, POSTS + 1)
+    ])
+    sqlite_db.execute(insert(post_m2m_hashtag), [
+        {"post_id": post_id, "hashtag_id": (post_id + shift) % TAGS + 1}
+        for post_id in range(1, POSTS + 1) for shift in (0, 7)
+    ])
+    sqlite_db.execute(insert(Comment), [
+        {"text": f"c{i}", "post_id": i % POSTS + 1, "user_id": i % USERS + 1} for i in range(5000)
+    ])
+    sqlite_db.execute(insert(Rating), [
+        {"rate": 1 + i % 5, "post_id": i % POSTS + 1, "user_id": i // POSTS + 1} for i in range(4000)
+    ])
+    sqlite_db.commit()
+    sqlite_db.execute(text("ANALYZE"))
+    return sqlite_db
+
+
+@contextmanager
+def captured_selects(db):
+    """Збирає (SQL, параметри) усіх SELECT, виконаних через сесію."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def seq_scans(db, statement, parameters):
+    plan = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in plan if SEQ_SCAN.match(row[-1])]
+
+
+HOT_QUERIES = {
+    "posts.get_my_posts": lambda db: posts.get_my_posts(0, 20, User(id=7), db),
+    "posts.get_posts_by_user_id": lambda db: posts.get_posts_by_user_id(7, db),
+    "posts.get_posts_with_hashtag": lambda db: posts.get_posts_with_hashtag("tag3", db),
+    "posts.search_posts": lambda db: posts.search_posts(
+        PostSearch(hashtags=["tag3", "tag10"], match="all", author="user7"), 0, 20, db
+    ),
+    "posts.get_post_comments": lambda db: posts.get_post_comments(15, db, limit=20),
+    "comments.show_user_comments": lambda db: comments.show_user_comments(7, db, limit=20),
+    "comments.show_user_post_comments": lambda db: comments.show_user_post_comments(7, 15, db),
+    "hashtags.get_my_tags": lambda db: hashtags.get_my_tags(0, 20, User(id=3), db),
+    "ratings.show_my_ratings": lambda db: ratings.show_my_ratings(db, User(id=1)),
+    "ratings.user_rate_post": lambda db: ratings.user_rate_post(1, 15, db, User(id=1)),
+    "users.get_user_profile": lambda db: users.get_user_profile("user7", db),
+    "users.get_all_commented_posts": lambda db: users.get_all_commented_posts(User(id=7), db),
+    "users.get_all_liked_posts": lambda db: users.get_all_liked_posts(User(id=1), db),
+}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+async def test_hot_query_uses_indexes(seeded_db, fake_redis, name):
+    with captured_selects(seeded_db) as statements:
+        await HOT_QUERIES[name](seeded_db)
+
+    assert statements
+    for statement, parameters in statements:
+        assert seq_scans(seeded_db, statement, parameters) == [], statement
+
+
+def test_seq_scan_is_detected(seeded_db):
+    with captured_selects(seeded_db) as statements:
+        seeded_db.query(Post).filter(Post.title == "post5").all()
+
+    assert seq_scans(seeded_db, *statements[0]) == ["SCAN posts"]
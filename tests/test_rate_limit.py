@@ -0,0 +1,123 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.database.models import User, UserRoleEnum
+from app.main import app
+from app.services import rate_limit
+from app.services.rate_limit import Limit, UserRateLimiter, acquire, parse_limit
+
+
+def test_parse_limit():
+    assert parse_limit("10/minute") == Limit(10, 60)
+    assert parse_limit("1000/days") == Limit(1000, 86400)
+    assert parse_limit("5/30") == Limit(5, 30)
+    with pytest.raises(ValueError):
+        parse_limit("5/fortnight")
+
+
+def test_limit_for_role_and_default(monkeypatch):
+    monkeypatch.setattr(
+        rate_limit.settings, "rate_limits", {"create_post": {"admin": "100/minute", "default": "3/minute"}}
+    )
+    assert rate_limit.limit_for("create_post", "admin") == Limit(100, 60)
+    assert rate_limit.limit_for("create_post", "user") == Limit(3, 60)
+    assert rate_limit.limit_for("create_rate", "user") is None
+
+
+@pytest.mark.asyncio
+async def test_acquire_reserves_tokens_in_batches(fake_redis, monkeypatch):
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_batch", 0.5)
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_batch_min", 0)
+    limit = Limit(4, 60)
+
+    results = [await acquire("create_post", "user:1", limit, now=600) for _ in range(5)]
+
+    assert results[:4] == [None] * 4
+    assert results[4] == 60
+    # 4 дозволені запити — дві пачки по 2 токени, ще один запит з'ясував, що бюджет вичерпано
+    assert int(await fake_redis.get("rate:create_post:user:1:10")) == 6
+
+    # далі вікно вичерпане локально — до Redis не звертаємося
+    await fake_redis.delete("rate:create_post:user:1:10")
+    assert await acquire("create_post", "user:1", limit, now=630) == 30
+    assert await fake_redis.get("rate:create_post:user:1:10") is None
+
+    # нове вікно — новий бюджет
+    assert await acquire("create_post", "user:1", limit, now=660) is None
+
+
+@pytest.mark.asyncio
+async def test_budget_is_shared_between_processes(fake_redis, monkeypatch):
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_batch", 0.5)
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_batch_min", 0)
+    limit = Limit(4, 60)
+
+    assert await acquire("create_rate", "user:1", limit, now=0) is None
+    # інший процес: локальних резервів немає, але лічильник у Redis спільний
+    rate_limit.reset()
+    assert await acquire("create_rate", "user:1", limit, now=1) is None
+    rate_limit.reset()
+    assert await acquire("create_rate", "user:1", limit, now=2) is not None
+
+
+@pytest.mark.asyncio
+async def test_small_limit_is_exact_across_workers(fake_redis, monkeypatch):
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_batch", 0.2)
+    limit = Limit(10, 60)
+    # 4 воркери — у кожного свої локальні резерви, лічильник у Redis спільний
+    workers = [{} for _ in range(4)]
+
+    async def request(worker):
+        monkeypatch.setattr(rate_limit, "_leases", workers[worker])
+        return await acquire("login", "ip:1.2.3.4", limit, now=0)
+
+    # перші запити розкидано по всіх воркерах, решта потрапляє на перший:
+    # з пачками по 2 токени невитрачені токени лишилися б на воркерах 1–3
+    results = [await request(worker) for worker in [0, 1, 2, 3, 0, 0, 0, 0, 0, 0]]
+    assert results == [None] * 10
+    assert await request(2) == 60
+    assert int(await fake_redis.get("rate:login:ip:1.2.3.4:0")) == 11
+
+
+@pytest.mark.asyncio
+async def test_acquire_falls_back_to_local_limit(monkeypatch):
+    class BrokenRedis:
+        def pipeline(self, transaction=True):
+            raise RedisConnectionError("down")
+
+    monkeypatch.setattr(rate_limit, "redis_cache", BrokenRedis())
+    limit = Limit(3, 60)
+
+    results = [await acquire("login", "ip:1.2.3.4", limit, now=0) for _ in range(4)]
+
+    assert results == [None, None, None, 60]
+
+
+@pytest.mark.asyncio
+async def test_user_limiter_raises_429_with_retry_after(fake_redis, monkeypatch):
+    monkeypatch.setattr(rate_limit.settings, "rate_limits", {"create_comment": {"default": "1/minute"}})
+    limiter = UserRateLimiter("create_comment")
+    user = User(id=7, role=UserRoleEnum.user)
+
+    assert await limiter(user) is True
+    with pytest.raises(HTTPException) as exc:
+        await limiter(user)
+
+    assert exc.value.status_code == 429
+    assert 1 <= int(exc.value.headers["Retry-After"]) <= 60
+
+
+@pytest.mark.asyncio
+async def test_login_is_limited_by_client_ip(fake_redis, monkeypatch):
+    monkeypatch.setattr(rate_limit.settings, "rate_limits", {"login": {"anonymous": "2/minute"}})
+    monkeypatch.setattr("app.repository.users.get_user_by_email", AsyncMock(return_value=None))
+    form = {"username": "nobody@example.com", "password": "secret"}
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        statuses = [(await client.post("/api/auth/login", data=form)).status_code for _ in range(3)]
+
+    assert statuses == [401, 401, 429]
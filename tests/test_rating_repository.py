@@ -6,6 +6,8 @@ from starlette import status
 from app.repository import ratings
 from app.database.models import Rating, Post, User, UserRoleEnum
 from app.conf import messages as message
+from app.schemas import PostResponse
+from app.services.leaderboard import bayesian_score
 
 
 # -----------------------------
@@ -88,14 +90,20 @@ def rate(user):
 
 # ---- CREATE RATE ----
 @pytest.mark.asyncio
-async def test_create_rate_success(db, post, user):
-    db.posts.append(Post(id=10, user_id=2))  # пост іншого користувача
-    new_rate = await ratings.create_rate(post_id=10, rate=1, db=db, user=user)
+async def test_create_rate_success(seeded, fake_redis):
+    db, voter, other = seeded
+    new_rate = await ratings.create_rate(post_id=10, rate=1, db=db, user=voter)
 
+    assert new_rate.id is not None
     assert new_rate.post_id == 10
     assert new_rate.rate == 1
-    assert new_rate.user_id == user.id
-    assert db.added
+    assert new_rate.user_id == voter.id
+
+
+@pytest.mark.asyncio
+async def test_create_rate_missing_post(seeded, fake_redis):
+    db, voter, other = seeded
+    assert await ratings.create_rate(post_id=999, rate=1, db=db, user=voter) is None
 
 
 @pytest.mark.asyncio
@@ -110,15 +118,18 @@ async def test_create_rate_self_post_error(db, post, user):
 
 
 @pytest.mark.asyncio
-async def test_create_rate_vote_twice_error(db, post, user, rate):
-    db.posts.append(Post(id=10, user_id=2))  # нормальний пост
-    db.rates.append(rate)  # користувач уже голосував
+async def test_create_rate_vote_twice_error(seeded, fake_redis):
+    db, voter, other = seeded
+    await ratings.create_rate(10, 4, db, voter)
 
     with pytest.raises(HTTPException) as exc:
-        await ratings.create_rate(10, 1, db, user)
+        await ratings.create_rate(10, 1, db, voter)
 
     assert exc.value.status_code == status.HTTP_423_LOCKED
     assert exc.value.detail == message.VOTE_TWICE
+    # повторний голос відхилено на рівні БД, агрегати не змінились
+    assert db.query(Rating).count() == 1
+    assert db.query(Post).filter(Post.id == 10).first().rating_count == 1
 
 
 # ---- EDIT RATE ----
@@ -190,4 +201,125 @@ async def test_user_rate_post(db, rate):
 @pytest.mark.asyncio
 async def test_user_rate_post_not_found(db):
     result = await ratings.user_rate_post(user_id=1, post_id=10, db=db, user=None)
-    assert result is None
\ No newline at end of file
+    assert result is None
+
+# ---- INCREMENTAL AGGREGATES (real SQLite) ----
+@pytest.fixture
+def seeded(sqlite_db):
+    author = User(id=1, username="author", email="author@example.com", password="x")
+    voter = User(id=2, username="voter", email="voter@example.com", password="x")
+    other = User(id=3, username="other", email="other@example.com", password="x")
+    post = Post(id=10, title="sea", descr="", user_id=author.id)
+    sqlite_db.add_all([author, voter, other, post])
+    sqlite_db.commit()
+    return sqlite_db, voter, other
+
+
+@pytest.mark.asyncio
+async def test_rating_aggregates_follow_create_edit_delete(seeded, fake_redis):
+    db, voter, other = seeded
+
+    first = await ratings.create_rate(10, 5, db, voter)
+    await ratings.create_rate(10, 3, db, other)
+    post = db.query(Post).filter(Post.id == 10).first()
+    assert (post.rating_sum, post.rating_count) == (8, 2)
+    assert float(post.avg_rating) == pytest.approx(4.0)
+
+    await ratings.edit_rate(first.id, 1, db, voter)
+    db.refresh(post)
+    assert (post.rating_sum, post.rating_count) == (4, 2)
+    assert float(post.avg_rating) == pytest.approx(2.0)
+
+    await ratings.delete_rate(first.id, db, voter)
+    db.refresh(post)
+    assert (post.rating_sum, post.rating_count) == (3, 1)
+    assert float(post.rating_score) == pytest.approx(float(bayesian_score(3, 1)))
+
+
+@pytest.mark.asyncio
+async def test_get_top_posts_uses_leaderboard_order(seeded, fake_redis):
+    db, voter, other = seeded
+    db.add(Post(id=11, title="sun", descr="", user_id=1))
+    db.commit()
+
+    await ratings.create_rate(10, 2, db, voter)
+    await ratings.create_rate(11, 5, db, voter)
+
+    top = await ratings.get_top_posts(0, 10, None, db)
+    assert [p.id for p in top] == [11, 10]
+
+
+@pytest.mark.asyncio
+async def test_get_top_posts_falls_back_to_db(seeded, fake_redis):
+    db, voter, other = seeded
+    db.add(Post(id=11, title="sun", descr="", user_id=1))
+    db.commit()
+    await ratings.create_rate(10, 4, db, voter)
+    await ratings.create_rate(11, 5, db, voter)
+    await fake_redis.flushall()
+
+    top = await ratings.get_top_posts(0, 10, None, db)
+    assert [p.id for p in top] == [11, 10]
+    assert all(isinstance(p, PostResponse) for p in top)
+    # пости гідруються через кеш постів, а таблиці лідерів у запиті не будуються
+    assert await fake_redis.exists("post:10")
+    assert not await fake_redis.exists("leaderboard:built")
+
+
+@pytest.mark.asyncio
+async def test_build_leaderboards_after_redis_flush(seeded, fake_redis):
+    db, voter, other = seeded
+    db.add(Post(id=11, title="sun", descr="", user_id=1))
+    db.commit()
+    await ratings.create_rate(10, 5, db, voter)
+    await fake_redis.flushall()
+
+    # нова оцінка після очищення Redis не повинна сховати пост 10
+    await ratings.create_rate(11, 3, db, voter)
+    assert [p.id for p in await ratings.get_top_posts(0, 10, None, db)] == [10, 11]
+
+    await ratings.build_leaderboards(db)
+    assert await fake_redis.exists("leaderboard:built")
+    assert [p.id for p in await ratings.get_top_posts(0, 10, None, db)] == [10, 11]
+
+
+# ---- BULK IMPORT / EXPORT (real SQLite) ----
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.asyncio
+async def test_import_ratings_reports_line_errors_and_updates_aggregates(seeded, fake_redis):
+    db, voter, other = seeded
+    await ratings.create_rate(10, 4, db, other)  # вже існуючий голос
+
+    report = await ratings.import_ratings(_chunks(
+        [
+            (1, '{"post_id": 10, "user_id": 2, "rate": 5}'),
+            (2, '{"post_id": 10, "user_id": 2, "rate": 1}'),   # повтор у тій самій пачці
+            (3, '{"post_id": 99, "user_id": 2, "rate": 1}'),   # немає поста
+            (4, '{"post_id": 10, "user_id": 1, "rate": 1}'),   # власний пост
+        ],
+        [
+            (5, '{"post_id": 10, "user_id": 3, "rate": 2}'),   # уже голосував у БД
+            (6, '{"post_id": 10, "user_id": 42, "rate": 2}'),  # немає користувача
+        ],
+    ), db)
+
+    assert report.imported == 1
+    assert {(e.line, e.error) for e in report.errors} == {
+        (2, message.VOTE_TWICE), (3, message.NO_POST_ID), (4, message.OWN_POST),
+        (5, message.VOTE_TWICE), (6, message.NO_USER_ID),
+    }
+    post = db.query(Post).filter(Post.id == 10).first()
+    assert (post.rating_sum, post.rating_count) == (9, 2)
+
+
+@pytest.mark.asyncio
+async def test_iter_ratings_streams_all_rows(seeded, fake_redis):
+    db, voter, other = seeded
+    await ratings.create_rate(10, 4, db, voter)
+    await ratings.create_rate(10, 2, db, other)
+
+    assert [r.rate for r in ratings.iter_ratings(db, batch_size=1)] == [4, 2]
@@ -1,10 +1,12 @@
+import json
 import pytest
 from httpx import AsyncClient
 from fastapi import status
 from unittest.mock import AsyncMock
 from datetime import datetime
 from app.main import app
-from app.database.models import User, UserRoleEnum
+from app.database.connect_db import get_db
+from app.database.models import User, Post, UserRoleEnum
 from app.schemas import RatingModel
 from app.repository import ratings as repository_ratings
 
@@ -135,3 +137,45 @@ async def test_user_rate_post_success(monkeypatch, mock_user):
 
     assert response.status_code == status.HTTP_200_OK
     assert response.json()["post_id"] == 10
+
+
+@pytest.mark.asyncio
+async def test_top_rated_posts(monkeypatch, mock_user, login_as):
+    top_mock = AsyncMock(return_value=[])
+    monkeypatch.setattr(repository_ratings, "get_top_posts", top_mock)
+    login_as(mock_user)
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/api/ratings/top", params={"skip": 20, "limit": 10, "hashtag": "sea"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+    assert top_mock.await_args.args[:3] == (20, 10, "sea")
+
+
+@pytest.mark.asyncio
+async def test_import_and_export_ratings_ndjson(mock_admin, login_as, sqlite_db, fake_redis):
+    sqlite_db.add_all([
+        User(id=1, username="john", email="john@example.com", password="x", role=UserRoleEnum.user),
+        User(id=2, username="admin", email="admin@example.com", password="x", role=UserRoleEnum.admin),
+        Post(id=10, title="sea", user_id=2),
+    ])
+    sqlite_db.commit()
+    login_as(mock_admin)
+    app.dependency_overrides[get_db] = lambda: sqlite_db
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            imported = await ac.post(
+                "/api/ratings/import",
+                content=b'{"post_id": 10, "user_id": 1, "rate": 5}\nbroken\n',
+            )
+            exported = await ac.get("/api/ratings/export")
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+    assert imported.status_code == status.HTTP_200_OK
+    assert imported.json()["imported"] == 1
+    assert imported.json()["errors"][0]["line"] == 2
+    assert exported.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in exported.text.splitlines()]
+    assert [(r["post_id"], r["user_id"], r["rate"]) for r in rows] == [(10, 1, 5)]
@@ -0,0 +1,40 @@
+import pytest
+
+from app.services import tag_suggest
+
+
+# -----------------------------
+# PREFIX INDEX
+# -----------------------------
+@pytest.mark.asyncio
+async def test_suggest_without_index_returns_none(fake_redis):
+    assert await tag_suggest.suggest("se", 10) is None
+
+
+@pytest.mark.asyncio
+async def test_suggest_ranks_by_usage_case_insensitive(fake_redis):
+    await tag_suggest.rebuild([("sea", 2), ("Seaside", 5), ("sun", 9), ("season", 0)])
+
+    assert await tag_suggest.suggest("SEA", 10) == ["Seaside", "sea", "season"]
+    assert await tag_suggest.suggest("sea", 1) == ["Seaside"]
+    assert await tag_suggest.suggest("x", 10) == []
+
+
+@pytest.mark.asyncio
+async def test_suggest_non_ascii_prefix(fake_redis):
+    await tag_suggest.rebuild([("море", 1), ("морозиво", 3), ("sea", 1)])
+    assert await tag_suggest.suggest("мор", 10) == ["морозиво", "море"]
+
+
+@pytest.mark.asyncio
+async def test_index_follows_tag_crud_and_usage(fake_redis):
+    await tag_suggest.rebuild([("sea", 1)])
+    await tag_suggest.add_tag("sun")
+    await tag_suggest.record_usage(["sun", "sunset"])
+    await tag_suggest.record_usage(["sun"], ["sea"])
+    assert await tag_suggest.suggest("s", 10) == ["sun", "sunset", "sea"]
+
+    await tag_suggest.rename_tag("sun", "sunrise")
+    await tag_suggest.remove_tag("sunset")
+    assert await tag_suggest.suggest("sun", 10) == ["sunrise"]
+    assert await fake_redis.zscore(tag_suggest.USAGE_KEY, "sunrise") == 2
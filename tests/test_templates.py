@@ -0,0 +1,22 @@
+import pytest
+
+from app.services import templates
+
+
+def test_precompile_fills_environment_cache():
+    names = templates.precompile()
+
+    assert "example_email.html" in names
+    env = templates.environment()
+    assert env.get_template("example_email.html") is env.get_template("example_email.html")
+
+
+@pytest.mark.asyncio
+async def test_render_async_matches_render_and_escapes():
+    context = {"host": "http://test/", "username": "<b>bob</b>", "token": "abc"}
+
+    html = await templates.render_async("example_email.html", **context)
+
+    assert html == templates.render("example_email.html", **context)
+    assert "&lt;b&gt;bob&lt;/b&gt;" in html
+    assert "http://test/api/auth/confirmed_email/abc" in html
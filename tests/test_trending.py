@@ -0,0 +1,52 @@
+import pytest
+
+from app.services import trending
+
+HOUR = trending.BUCKET_SECONDS
+NOW = 1_700_000_000
+
+
+# -----------------------------
+# SLIDING WINDOWS
+# -----------------------------
+@pytest.mark.asyncio
+async def test_top_hashtags_counts_within_window(fake_redis):
+    await trending.record_usage(["sea", "sun"], now=NOW - 30 * HOUR)
+    await trending.record_usage(["sun"], now=NOW - 2 * HOUR)
+    await trending.record_usage(["sea"], now=NOW)
+    await trending.record_usage(["sea", "city"], now=NOW)
+
+    assert await trending.top_hashtags(1, 10, now=NOW) == [("sea", 2), ("city", 1)]
+    assert await trending.top_hashtags(24, 10, now=NOW) == [("sea", 2), ("sun", 1), ("city", 1)]
+    assert await trending.top_hashtags(168, 1, now=NOW) == [("sea", 3)]
+
+
+@pytest.mark.asyncio
+async def test_window_result_is_cached(fake_redis):
+    await trending.record_usage(["sea"], now=NOW)
+    assert await trending.top_hashtags(24, 10, now=NOW) == [("sea", 1)]
+
+    await trending.record_usage(["sun", "sun"], now=NOW)
+    # об'єднання вікна живе TRENDING_CACHE_TTL секунд
+    assert await trending.top_hashtags(24, 10, now=NOW) == [("sea", 1)]
+    assert await fake_redis.ttl(trending.WINDOW_KEY.format(24, NOW // HOUR)) <= trending.TRENDING_CACHE_TTL
+
+
+@pytest.mark.asyncio
+async def test_buckets_expire_after_longest_window(fake_redis):
+    await trending.record_usage(["sea"], now=NOW)
+    ttl = await fake_redis.ttl(trending.BUCKET_KEY.format(NOW // HOUR))
+    assert 168 * HOUR < ttl <= 169 * HOUR
+
+
+@pytest.mark.asyncio
+async def test_forget_usage_decrements_creation_bucket(fake_redis):
+    await trending.record_usage(["sea", "sun"], now=NOW - 2 * HOUR)
+    await trending.record_usage(["sea"], now=NOW)
+
+    await trending.forget_usage(["sea", "sun"], at=NOW - 2 * HOUR)
+    # кошик, якого вже немає, не створюється заново
+    await trending.forget_usage(["sea"], at=NOW - 500 * HOUR)
+
+    assert await trending.top_hashtags(24, 10, now=NOW) == [("sea", 1)]
+    assert not await fake_redis.exists(trending.BUCKET_KEY.format((NOW - 500 * HOUR) // HOUR))
@@ -0,0 +1,56 @@
+import pytest
+
+from app.services.trigram import TrigramIndex, similarity, trigrams
+
+
+# -----------------------------
+# TRIGRAMS (сумісні з pg_trgm)
+# -----------------------------
+def test_trigrams_match_pg_trgm():
+    assert trigrams("Cat") == {"  c", " ca", "cat", "at "}
+    assert trigrams("a_b") == {"  a", " a ", "  b", " b "}
+    assert trigrams("") == set()
+
+
+def test_similarity():
+    assert similarity("anna", "anna") == 1.0
+    assert similarity("anna", "bob") == 0.0
+    assert 0 < similarity("anna", "hanna") < 1
+
+
+# -----------------------------
+# INDEX
+# -----------------------------
+@pytest.fixture
+def index():
+    idx = TrigramIndex()
+    idx.rebuild([(1, "anna"), (2, "annette"), (3, "hanna"), (4, "bob"), (5, "joanna_k")])
+    return idx
+
+
+def test_search_ranks_by_similarity(index):
+    result = index.search("anna", threshold=0.35)
+    assert [item_id for item_id, _ in result][:1] == [1]
+    assert {item_id for item_id, _ in result} == {1, 3, 5}
+    assert all(left[1] >= right[1] for left, right in zip(result, result[1:]))
+
+
+def test_search_keeps_substring_matches_below_threshold(index):
+    assert 2 in {item_id for item_id, _ in index.search("annet", threshold=0.9)}
+    assert index.search("zzz", threshold=0.1) == []
+
+
+def test_add_and_remove(index):
+    index.add(4, "annabel")
+    index.remove(1)
+    ids = [item_id for item_id, _ in index.search("anna", threshold=0.3, limit=10)]
+    assert 1 not in ids and 4 in ids
+    assert [item_id for item_id, _ in index.search("bob", threshold=0.3)] == []
+
+
+def test_is_stale():
+    idx = TrigramIndex()
+    assert idx.is_stale(300)
+    idx.rebuild([])
+    assert not idx.is_stale(300)
+    assert idx.is_stale(-1)
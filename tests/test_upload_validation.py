@@ -0,0 +1,122 @@
+import hashlib
+import io
+
+import pytest
+from fastapi import FastAPI, HTTPException, UploadFile
+from httpx import AsyncClient
+from PIL import Image
+
+from app.services import upload_validation
+from app.services.upload_validation import UploadSizeMiddleware, sniff, validate_image
+
+
+def encode(image_format: str, size=(64, 48)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def test_sniff_by_magic_bytes():
+    assert sniff(encode("JPEG")[:12]) == "jpeg"
+    assert sniff(encode("PNG")[:12]) == "png"
+    assert sniff(encode("GIF")[:12]) == "gif"
+    assert sniff(encode("WEBP")[:12]) == "webp"
+    assert sniff(b"\x00\x00\x00\x1cftypavif\x00\x00") == "avif"
+    assert sniff(b"<svg xmlns=") is None
+    assert sniff(b"") is None
+
+
+@pytest.mark.asyncio
+async def test_validate_image_reports_format_size_and_hash(monkeypatch):
+    monkeypatch.setattr(upload_validation, "CHUNK_SIZE", 16)
+    data = encode("PNG", size=(120, 80))
+    file = io.BytesIO(data)
+
+    info = await validate_image(file)
+
+    assert (info.format, info.size, info.width, info.height) == ("png", len(data), 120, 80)
+    assert info.sha256 == hashlib.sha256(data).hexdigest()
+    assert file.tell() == 0
+
+
+@pytest.mark.asyncio
+async def test_validate_image_rejects_unsupported_types(monkeypatch):
+    with pytest.raises(HTTPException) as error:
+        await validate_image(io.BytesIO(b"%PDF-1.7 not an image"))
+    assert error.value.status_code == 415
+
+    monkeypatch.setattr(upload_validation.settings, "upload_allowed_formats", ["jpeg"])
+    with pytest.raises(HTTPException) as error:
+        await validate_image(io.BytesIO(encode("PNG")))
+    assert error.value.status_code == 415
+
+
+@pytest.mark.asyncio
+async def test_validate_image_stops_reading_past_max_size(monkeypatch):
+    monkeypatch.setattr(upload_validation, "CHUNK_SIZE", 100)
+    monkeypatch.setattr(upload_validation.settings, "upload_max_size", 250)
+    file = io.BytesIO(encode("PNG") + b"\x00" * 10_000)
+
+    with pytest.raises(HTTPException) as error:
+        await validate_image(file)
+
+    assert error.value.status_code == 413
+    assert file.tell() == 300
+
+
+@pytest.mark.asyncio
+async def test_validate_image_limits_dimensions_from_header(monkeypatch):
+    monkeypatch.setattr(upload_validation.settings, "upload_max_dimension", 1000)
+    with pytest.raises(HTTPException) as error:
+        await validate_image(io.BytesIO(encode("PNG", size=(1500, 10))))
+    assert error.value.status_code == 413
+
+    monkeypatch.setattr(upload_validation.settings, "upload_max_pixels", 100 * 100)
+    with pytest.raises(HTTPException) as error:
+        await validate_image(io.BytesIO(encode("PNG", size=(200, 200))))
+    assert error.value.status_code == 413
+
+
+@pytest.mark.asyncio
+async def test_decompression_bomb_is_too_large_not_unsupported(monkeypatch):
+    # поріг Pillow (MAX_IMAGE_PIXELS × 2) нижчий за власні ліміти — Image.open сам піднімає помилку
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+    with pytest.raises(HTTPException) as error:
+        await validate_image(io.BytesIO(encode("PNG", size=(100, 100))))
+    assert error.value.status_code == 413
+    assert error.value.detail == upload_validation.IMAGE_TOO_LARGE
+
+
+@pytest.fixture
+def upload_app():
+    app = FastAPI()
+    app.add_middleware(UploadSizeMiddleware, max_size=1000)
+
+    @app.post("/upload")
+    async def upload(file: UploadFile):
+        return {"size": len(await file.read())}
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_middleware_rejects_large_multipart_bodies(upload_app):
+    async def chunked(data: bytes):
+        for start in range(0, len(data), 256):
+            yield data[start:start + 256]
+
+    files = {"file": ("x.png", b"\x00" * 5000, "image/png")}
+    async with AsyncClient(app=upload_app, base_url="http://test") as ac:
+        small = await ac.post("/upload", files={"file": ("x.png", b"\x00" * 100, "image/png")})
+        by_length = await ac.post("/upload", files=files)
+
+        request = ac.build_request("POST", "/upload", files=files)
+        streamed = await ac.post(
+            "/upload", content=chunked(request.read()),
+            headers={"Content-Type": request.headers["Content-Type"]},
+        )
+
+    assert small.status_code == 200 and small.json() == {"size": 100}
+    assert by_length.status_code == 413
+    assert streamed.status_code == 413
+    assert streamed.json() == {"detail": "File is too large."}
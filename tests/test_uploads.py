@@ -0,0 +1,37 @@
+import asyncio
+import threading
+
+import pytest
+
+from app import server
+from app.conf.config import settings
+from app.services import uploads
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_upload_in_thread(monkeypatch):
+    release = threading.Event()
+
+    def slow_upload(file, **options):
+        release.wait(5)
+        return {"secure_url": "https://example.com/x.png", **options}
+
+    monkeypatch.setattr("app.services.uploads.cloudinary.uploader.upload", slow_upload)
+    task = asyncio.create_task(uploads.upload(b"data", public_id="x"))
+    await asyncio.sleep(0.05)
+
+    assert uploads.in_flight() == 1
+    assert await uploads.drain(0.05) is False
+
+    release.set()
+    assert await uploads.drain(5) is True
+    assert (await task)["public_id"] == "x"
+    assert uploads.in_flight() == 0
+
+
+def test_worker_count(monkeypatch):
+    monkeypatch.setattr(settings, "web_workers", 3)
+    assert server.worker_count() == 3
+
+    monkeypatch.setattr(settings, "web_workers", 0)
+    assert server.worker_count() == server.cpu_count() >= 1
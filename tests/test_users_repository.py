@@ -2,8 +2,12 @@ import pytest_asyncio
 import pytest
 from httpx import AsyncClient
 from app.main import app
+from app.database.connect_db import get_db
 from app.repository import users as repository
 from app.schemas import UserModel
+from app.database.models import User
+from unittest.mock import MagicMock
+from sqlalchemy.dialects import postgresql
 
 # ---------------- Fake DB session ----------------
 class FakeAsyncSession:
@@ -41,9 +45,12 @@ def fake_db():
 
 # ---------------- HTTP client fixture ----------------
 @pytest_asyncio.fixture
-async def client():
+async def client(sqlite_db):
+    # схема береться з моделей (create_all у sqlite_db), а не з файлу БД
+    app.dependency_overrides[get_db] = lambda: sqlite_db
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
+    app.dependency_overrides.pop(get_db, None)
 
 # ---------------- Repository tests ----------------
 @pytest.mark.asyncio
@@ -80,3 +87,95 @@ async def test_login_user_api(client):
         "password": "password123"
     })
     assert response.status_code in (200, 401)
+
+
+# -----------------------------
+# Нечіткий пошук username (справжня SQLite, індекс у пам'яті)
+# -----------------------------
+@pytest.fixture
+def people(sqlite_db):
+    sqlite_db.add_all([
+        User(id=i, username=name, email=f"{name}@example.com", password="x")
+        for i, name in enumerate(["anna", "hanna", "bob", "joanna_k", "robert"], 1)
+    ])
+    sqlite_db.commit()
+    return sqlite_db
+
+
+@pytest.mark.asyncio
+async def test_get_users_with_username_ranked(people):
+    result = await repository.get_users_with_username("anna", people)
+    assert [u.username for u in result] == ["anna", "hanna", "joanna_k"]
+    assert [u.username for u in await repository.get_users_with_username("anna", people, limit=1)] == ["anna"]
+    assert await repository.get_users_with_username("zzz", people) == []
+
+
+@pytest.mark.asyncio
+async def test_username_index_follows_create_and_delete(people):
+    assert [u.username for u in await repository.get_users_with_username("bob", people)] == ["bob"]
+
+    await repository.create_user(UserModel(username="bobby", email="bobby@example.com", password="secret1"), people)
+    await repository.delete_user(3, people)
+    assert [u.username for u in await repository.get_users_with_username("bob", people)] == ["bobby"]
+
+
+def test_username_condition_uses_pg_trgm():
+    db = MagicMock()
+    db.get_bind.return_value.dialect.name = "postgresql"
+
+    sql = str(repository.username_match_clause("anna", db).compile(dialect=postgresql.dialect()))
+    assert "users.username %" in sql
+    assert "ILIKE" in sql.upper()
+    db.execute.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_delete_user_cascades_in_db_and_queues_cloudinary(sqlite_db, fake_redis):
+    from datetime import datetime, timezone
+    from sqlalchemy import event
+    from app.database.models import Comment, Follow, Hashtag, Post, Rating
+    from app.services import leaderboard, tag_suggest, trending
+    from app.services.cloudinary_cleanup import ORPHANS_KEY
+
+    created_at = datetime(2024, 5, 1, 12, 0)
+    author = User(id=1, username="author", email="a@example.com", password="x", avatar="https://img/a.png")
+    reader = User(id=2, username="reader", email="r@example.com", password="x", followers_count=1)
+    sqlite_db.add_all([author, reader])
+    sqlite_db.commit()
+    sea = Hashtag(title="sea", user_id=2)
+    posts = [Post(id=i, title=f"p{i}", descr="", user_id=1, public_id=f"pid{i}", created_at=created_at) for i in (1, 2)]
+    posts[0].hashtags.append(sea)
+    sqlite_db.add_all(posts)
+    sqlite_db.commit()
+    sqlite_db.add_all([
+        Comment(text="nice", user_id=2, post_id=1),
+        Rating(rate=5, user_id=2, post_id=2),
+        Follow(follower_id=1, followed_id=2),
+    ])
+    sqlite_db.commit()
+    sqlite_db.expunge_all()
+
+    timestamp = created_at.replace(tzinfo=timezone.utc).timestamp()
+    await leaderboard.update_post(1, 4.5, ["sea"])
+    await leaderboard.update_post(2, 5.0, [])
+    await trending.record_usage(["sea"], now=timestamp)
+    await tag_suggest.record_usage(["sea"])
+
+    statements = []
+    event.listen(sqlite_db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    await repository.delete_user(1, sqlite_db)
+
+    # коментарі, оцінки й пости не завантажуються — їх видаляє БД
+    assert not [sql for sql in statements if "comments.text" in sql or "ratings.rate" in sql]
+    assert sqlite_db.query(Post).count() == 0
+    assert sqlite_db.query(Comment).count() == 0
+    assert sqlite_db.query(Rating).count() == 0
+    assert sqlite_db.get(User, 2).followers_count == 0
+    queued = {value.decode() for value in await fake_redis.smembers(ORPHANS_KEY)}
+    assert queued == {"pid1", "pid2", "Photoshare/author"}
+
+    # у Redis не лишилося слідів постів
+    assert await fake_redis.zcard(leaderboard.GLOBAL_KEY) == 0
+    assert await fake_redis.zcard(leaderboard.HASHTAG_KEY.format("sea")) == 0
+    assert await fake_redis.zcard(trending.BUCKET_KEY.format(trending._bucket(timestamp))) == 0
+    assert await fake_redis.zscore(tag_suggest.USAGE_KEY, "sea") == 0
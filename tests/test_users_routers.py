@@ -149,3 +149,28 @@ async def test_login_user(client_fixture):
     assert data["access_token"] == "access_token"
     assert data["refresh_token"] == "refresh_token"
     assert data["token_type"] == "bearer"
+
+
+@pytest.mark.asyncio
+async def test_read_all_users_stream_ndjson(client_fixture, login_as, sqlite_db):
+    import json
+    from app.main import app
+    from app.database.connect_db import get_db as real_get_db
+    from app.database.models import User, UserRoleEnum
+
+    admin = User(id=1, username="admin", email="admin@example.com", password="x", role=UserRoleEnum.admin)
+    sqlite_db.add_all([admin] + [
+        User(id=i, username=f"user{i}", email=f"user{i}@example.com", password="x", role=UserRoleEnum.user)
+        for i in range(2, 6)
+    ])
+    sqlite_db.commit()
+    login_as(admin)
+    app.dependency_overrides[real_get_db] = lambda: sqlite_db
+    try:
+        response = await client_fixture.get("/api/users/all", params={"stream": True})
+    finally:
+        app.dependency_overrides.pop(real_get_db, None)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [1, 2, 3, 4, 5]